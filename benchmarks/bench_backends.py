@@ -0,0 +1,135 @@
+"""
+Compara os backends de inferência do BERT em CPU: PyTorch, TorchScript e ONNX.
+
+Os grafos exportados precisam existir em --model-path (veja src/export_model.py);
+backends sem grafo são ignorados. Para cada backend reporta, no conjunto AMOSTRA
+processado:
+- F1 (ScoreCalculator) do BERT puro e do Classificador Híbrido
+- Latência de inferência do BERT (ms por texto) e vazão do Híbrido
+- Tempo de carga e pico de memória (RSS)
+- Maior diferença de probabilidade em relação ao PyTorch
+
+Cada backend roda em um subprocesso separado, para que o pico de memória
+de um não contamine o outro.
+
+Uso:
+    python src/export_model.py --format torchscript
+    python src/export_model.py --format onnx
+    python benchmarks/bench_backends.py --model-path models/best_model
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from inference_backends import BACKENDS, EXPORT_FILES
+
+DEFAULT_DATA = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+
+
+def run_backend(backend: str, model_path: str, data_path: str, batch_size: int, repeat: int) -> dict:
+    """Executa a medição de um backend no processo atual."""
+    import pandas as pd
+    import torch
+    from hybrid_classifier import HybridClassifier
+    from score_calculator import ScoreCalculator
+
+    df = pd.read_excel(data_path, engine="openpyxl", index_col="ID")
+    texts = df["Texto Mascarado"].astype(str).tolist()
+    labels = df["Label"].tolist()
+
+    torch.set_num_threads(os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    hybrid = HybridClassifier(model_path=model_path, device="cpu", backend=backend)
+    # O BERT é carregado sob demanda: warmup() o carrega dentro da medição
+    hybrid.warmup(ner=False)
+    load_time = time.perf_counter() - start
+
+    # Aquecimento (primeira execução aloca buffers)
+    hybrid._get_bert_probabilities(texts[:batch_size], batch_size=batch_size)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        probs = hybrid._get_bert_probabilities(texts, batch_size=batch_size)
+    bert_time = (time.perf_counter() - start) / repeat
+
+    # Carga do spaCy fora da medição do híbrido (igual para todas as variantes)
+    hybrid.warmup(ner=True)
+    start = time.perf_counter()
+    results = hybrid.predict_batch(texts, batch_size=batch_size)
+    hybrid_time = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "probs": probs,
+        "bert_f1": ScoreCalculator.calculate_f1(labels, [1 if p >= 0.5 else 0 for p in probs]),
+        "hybrid_f1": ScoreCalculator.calculate_f1(labels, [1 if r["is_pii"] else 0 for r in results]),
+        "bert_ms_per_text": 1000 * bert_time / len(texts),
+        "hybrid_texts_per_s": len(texts) / hybrid_time,
+        "load_s": load_time,
+        # ru_maxrss é em KB no Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends torch, TorchScript e ONNX")
+    parser.add_argument("--model-path", type=str, default="models/best_model", help="Diretório do modelo salvo, com os grafos exportados.")
+    parser.add_argument("--data", type=str, default=DEFAULT_DATA, help="Arquivo processado com 'Texto Mascarado' e 'Label'.")
+    parser.add_argument("--batch-size", type=int, default=32, help="Tamanho do lote de inferência.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições da medição de latência do BERT.")
+    parser.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        # Modo subprocesso: mede um backend e imprime o resultado em JSON
+        print(json.dumps(run_backend(args.backend, args.model_path, args.data, args.batch_size, args.repeat)))
+        return
+
+    results = {}
+    for backend in BACKENDS:
+        graph = EXPORT_FILES.get(backend)
+        if graph and not os.path.exists(os.path.join(args.model_path, graph)):
+            print(f"Ignorando '{backend}': {graph} não encontrado (rode src/export_model.py --format {backend}).")
+            continue
+        output = subprocess.run(
+            [sys.executable, __file__, "--backend", backend, "--model-path", args.model_path,
+             "--data", args.data, "--batch-size", str(args.batch_size), "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[backend] = json.loads(output.strip().splitlines()[-1])
+
+    reference = results["torch"]["probs"] if "torch" in results else None
+    for result in results.values():
+        if reference is not None:
+            result["max_prob_diff"] = max(abs(a - b) for a, b in zip(result["probs"], reference))
+
+    rows = [
+        ("F1 BERT puro", "bert_f1", "{:.4f}"),
+        ("F1 Híbrido", "hybrid_f1", "{:.4f}"),
+        ("BERT (ms/texto)", "bert_ms_per_text", "{:.2f}"),
+        ("Híbrido (textos/s)", "hybrid_texts_per_s", "{:.1f}"),
+        ("Carga (s)", "load_s", "{:.2f}"),
+        ("Pico de RSS (MB)", "peak_rss_mb", "{:.0f}"),
+        ("Dif. máx. vs torch", "max_prob_diff", "{:.1e}"),
+    ]
+
+    width = 22 + 14 * len(results)
+    print("=" * width)
+    print(f"{'Métrica':<22}" + "".join(f"{backend:>14}" for backend in results))
+    print("=" * width)
+    for label, key, fmt in rows:
+        cells = [fmt.format(result[key]) if key in result else "-" for result in results.values()]
+        print(f"{label:<22}" + "".join(f"{cell:>14}" for cell in cells))
+    print("=" * width)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Leitura e escrita do conjunto processado: Excel vs. CSV vs. Parquet vs. Feather.
+
+Replica as linhas de data/processed até o tamanho pedido e mede, para cada
+formato, o tempo de gravação, o tamanho do arquivo, a leitura completa e a
+leitura só das colunas usadas no treino (texto e rótulo), que é o que cada
+trial do Optuna fazia ao reabrir o .xlsx.
+
+Uso:
+    python benchmarks/bench_io.py --rows 10000 100000
+    python benchmarks/bench_io.py --formats .parquet .feather   # pula o Excel (lento)
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_io import TABLE_FORMATS, read_table, write_table
+
+SOURCE = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+# Mesmas colunas de train.TRAINING_COLUMNS (importar train carregaria o torch)
+TRAINING_COLUMNS = ["Texto Mascarado", "Label"]
+
+
+def make_frame(source: pd.DataFrame, rows: int) -> pd.DataFrame:
+    """Repete as linhas de `source` até `rows`, com IDs únicos."""
+    repeats = -(-rows // len(source))
+    df = pd.concat([source] * repeats).iloc[:rows].copy()
+    df.index = pd.Index(range(1, rows + 1), name="ID")
+    return df
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leitura/escrita do conjunto processado por formato")
+    parser.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000], help="Tamanhos a medir.")
+    parser.add_argument("--formats", nargs="+", default=list(TABLE_FORMATS), help="Extensões a comparar.")
+    args = parser.parse_args()
+
+    source = read_table(SOURCE)
+
+    print("=" * 78)
+    print(f"{'Linhas':>10}{'Formato':>10}{'Escrita (s)':>13}{'Tamanho (MB)':>14}"
+          f"{'Leitura (s)':>13}{'Só treino (s)':>15}{'Igual':>8}")
+    print("=" * 78)
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            df = make_frame(source, rows)
+            for extension in args.formats:
+                path = os.path.join(tmp, f"dados{extension}")
+                write_seconds = timed(lambda: write_table(df, path))
+                size_mb = os.path.getsize(path) / 1024 ** 2
+
+                start = time.perf_counter()
+                loaded = read_table(path)
+                read_seconds = time.perf_counter() - start
+                columns_seconds = timed(lambda: read_table(path, columns=TRAINING_COLUMNS))
+
+                same = loaded[TRAINING_COLUMNS].astype(str).equals(df[TRAINING_COLUMNS].astype(str))
+                print(f"{rows:>10,}{extension:>10}{write_seconds:>13.2f}{size_mb:>14.1f}"
+                      f"{read_seconds:>13.2f}{columns_seconds:>15.3f}{str(same):>8}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Etapas de Regex e rótulos do pré-processamento: linha a linha vs. por coluna.
+
+Compara, sobre os textos de data/raw repetidos até `--rows` linhas:
+- flags de Regex: `Series.apply(validate_all_types).apply(pd.Series)` (um dict e
+  uma Series por linha) vs. `Validator.validate_columns` (um array por padrão);
+- rótulo: `df.apply(generate_labels, axis=1)` vs. `generate_label_column`.
+
+Confere que os DataFrames gerados são idênticos.
+
+Uso:
+    python benchmarks/bench_labels.py --rows 1000000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from validator import Validator
+from preprocessing import Preprocessor
+
+DEFAULT_FILES = [
+    "data/raw/AMOSTRA_e-SIC.xlsx",
+    "data/raw/Hackathon Participa DF Data.xlsx",
+]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regex e rótulos: linha a linha vs. por coluna")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Número de linhas.")
+    parser.add_argument("--files", nargs="+", default=DEFAULT_FILES, help="Arquivos Excel com a coluna 'Texto Mascarado'.")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    texts: list[str] = []
+    for path in args.files:
+        texts += pd.read_excel(path, engine="openpyxl")["Texto Mascarado"].apply(Preprocessor.safe_clean).tolist()
+    texts = (texts * (args.rows // len(texts) + 1))[:args.rows]
+    series = pd.Series(texts, index=pd.Index(range(1, args.rows + 1), name="ID"), name="Texto Mascarado")
+    print(f"{args.rows:,} linhas ({len(set(texts))} textos distintos)")
+
+    old_flags, old_regex = timed(lambda: series.apply(Validator.validate_all_types).apply(pd.Series).astype(int))
+    new_flags, new_regex = timed(
+        lambda: pd.DataFrame(Validator.validate_columns(series.tolist()), index=series.index).astype(int)
+    )
+
+    # Sinais de NER sintéticos: o rótulo só depende das colunas
+    df = series.to_frame().join(new_flags)
+    df["has_person_entity"] = [int(i % 7 == 0) for i in range(len(df))]
+    old_labels, old_label_time = timed(lambda: df.apply(Preprocessor.generate_labels, axis=1))
+    new_labels, new_label_time = timed(lambda: Preprocessor.generate_label_column(df))
+
+    print("=" * 64)
+    print(f"{'Etapa':<16}{'Linha a linha (s)':>18}{'Por coluna (s)':>16}{'Speedup':>9}{'Igual':>7}")
+    print("=" * 64)
+    for name, old, new, same in (
+        ("Flags de Regex", old_regex, new_regex, old_flags.equals(new_flags)),
+        ("Rótulos", old_label_time, new_label_time, old_labels.equals(new_labels)),
+    ):
+        print(f"{name:<16}{old:>18.2f}{new:>16.2f}{old / new:>8.1f}x{str(same):>7}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
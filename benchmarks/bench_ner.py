@@ -0,0 +1,79 @@
+"""
+Benchmark do pipeline spaCy do NamedEntityDetector: completo vs. enxuto.
+
+O detector só lê `doc.ents`. O pipeline completo também roda tagger, parser,
+lemmatizer e attribute_ruler em cada texto; o enxuto (padrão) carrega apenas o
+necessário para o NER. Para cada variante reporta, nos textos da AMOSTRA:
+- Componentes ativos e tempo de carga
+- Latência por documento (`extract_signals`, um texto por vez)
+- Vazão em lote (`extract_signals_batch`, nlp.pipe)
+Também confere se os sinais extraídos são idênticos.
+
+Uso:
+    python benchmarks/bench_ner.py --model-name pt_core_news_lg
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ner_detector import NamedEntityDetector
+
+DEFAULT_DATA = "data/raw/AMOSTRA_e-SIC.xlsx"
+
+
+def measure(detector: NamedEntityDetector, texts: list[str], repeat: int) -> tuple[float, float, list]:
+    """Retorna (ms por documento, textos/s em lote, sinais)."""
+    detector.extract_signals_batch(texts[:10])  # Aquecimento
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            detector.extract_signals(text)
+    per_doc = (time.perf_counter() - start) / (repeat * len(texts))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        signals = detector.extract_signals_batch(texts)
+    batch = (time.perf_counter() - start) / repeat
+
+    return 1000 * per_doc, len(texts) / batch, signals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline spaCy completo vs. enxuto")
+    parser.add_argument("--model-name", type=str, default="pt_core_news_lg", help="Modelo spaCy (ou diretório de um pipeline salvo).")
+    parser.add_argument("--data", type=str, default=DEFAULT_DATA, help="Arquivo Excel com a coluna 'Texto Mascarado'.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições da medição.")
+    args = parser.parse_args()
+
+    texts = pd.read_excel(args.data, engine="openpyxl")["Texto Mascarado"].fillna("").astype(str).tolist()
+
+    results = {}
+    for label, keep in (("Completo", None), ("Enxuto", "default")):
+        start = time.perf_counter()
+        if keep is None:
+            detector = NamedEntityDetector(args.model_name, keep_components=None)
+        else:
+            detector = NamedEntityDetector(args.model_name)
+        load_time = time.perf_counter() - start
+
+        per_doc_ms, texts_per_s, signals = measure(detector, texts, args.repeat)
+        results[label] = signals
+
+        print(f"\n{label}: {', '.join(detector.nlp.pipe_names)}")
+        print(f"  Carga:             {load_time:.2f}s")
+        print(f"  Por documento:     {per_doc_ms:.2f} ms")
+        print(f"  Em lote:           {texts_per_s:,.0f} textos/s")
+
+    mismatches = sum(a != b for a, b in zip(results["Completo"], results["Enxuto"]))
+    print(f"\n{len(texts)} textos x {args.repeat} | Divergências nos sinais: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Escalabilidade do NER (spaCy nlp.pipe) com vários processos.
+
+Roda `NamedEntityDetector.extract_signals_batch` com 1, 2, 4 e 8 processos
+sobre os textos de data/raw e reporta vazão, speedup em relação a 1 processo
+e se a saída (inclusive a ordem) é idêntica.
+
+Uso:
+    python benchmarks/bench_ner_processes.py --processes 1 2 4 8 --batch-size 64
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ner_detector import NamedEntityDetector
+
+DEFAULT_FILES = [
+    "data/raw/AMOSTRA_e-SIC.xlsx",
+    "data/raw/Hackathon Participa DF Data.xlsx",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalabilidade do NER com vários processos")
+    parser.add_argument("--model-name", type=str, default="pt_core_news_lg", help="Modelo spaCy (ou diretório de um pipeline salvo).")
+    parser.add_argument("--files", nargs="+", default=DEFAULT_FILES, help="Arquivos Excel com a coluna 'Texto Mascarado'.")
+    parser.add_argument("--processes", nargs="+", type=int, default=[1, 2, 4, 8], help="Números de processos a medir.")
+    parser.add_argument("--batch-size", type=int, default=None, help="Textos por lote do nlp.pipe (padrão do spaCy se omitido).")
+    parser.add_argument("--multiply", type=int, default=1, help="Repete o corpus N vezes para medições mais estáveis.")
+    args = parser.parse_args()
+
+    texts: list[str] = []
+    for path in args.files:
+        texts += pd.read_excel(path, engine="openpyxl")["Texto Mascarado"].fillna("").astype(str).tolist()
+    texts *= args.multiply
+
+    detector = NamedEntityDetector(args.model_name)
+    print(f"{len(texts)} textos | pipeline: {', '.join(detector.nlp.pipe_names)} | "
+          f"batch_size: {args.batch_size or 'padrão'} | núcleos: {os.cpu_count()}")
+
+    reference = None
+    baseline = None
+    print("=" * 60)
+    print(f"{'Processos':>10}{'Tempo (s)':>12}{'Textos/s':>12}{'Speedup':>10}{'Idêntico':>12}")
+    print("=" * 60)
+    for n_process in args.processes:
+        start = time.perf_counter()
+        signals = detector.extract_signals_batch(texts, n_process=n_process, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference, baseline = signals, elapsed
+        print(f"{n_process:>10}{elapsed:>12.2f}{len(texts) / elapsed:>12,.0f}"
+              f"{baseline / elapsed:>9.2f}x{str(signals == reference):>12}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
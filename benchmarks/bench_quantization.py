@@ -0,0 +1,131 @@
+"""
+Compara o modelo BERT fp32 com a versão quantizada (int8 dinâmico) em CPU.
+
+Para cada variante reporta, no conjunto AMOSTRA processado:
+- F1 (ScoreCalculator) do BERT puro e do Classificador Híbrido
+- Latência de inferência do BERT (ms por texto) e vazão do Híbrido
+- Tempo de carga (incluindo a quantização), tamanho dos pesos serializados e
+  pico de memória (RSS)
+
+Cada variante roda em um subprocesso separado, para que o pico de memória
+de uma não contamine a outra.
+
+Uso:
+    python benchmarks/bench_quantization.py --model-path models/best_model
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+DEFAULT_DATA = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+VARIANTS = ("fp32", "int8")
+
+
+def run_variant(variant: str, model_path: str, data_path: str, batch_size: int, repeat: int) -> dict:
+    """Executa a medição de uma variante no processo atual."""
+    import pandas as pd
+    import torch
+    from hybrid_classifier import HybridClassifier
+    from piiclassifier import PIIClassifier
+    from score_calculator import ScoreCalculator
+
+    df = pd.read_excel(data_path, engine="openpyxl", index_col="ID")
+    texts = df["Texto Mascarado"].astype(str).tolist()
+    labels = df["Label"].tolist()
+
+    torch.set_num_threads(os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    hybrid = HybridClassifier(model_path=model_path, device="cpu", quantize=(variant == "int8"))
+    # O BERT é carregado sob demanda: warmup() o carrega dentro da medição
+    hybrid.warmup(ner=False)
+    load_time = time.perf_counter() - start
+
+    # Aquecimento (primeira execução aloca buffers)
+    hybrid._get_bert_probabilities(texts[:batch_size], batch_size=batch_size)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        probs = hybrid._get_bert_probabilities(texts, batch_size=batch_size)
+    bert_time = (time.perf_counter() - start) / repeat
+
+    # Carga do spaCy fora da medição do híbrido (igual para todas as variantes)
+    hybrid.warmup(ner=True)
+    start = time.perf_counter()
+    results = hybrid.predict_batch(texts, batch_size=batch_size)
+    hybrid_time = time.perf_counter() - start
+
+    if variant == "int8":
+        # A versão int8 só existe em memória: mede o tamanho dos pesos serializados
+        buffer = io.BytesIO()
+        torch.save(hybrid.bert_model.state_dict(), buffer)
+        weights_bytes = buffer.tell()
+    else:
+        weights_bytes = os.path.getsize(os.path.join(model_path, PIIClassifier.weights_file(model_path)))
+
+    return {
+        "variant": variant,
+        "bert_f1": ScoreCalculator.calculate_f1(labels, [1 if p >= 0.5 else 0 for p in probs]),
+        "hybrid_f1": ScoreCalculator.calculate_f1(labels, [1 if r["is_pii"] else 0 for r in results]),
+        "bert_ms_per_text": 1000 * bert_time / len(texts),
+        "hybrid_texts_per_s": len(texts) / hybrid_time,
+        "load_s": load_time,
+        "weights_mb": weights_bytes / 2**20,
+        # ru_maxrss é em KB no Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fp32 vs int8 (quantização dinâmica)")
+    parser.add_argument("--model-path", type=str, default="models/best_model", help="Diretório do modelo salvo.")
+    parser.add_argument("--data", type=str, default=DEFAULT_DATA, help="Arquivo processado com 'Texto Mascarado' e 'Label'.")
+    parser.add_argument("--batch-size", type=int, default=32, help="Tamanho do lote de inferência.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições da medição de latência do BERT.")
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        # Modo subprocesso: mede uma variante e imprime o resultado em JSON
+        print(json.dumps(run_variant(args.variant, args.model_path, args.data, args.batch_size, args.repeat)))
+        return
+
+    results = {}
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--variant", variant, "--model-path", args.model_path,
+             "--data", args.data, "--batch-size", str(args.batch_size), "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[variant] = json.loads(output.strip().splitlines()[-1])
+
+    fp32, int8 = results["fp32"], results["int8"]
+    rows = [
+        ("F1 BERT puro", "bert_f1", "{:.4f}"),
+        ("F1 Híbrido", "hybrid_f1", "{:.4f}"),
+        ("BERT (ms/texto)", "bert_ms_per_text", "{:.2f}"),
+        ("Híbrido (textos/s)", "hybrid_texts_per_s", "{:.1f}"),
+        ("Carga (s)", "load_s", "{:.2f}"),
+        ("Pesos em disco (MB)", "weights_mb", "{:.1f}"),
+        ("Pico de RSS (MB)", "peak_rss_mb", "{:.0f}"),
+    ]
+
+    print("=" * 64)
+    print(f"{'Métrica':<22}{'fp32':>12}{'int8':>12}{'Variação':>16}")
+    print("=" * 64)
+    for label, key, fmt in rows:
+        change = (int8[key] - fp32[key]) / fp32[key] if fp32[key] else 0.0
+        print(f"{label:<22}{fmt.format(fp32[key]):>12}{fmt.format(int8[key]):>12}{change:>+15.1%}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
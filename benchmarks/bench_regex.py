@@ -0,0 +1,70 @@
+"""
+Benchmark do scanner Regex combinado do Validator.
+
+Compara a busca padrão a padrão (cinco `pattern.search` por texto, via
+`_safe_search`) com o scanner combinado de `validate_all_types`, usando os
+textos de data/raw. Também confere se os resultados são idênticos.
+
+Uso:
+    python benchmarks/bench_regex.py --repeat 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from validator import Validator
+
+DEFAULT_FILES = [
+    "data/raw/AMOSTRA_e-SIC.xlsx",
+    "data/raw/Hackathon Participa DF Data.xlsx",
+]
+
+
+def per_pattern(text: str) -> dict[str, bool]:
+    """Implementação anterior: uma busca separada por padrão."""
+    return Validator._validate_per_pattern(text)
+
+
+def time_it(fn, texts: list[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do scanner Regex combinado")
+    parser.add_argument("--files", nargs="+", default=DEFAULT_FILES, help="Arquivos Excel com a coluna 'Texto Mascarado'.")
+    parser.add_argument("--repeat", type=int, default=50, help="Número de repetições sobre o corpus.")
+    args = parser.parse_args()
+
+    for path in args.files:
+        texts = pd.read_excel(path, engine="openpyxl")["Texto Mascarado"].fillna("").astype(str).tolist()
+
+        mismatches = sum(per_pattern(t) != Validator.validate_all_types(t) for t in texts)
+
+        old = time_it(per_pattern, texts, args.repeat)
+        new = time_it(Validator.validate_all_types, texts, args.repeat)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            Validator.validate_batch(texts)
+        batch = time.perf_counter() - start
+        n = len(texts) * args.repeat
+
+        print(f"\n{path} ({len(texts)} textos x {args.repeat})")
+        print(f"  Padrão a padrão: {old:.3f}s ({n / old:,.0f} textos/s)")
+        print(f"  Scanner único:   {new:.3f}s ({n / new:,.0f} textos/s)")
+        print(f"  Lote (NumPy):    {batch:.3f}s ({n / batch:,.0f} textos/s)")
+        print(f"  Speedup:         {old / new:.2f}x")
+        print(f"  Divergências:    {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Escalabilidade da etapa de Regex do pré-processamento com vários processos.
+
+Roda `Validator.validate_columns` com 1, 2, 4 e 8 processos sobre os textos do
+dataset bruto do Hackathon e reporta vazão, speedup em relação a 1 processo e
+se as flags (inclusive a ordem) são idênticas.
+
+Uso:
+    python benchmarks/bench_regex_workers.py --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from validator import Validator
+from preprocessing import Preprocessor
+
+DEFAULT_FILES = ["data/raw/Hackathon Participa DF Data.xlsx"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalabilidade da etapa de Regex com vários processos")
+    parser.add_argument("--files", nargs="+", default=DEFAULT_FILES, help="Arquivos Excel com a coluna 'Texto Mascarado'.")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8], help="Números de processos a medir.")
+    parser.add_argument("--multiply", type=int, default=200, help="Repete o corpus N vezes para medições mais estáveis.")
+    args = parser.parse_args()
+
+    texts: list[str] = []
+    for path in args.files:
+        texts += pd.read_excel(path, engine="openpyxl")["Texto Mascarado"].apply(Preprocessor.safe_clean).tolist()
+    texts *= args.multiply
+    print(f"{len(texts)} textos | {sum(map(len, texts)) / 1e6:.1f}M caracteres | núcleos: {os.cpu_count()}")
+
+    reference = None
+    baseline = None
+    print("=" * 60)
+    print(f"{'Processos':>10}{'Tempo (s)':>12}{'Textos/s':>12}{'Speedup':>10}{'Idêntico':>12}")
+    print("=" * 60)
+    for n_workers in args.workers:
+        start = time.perf_counter()
+        columns = Validator.validate_columns(texts, n_workers=n_workers)
+        elapsed = time.perf_counter() - start
+
+        flags = {key: values.tolist() for key, values in columns.items()}
+        if reference is None:
+            reference, baseline = flags, elapsed
+        print(f"{n_workers:>10}{elapsed:>12.2f}{len(texts) / elapsed:>12,.0f}"
+              f"{baseline / elapsed:>9.2f}x{str(flags == reference):>12}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Mede o tempo de inicialização do pipeline (imports e carga dos modelos).
+
+Cada medição roda em um processo Python novo, para que módulos já importados
+por uma etapa não mascarem o custo da seguinte:
+1. Tempo de import de cada módulo (projeto e dependências pesadas)
+2. Carga sob demanda: HybridClassifier + predict_batch só com textos decididos
+   pelo Regex (CPF, CNPJ, e-mail, RG). BERT e spaCy não devem ser carregados.
+3. Carga antecipada: HybridClassifier + warmup() (BERT e NER), se o modelo existir
+
+Uso:
+    python benchmarks/bench_startup.py --model-path models/best_model
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+IMPORTS = [
+    "validator",
+    "hybrid_classifier",
+    "numpy",
+    "pandas",
+    "torch",
+    "transformers",
+    "spacy",
+    "piiclassifier",
+    "ner_detector",
+]
+
+HEAVY_MODULES = ("torch", "transformers", "spacy", "onnxruntime")
+
+REGEX_TEXTS = [
+    "Meu CPF é 123.456.789-09, favor atualizar o cadastro.",
+    "Segue o CNPJ da empresa: 12.345.678/0001-95",
+    "Responder para maria.souza@exemplo.com.br",
+    "RG 12.345.678-X emitido pela SSP/DF",
+]
+
+LAZY_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+from hybrid_classifier import HybridClassifier
+classifier = HybridClassifier(model_path={model_path!r})
+results = classifier.predict_batch({texts!r} * 250)
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "all_pii": all(r["is_pii"] for r in results),
+    "heavy_loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+WARMUP_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+from hybrid_classifier import HybridClassifier
+classifier = HybridClassifier(model_path={model_path!r}).warmup()
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+
+def run_snippet(code: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def time_import(module: str) -> float | None:
+    code = (
+        "import json, sys, time\n"
+        f"sys.path.insert(0, {SRC!r})\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps({'seconds': time.perf_counter() - start}))\n"
+    )
+    try:
+        return run_snippet(code)["seconds"]
+    except subprocess.CalledProcessError:
+        return None  # Dependência não instalada
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização (imports e carga sob demanda)")
+    parser.add_argument("--model-path", type=str, default="models/best_model", help="Diretório do modelo salvo.")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("TEMPO DE IMPORT (processo novo)")
+    print("=" * 50)
+    for module in IMPORTS:
+        seconds = time_import(module)
+        print(f"  {module:<20}{'não instalado' if seconds is None else f'{seconds:.3f}s':>14}")
+
+    print("\n" + "=" * 50)
+    print("CARGA SOB DEMANDA (apenas textos decididos pelo Regex)")
+    print("=" * 50)
+    lazy = run_snippet(LAZY_SNIPPET.format(
+        src=SRC, model_path=args.model_path, texts=REGEX_TEXTS, heavy=HEAVY_MODULES
+    ))
+    print(f"  Import + init + {len(REGEX_TEXTS) * 250} textos: {lazy['seconds']:.3f}s")
+    print(f"  Todos classificados como PII:  {lazy['all_pii']}")
+    print(f"  Módulos pesados carregados:    {', '.join(lazy['heavy_loaded']) or 'nenhum'}")
+
+    print("\n" + "=" * 50)
+    print("CARGA ANTECIPADA (warmup: BERT + NER)")
+    print("=" * 50)
+    try:
+        eager = run_snippet(WARMUP_SNIPPET.format(src=SRC, model_path=args.model_path))
+        print(f"  Import + init + warmup():      {eager['seconds']:.3f}s")
+    except subprocess.CalledProcessError as e:
+        print(f"  Não foi possível carregar os modelos: {e.stderr.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
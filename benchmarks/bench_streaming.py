@@ -0,0 +1,87 @@
+"""
+Pico de memória do pré-processamento: arquivo inteiro vs. streaming em blocos.
+
+Gera planilhas sintéticas de tamanhos crescentes (repetindo os textos de
+data/raw) e roda `Preprocessor.process_file` em um subprocesso por medição,
+com e sem `chunk_size`. No modo streaming o pico de RSS deve ficar estável
+conforme o arquivo cresce.
+
+Uso:
+    python benchmarks/bench_streaming.py --rows 10000 50000 --chunk-size 5000
+    python benchmarks/bench_streaming.py --clean-only   # sem Regex/NER, só I/O
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_io import ChunkWriter
+
+SOURCE = "data/raw/AMOSTRA_e-SIC.xlsx"
+
+RUN_SNIPPET = """
+import json, logging, resource, sys, time
+sys.path.insert(0, {src!r})
+logging.disable(logging.INFO)
+from preprocessing import Preprocessor
+start = time.perf_counter()
+Preprocessor().process_file({input!r}, {output!r}, clean_only={clean_only!r}, chunk_size={chunk_size!r})
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+
+def make_input(path: str, rows: int, texts: list[str]):
+    """Grava uma planilha com `rows` linhas (ID, Texto Mascarado) sem montá-la em memória."""
+    with ChunkWriter(path) as writer:
+        for start in range(0, rows, 10_000):
+            ids = range(start + 1, min(start + 10_000, rows) + 1)
+            chunk = pd.DataFrame(
+                {"Texto Mascarado": [texts[i % len(texts)] for i in ids]},
+                index=pd.Index(ids, name="ID")
+            )
+            writer.write(chunk)
+
+
+def run(input_path: str, output_path: str, clean_only: bool, chunk_size: int | None) -> dict:
+    code = RUN_SNIPPET.format(
+        src=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'),
+        input=input_path, output=output_path, clean_only=clean_only, chunk_size=chunk_size
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pico de memória: arquivo inteiro vs. streaming")
+    parser.add_argument("--rows", nargs="+", type=int, default=[10_000, 50_000], help="Tamanhos de entrada a medir.")
+    parser.add_argument("--chunk-size", type=int, default=5_000, help="Linhas por bloco no modo streaming.")
+    parser.add_argument("--clean-only", action="store_true", help="Mede só limpeza e I/O (sem Regex/NER).")
+    args = parser.parse_args()
+
+    texts = pd.read_excel(SOURCE, engine="openpyxl")["Texto Mascarado"].fillna("").astype(str).tolist()
+
+    print("=" * 66)
+    print(f"{'Linhas':>10}{'Modo':>14}{'Tempo (s)':>14}{'Pico RSS (MB)':>16}")
+    print("=" * 66)
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            input_path = os.path.join(tmp, f"input_{rows}.xlsx")
+            make_input(input_path, rows, texts)
+            for label, chunk_size in (("inteiro", None), (f"blocos {args.chunk_size}", args.chunk_size)):
+                result = run(input_path, os.path.join(tmp, "output.xlsx"), args.clean_only, chunk_size)
+                print(f"{rows:>10,}{label:>14}{result['seconds']:>14.1f}{result['peak_rss_mb']:>16.0f}")
+    print("=" * 66)
+
+
+if __name__ == "__main__":
+    main()
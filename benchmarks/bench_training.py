@@ -0,0 +1,70 @@
+"""
+Vazão do treino por configuração de precisão e acumulação de gradientes.
+
+Cada configuração é "precisão:lote_efetivo:micro_lote" (ex.: "bf16:32:8" roda em
+bf16, com lotes de 8 exemplos e um passo do otimizador a cada 4 lotes). Para cada
+uma, treina 1 época do ModelTrainer sobre as primeiras `--rows` linhas do
+conjunto processado e reporta passos do otimizador por segundo e exemplos por
+segundo.
+
+Uso:
+    python benchmarks/bench_training.py --configs fp32:16:16 bf16:16:16 bf16:32:8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_io import resolve_table_path
+from train import ModelTrainer, load_training_data
+
+DEFAULT_DATA = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Passos/s do treino por precisão e acumulação de gradientes")
+    parser.add_argument("--data", type=str, default=None, help=f"Arquivo processado (padrão: {DEFAULT_DATA} ou o .parquet ao lado).")
+    parser.add_argument("--configs", nargs="+", default=["fp32:16:16", "bf16:16:16", "bf16:32:8"],
+                        help="Configurações no formato precisão:lote_efetivo:micro_lote.")
+    parser.add_argument("--rows", type=int, default=256, help="Linhas usadas no treino.")
+    parser.add_argument("--device", type=str, default=None, help="Device ('cuda', 'mps' ou 'cpu'); padrão: detecta.")
+    args = parser.parse_args()
+
+    df = load_training_data(args.data or resolve_table_path(DEFAULT_DATA)).head(args.rows)
+    print(f"{len(df)} exemplos, 1 época por configuração")
+
+    print("=" * 72)
+    print(f"{'Configuração':<14}{'Precisão':>10}{'Lote':>12}{'Tempo (s)':>12}{'Passos/s':>12}{'Exemplos/s':>12}")
+    print("=" * 72)
+    for config in args.configs:
+        precision, batch_size, micro_batch_size = config.split(":")
+        trainer = ModelTrainer(
+            data_path="",
+            model_save_path=os.devnull,
+            batch_size=int(batch_size),
+            epochs=1,
+            device=args.device,
+            precision=precision,
+            micro_batch_size=int(micro_batch_size),
+            validation_split=0,  # Só a época de treino entra na medição
+        )
+        trainer.load_data(df)
+        trainer.prepare_model()
+        # train() também salva o modelo; aqui só o tempo da época importa
+        trainer.save_model = lambda: None
+
+        start = time.perf_counter()
+        metrics = trainer.train()
+        elapsed = time.perf_counter() - start
+
+        batch = f"{trainer.accumulation_steps}x{trainer.micro_batch_size}"
+        print(f"{config:<14}{trainer.precision:>10}{batch:>12}{elapsed:>12.2f}"
+              f"{metrics['steps_per_second']:>12.2f}{len(df) / elapsed:>12.1f}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
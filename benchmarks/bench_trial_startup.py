@@ -0,0 +1,67 @@
+"""
+Tempo de preparação de um trial do Optuna: antes vs. depois do compartilhamento.
+
+- Antes: cada trial cria o próprio `PIIClassifier` (AutoModel + AutoTokenizer
+  `from_pretrained`) e os próprios datasets (outro AutoTokenizer).
+- Depois: o modelo base, o tokenizer e os datasets tokenizados são carregados
+  uma vez por processo (`tune.new_trial_model` / `tune.load_datasets_once`) e
+  cada trial recebe uma cópia em memória do modelo.
+
+Reporta o tempo de `load_data` + `prepare_model` de cada trial. O primeiro trial
+do modo compartilhado inclui a carga única.
+
+Uso:
+    python benchmarks/bench_trial_startup.py --trials 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tune
+from data_io import resolve_table_path
+from train import ModelTrainer
+
+
+def startup_times(data_path: str, trials: int, shared: bool) -> list[float]:
+    times = []
+    for _ in range(trials):
+        start = time.perf_counter()
+        trainer = ModelTrainer(data_path=data_path, model_save_path=os.devnull, model_name=tune.BASE_MODEL_NAME, device="cpu")
+        if shared:
+            trainer.load_data(datasets=tune.load_datasets_once(data_path))
+            trainer.prepare_model(tune.new_trial_model())
+        else:
+            trainer.load_data(tune.load_data_once(data_path))
+            trainer.prepare_model()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preparação de trials: recursos por trial vs. compartilhados")
+    parser.add_argument("--data", type=str, default=None, help=f"Arquivo processado (padrão: {tune.DEFAULT_DATA_PATH} ou o .parquet ao lado).")
+    parser.add_argument("--trials", type=int, default=5, help="Trials simulados em cada modo.")
+    args = parser.parse_args()
+    data_path = args.data or resolve_table_path(tune.DEFAULT_DATA_PATH)
+
+    # Lê os dados antes: os dois modos partem do mesmo DataFrame em memória
+    tune.load_data_once(data_path)
+    before = startup_times(data_path, args.trials, shared=False)
+    after = startup_times(data_path, args.trials, shared=True)
+
+    print("=" * 48)
+    print(f"{'Trial':>6}{'Antes (s)':>14}{'Depois (s)':>14}{'Speedup':>12}")
+    print("=" * 48)
+    for i, (old, new) in enumerate(zip(before, after)):
+        print(f"{i:>6}{old:>14.2f}{new:>14.2f}{old / new:>11.1f}x")
+    print("-" * 48)
+    print(f"{'Total':>6}{sum(before):>14.2f}{sum(after):>14.2f}{sum(before) / sum(after):>11.1f}x")
+    print("=" * 48)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,7 +24,7 @@ def exemplo_classificacao_simples():
     
     # Textos de exemplo
     textos = [
-        "Meu CPF é 123.456.789-00 e meu telefone é (61) 99999-9999",
+        "Meu CPF é 123.456.789-09 e meu telefone é (61) 99999-9999",
         "A reunião será amanhã às 14h no auditório principal",
         "Entre em contato pelo email: joao.silva@exemplo.com",
         "O projeto foi aprovado com 95% dos votos",
@@ -60,7 +60,7 @@ def exemplo_processamento_lote():
     dados = {
         'ID': [1, 2, 3, 4, 5],
         'Texto': [
-            "CPF: 123.456.789-00",
+            "CPF: 123.456.789-09",
             "Reunião às 15h",
             "Email: contato@empresa.com",
             "Telefone: (61) 3333-4444",
@@ -191,7 +191,7 @@ def exemplo_comparacao():
     pares = [
         (
             "João da Silva enviou o documento",
-            "João da Silva, CPF 123.456.789-00, enviou o documento"
+            "João da Silva, CPF 123.456.789-09, enviou o documento"
         ),
         (
             "Ligue para 3333-4444",
@@ -234,14 +234,14 @@ def exemplo_estatisticas():
     
     # Textos de exemplo
     textos = [
-        "CPF: 123.456.789-00",
+        "CPF: 123.456.789-09",
         "Reunião às 15h",
         "Email: teste@exemplo.com",
         "Projeto aprovado",
         "Telefone: (61) 99999-9999",
         "João Silva participou",
         "Documento assinado",
-        "CNPJ: 12.345.678/0001-90",
+        "CNPJ: 12.345.678/0001-95",
         "Relatório finalizado",
         "RG: 12.345.678-9",
     ]
@@ -0,0 +1,342 @@
+"""
+Calibração dos thresholds de decisão do HybridClassifier.
+
+As regras do classificador híbrido dependem de três thresholds do BERT
+(alta confiança, faixa moderada com NER e telefone). Testar valores novos com
+`evaluate_hybrid.py` exige rodar o BERT no conjunto inteiro a cada tentativa.
+
+Aqui o conjunto é avaliado uma única vez: probabilidade do BERT, flags de Regex
+e sinais do NER de cada texto ficam em um arquivo de arrays compacto
+(`models/cache/calibration_scores.npz`). A busca em grade sobre os thresholds é
+feita em NumPy sobre esses arrays, em segundos, e os melhores valores são
+gravados em `models/best_model/thresholds.json`, que o HybridClassifier carrega.
+
+O arquivo de scores é reaproveitado enquanto os pesos do modelo, os textos, os
+rótulos e o modo do BERT forem os mesmos; caso contrário, é recalculado.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# Garante que src está no path
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+from data_io import read_table, resolve_table_path
+from hybrid_classifier import DEFAULT_THRESHOLD, THRESHOLDS_FILE, HybridClassifier, default_routing_thresholds
+from prediction_cache import model_fingerprint
+from validator import Validator
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_PATH = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+DEFAULT_MODEL_PATH = "models/best_model"
+DEFAULT_SCORES_PATH = "models/cache/calibration_scores.npz"
+DEFAULT_GRID_STEP = 0.05
+
+# Eixos da busca, na ordem dos índices do array de F1: [high_confidence, moderate, phone_min]
+ROUTING_KEYS = tuple(default_routing_thresholds())
+SCORE_ARRAYS = ("bert_prob", "strong", "has_phone", "ner_support", "labels")
+
+
+def scores_metadata(hybrid: HybridClassifier, texts: Sequence[str], labels: np.ndarray) -> dict:
+    """Tudo o que muda os scores: pesos do modelo, modo do BERT, textos e rótulos."""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(np.asarray(labels, dtype=np.int8).tobytes())
+
+    return {
+        "model": model_fingerprint(hybrid.model_path),
+        "chunked": hybrid.chunked,
+        "window_stride": hybrid.window_stride,
+        "aggregation": hybrid.aggregation,
+        "data": digest.hexdigest(),
+        "n_texts": len(texts),
+    }
+
+
+def score_dataset(
+    hybrid: HybridClassifier,
+    texts: List[str],
+    labels: np.ndarray,
+    batch_size: int = 32,
+    regex_workers: int = 1
+) -> dict[str, np.ndarray]:
+    """
+    Avalia cada texto uma única vez e devolve os sinais usados pelas regras:
+
+    - bert_prob (float32): probabilidade de PII do BERT (0 nos textos com Regex forte)
+    - strong (bool): CPF, CNPJ, Email ou RG válidos (PII sem consultar o BERT)
+    - has_phone (bool): padrão de telefone
+    - ner_support (bool): o NER encontrou pessoa ou local
+    - labels (int8): rótulo real
+
+    Ao contrário do HybridClassifier, o NER roda em todos os textos sem Regex
+    forte, não só na faixa moderada: é justamente essa faixa que a calibração move.
+    """
+    regex = Validator.validate_columns(texts, n_workers=regex_workers)
+    strong = regex["has_cpf"] | regex["has_cnpj"] | regex["has_email"] | regex["has_rg"]
+    pending = np.flatnonzero(~strong)
+    pending_texts = [texts[i] for i in pending]
+    logger.info(f"Regex forte em {int(strong.sum())} de {len(texts)} textos; {len(pending)} passam pelo BERT e NER")
+
+    bert_prob = np.zeros(len(texts), dtype=np.float32)
+    ner_support = np.zeros(len(texts), dtype=bool)
+    if len(pending):
+        probs, _ = hybrid._get_bert_scores(pending_texts, batch_size=batch_size)
+        bert_prob[pending] = probs
+
+        signals = hybrid.ner_detector.extract_signals_batch(pending_texts)
+        ner_support[pending] = [bool(s["has_person_entity"] or s["has_location_entity"]) for s in signals]
+
+    return {
+        "bert_prob": bert_prob,
+        "strong": strong.astype(bool),
+        "has_phone": regex["has_phone"].astype(bool),
+        "ner_support": ner_support,
+        "labels": np.asarray(labels, dtype=np.int8),
+    }
+
+
+def save_scores(path: str, scores: dict[str, np.ndarray], metadata: dict):
+    """Grava os arrays de scores e os metadados em um único .npz comprimido."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, metadata=np.array(json.dumps(metadata, sort_keys=True)), **scores)
+
+
+def load_scores(path: str, metadata: Optional[dict] = None) -> Optional[dict[str, np.ndarray]]:
+    """
+    Lê os scores gravados por `save_scores`, ou None se o arquivo não existir,
+    estiver incompleto ou (com `metadata`) tiver sido gerado com outro modelo ou dados.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as archive:
+            stored = json.loads(str(archive["metadata"]))
+            scores = {name: archive[name] for name in SCORE_ARRAYS}
+    except (KeyError, ValueError, OSError):
+        return None
+    if metadata is not None and stored != json.loads(json.dumps(metadata, sort_keys=True)):
+        return None
+    return scores
+
+
+def predict_from_scores(
+    scores: dict[str, np.ndarray],
+    high_confidence: float,
+    moderate: float,
+    phone_min: float,
+    threshold: float = DEFAULT_THRESHOLD
+) -> np.ndarray:
+    """Decisão do HybridClassifier (`_decide`) para todos os textos de uma vez."""
+    prob = scores["bert_prob"].astype(np.float64)
+    return (
+        scores["strong"]
+        | (prob > high_confidence)
+        | ((prob > moderate) & scores["ner_support"])
+        | ((prob > phone_min) & scores["has_phone"])
+        | (prob >= threshold)
+    )
+
+
+def _weighted_f1(tp, fp, fn, n_positive, n_total):
+    # F1 ponderado pelo suporte das duas classes (mesmo critério de ScoreCalculator.calculate_f1)
+    tn = n_total - n_positive - fp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f1_positive = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+        f1_negative = np.where(2 * tn + fp + fn > 0, 2 * tn / (2 * tn + fp + fn), 0.0)
+    return (n_positive * f1_positive + (n_total - n_positive) * f1_negative) / max(n_total, 1)
+
+
+def weighted_f1(labels: np.ndarray, predictions: np.ndarray) -> float:
+    """F1 ponderado de um vetor de predições booleanas."""
+    positive = np.asarray(labels) == 1
+    predictions = np.asarray(predictions, dtype=bool)
+    tp = int((predictions & positive).sum())
+    fp = int((predictions & ~positive).sum())
+    fn = int((~predictions & positive).sum())
+    return float(_weighted_f1(tp, fp, fn, int(positive.sum()), len(positive)))
+
+
+def make_grid(step: float = DEFAULT_GRID_STEP) -> np.ndarray:
+    """Valores candidatos para cada threshold: step, 2*step, ..., < 1."""
+    if not 0.0 < step < 0.5:
+        raise ValueError(f"step deve estar em (0, 0.5), recebido: {step}")
+    return np.round(np.arange(1, int(round(1.0 / step))) * step, 6)
+
+
+def grid_search(
+    scores: dict[str, np.ndarray],
+    grid: np.ndarray,
+    threshold: float = DEFAULT_THRESHOLD
+) -> np.ndarray:
+    """
+    F1 ponderado de todas as combinações de thresholds do grid.
+
+    Retorna um array (G, G, G) indexado por [high_confidence, moderate, phone_min];
+    combinações com moderate >= high_confidence ficam com NaN.
+
+    Cada texto só importa pelas comparações da sua probabilidade com os valores
+    do grid, então os textos são agrupados por (posição no grid, sinais, rótulo)
+    e a grade é avaliada sobre os grupos, com pesos: algumas centenas de grupos
+    em vez de um vetor por texto.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    prob = scores["bert_prob"].astype(np.float64)
+    # rank = nº de valores do grid menores que a probabilidade: prob > grid[i] <=> i < rank
+    rank = np.searchsorted(grid, prob, side="left")
+
+    keys = np.column_stack([
+        rank,
+        prob >= threshold,
+        scores["strong"],
+        scores["ner_support"],
+        scores["has_phone"],
+        scores["labels"] == 1,
+    ]).astype(np.int64)
+    groups, weights = np.unique(keys, axis=0, return_counts=True)
+    rank, fallback, strong, ner, phone, positive = (groups[:, i] for i in range(groups.shape[1]))
+
+    above = np.arange(len(grid))[:, None] < rank[None, :]  # above[i, g]: prob > grid[i]
+    decided = (strong | fallback).astype(bool)              # Regex forte ou threshold padrão
+    rule_b = above & ner.astype(bool)                       # [moderate, grupo]
+    rule_c = above & phone.astype(bool)                     # [phone_min, grupo]
+    positive_weights = weights * positive
+    n_positive, n_total = int(positive_weights.sum()), int(weights.sum())
+
+    f1 = np.empty((len(grid),) * 3)
+    for h in range(len(grid)):
+        predicted = decided | above[h]                      # Regra A
+        predicted = predicted | rule_b[:, None, :] | rule_c[None, :, :]
+        n_predicted = predicted @ weights
+        tp = predicted @ positive_weights
+        f1[h] = _weighted_f1(tp, n_predicted - tp, n_positive - tp, n_positive, n_total)
+
+    # A faixa moderada precisa ficar abaixo da alta confiança
+    f1[grid[None, :] >= grid[:, None]] = np.nan
+    return f1
+
+
+def best_thresholds(f1: np.ndarray, grid: np.ndarray, reference: Optional[dict] = None) -> tuple[dict, float]:
+    """
+    Combinação com o maior F1. Em caso de empate, fica a mais próxima de
+    `reference` (padrão: os thresholds atuais), para não mudar o que não melhora.
+    """
+    reference = reference or default_routing_thresholds()
+    best = float(np.nanmax(f1))
+    candidates = np.argwhere(f1 >= best - 1e-12)
+    distance = np.abs(grid[candidates] - np.array([reference[key] for key in ROUTING_KEYS])).sum(axis=1)
+    chosen = candidates[int(np.argmin(distance))]
+    return {key: float(grid[i]) for key, i in zip(ROUTING_KEYS, chosen)}, best
+
+
+def calibrate(
+    data_path: Optional[str] = None,
+    model_path: str = DEFAULT_MODEL_PATH,
+    scores_path: str = DEFAULT_SCORES_PATH,
+    output_path: Optional[str] = None,
+    grid_step: float = DEFAULT_GRID_STEP,
+    batch_size: int = 32,
+    chunked: bool = False,
+    rescore: bool = False,
+    regex_workers: int = 1
+) -> dict:
+    """Avalia o conjunto (ou reaproveita os scores), busca os thresholds e grava o JSON."""
+    # Sem caminho explícito, prefere o .parquet gerado pelo `make process`
+    data_path = data_path or resolve_table_path(DEFAULT_DATA_PATH)
+    output_path = output_path or os.path.join(model_path, THRESHOLDS_FILE)
+
+    logger.info(f"Carregando dados de {data_path}...")
+    df = read_table(data_path)
+    label_col = "Label" if "Label" in df.columns else "label"
+    texts = df["Texto Mascarado"].astype(str).tolist()
+    labels = df[label_col].astype(int).to_numpy(dtype=np.int8)
+
+    hybrid = HybridClassifier(model_path=model_path, chunked=chunked)
+    metadata = scores_metadata(hybrid, texts, labels)
+
+    scores = None if rescore else load_scores(scores_path, metadata)
+    if scores is None:
+        logger.info(f"Avaliando {len(texts)} textos com Regex, BERT e NER (uma única vez)...")
+        start = time.perf_counter()
+        scores = score_dataset(hybrid, texts, labels, batch_size=batch_size, regex_workers=regex_workers)
+        save_scores(scores_path, scores, metadata)
+        logger.info(f"Scores gravados em {scores_path} ({time.perf_counter() - start:.1f}s)")
+    else:
+        logger.info(f"Reaproveitando scores de {scores_path}")
+
+    grid = make_grid(grid_step)
+    start = time.perf_counter()
+    f1 = grid_search(scores, grid)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Busca em grade: {int(np.isfinite(f1).sum())} combinações em {elapsed:.2f}s")
+
+    thresholds, best_f1 = best_thresholds(f1, grid)
+    default_f1 = weighted_f1(scores["labels"], predict_from_scores(scores, **default_routing_thresholds()))
+
+    config = {
+        **thresholds,
+        "f1": best_f1,
+        "default_f1": default_f1,
+        "grid_step": grid_step,
+        "model": metadata["model"],
+        "n_texts": len(texts),
+    }
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    logger.info(f"F1 com os thresholds padrão {default_routing_thresholds()}: {default_f1:.4f}")
+    logger.info(f"F1 com os thresholds calibrados {thresholds}: {best_f1:.4f}")
+    logger.info(f"Thresholds gravados em {output_path}")
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibração dos thresholds de decisão do Classificador Híbrido")
+    parser.add_argument("--data", type=str, default=None,
+                        help=f"Arquivo processado (.parquet, .feather, .xlsx ou .csv). Padrão: {DEFAULT_DATA_PATH}, "
+                             "ou o .parquet ao lado dele se existir.")
+    parser.add_argument("--model-path", type=str, default=DEFAULT_MODEL_PATH, help="Diretório do modelo BERT")
+    parser.add_argument("--scores", type=str, default=DEFAULT_SCORES_PATH,
+                        help="Arquivo .npz com os scores por texto (reaproveitado entre execuções)")
+    parser.add_argument("--output", type=str, default=None,
+                        help=f"JSON com os thresholds calibrados. Padrão: <model-path>/{THRESHOLDS_FILE}, "
+                             "carregado automaticamente pelo HybridClassifier.")
+    parser.add_argument("--grid-step", type=float, default=DEFAULT_GRID_STEP,
+                        help="Passo da grade de cada threshold (0.05 = 19 valores por eixo)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Lote do BERT ao gerar os scores")
+    parser.add_argument("--chunked", action="store_true", help="Avaliar o BERT no modo chunked (janelas)")
+    parser.add_argument("--regex-workers", type=int, default=1,
+                        help="Processos para a etapa de Regex (-1 = todos os núcleos)")
+    parser.add_argument("--rescore", action="store_true",
+                        help="Ignorar os scores gravados e avaliar o conjunto de novo")
+    args = parser.parse_args()
+
+    calibrate(
+        data_path=args.data,
+        model_path=args.model_path,
+        scores_path=args.scores,
+        output_path=args.output,
+        grid_step=args.grid_step,
+        batch_size=args.batch_size,
+        chunked=args.chunked,
+        rescore=args.rescore,
+        regex_workers=args.regex_workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Gerenciamento dos checkpoints dos trials do Optuna.
+
+Cada trial grava um modelo completo (~430MB) em `models/<estudo>/trial_N`. Sem limpeza,
+um estudo de 50 trials ocupa dezenas de GB. `TrialCheckpointManager` é um
+callback do `study.optimize`: ao fim de cada trial, mantém só os checkpoints dos
+`keep` melhores trials (pelo valor do objetivo) e apaga os demais, inclusive os
+de trials interrompidos (pruning) ou com falha.
+"""
+
+import logging
+import os
+import shutil
+from typing import List
+
+import optuna
+
+logger = logging.getLogger(__name__)
+
+# Atributo do trial com o diretório do checkpoint (gravado por tune.objective)
+MODEL_PATH_ATTR = "model_path"
+
+
+def directory_size(path: str) -> int:
+    """Tamanho total, em bytes, dos arquivos de um diretório (0 se ele não existir)."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass  # Apagado por outro processo durante a contagem
+    return total
+
+
+def format_size(size: int) -> str:
+    """Bytes em texto legível (ex.: '1.3 GB')."""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+class TrialCheckpointManager:
+    """
+    Mantém em disco apenas os checkpoints dos `keep` melhores trials concluídos.
+
+    Use como callback: `study.optimize(objective, callbacks=[TrialCheckpointManager(3)])`.
+    O melhor trial nunca é apagado, então o modelo final pode ser copiado dele.
+    Com vários processos no mesmo estudo, cada um aplica a mesma regra; apagar
+    um diretório que já sumiu não é erro.
+    """
+
+    def __init__(self, keep: int = 3, checkpoint_pattern: str = "models/trial_{number}"):
+        if keep < 1:
+            raise ValueError(f"keep deve ser >= 1 (o checkpoint do melhor trial é sempre mantido), recebido: {keep}")
+        self.keep = keep
+        self.checkpoint_pattern = checkpoint_pattern
+
+    def checkpoint_path(self, trial: optuna.trial.FrozenTrial) -> str:
+        return trial.user_attrs.get(MODEL_PATH_ATTR) or self.checkpoint_pattern.format(number=trial.number)
+
+    def kept_trials(self, study: optuna.Study) -> List[optuna.trial.FrozenTrial]:
+        """Os `keep` melhores trials concluídos (do melhor para o pior)."""
+        completed = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+        reverse = study.direction == optuna.study.StudyDirection.MAXIMIZE
+        return sorted(completed, key=lambda trial: trial.value, reverse=reverse)[:self.keep]
+
+    def __call__(self, study: optuna.Study, trial: optuna.trial.FrozenTrial):
+        kept = {self.checkpoint_path(t) for t in self.kept_trials(study)}
+        finished = study.get_trials(deepcopy=False, states=(
+            optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED, optuna.trial.TrialState.FAIL
+        ))
+
+        freed = 0
+        for other in finished:
+            path = self.checkpoint_path(other)
+            if path not in kept and os.path.isdir(path):
+                freed += directory_size(path)
+                shutil.rmtree(path, ignore_errors=True)
+
+        if freed:
+            logger.info(f"Checkpoints: {format_size(freed)} liberados (mantidos os {self.keep} melhores trials)")
+        logger.info(f"Checkpoints: {format_size(self.disk_usage(study))} em disco")
+
+    def disk_usage(self, study: optuna.Study) -> int:
+        """Espaço, em bytes, ocupado pelos checkpoints dos trials do estudo."""
+        paths = {self.checkpoint_path(t) for t in study.get_trials(deepcopy=False)}
+        return sum(directory_size(path) for path in paths)
@@ -0,0 +1,236 @@
+"""
+Leitura e escrita dos conjuntos de dados do ShieldData.
+
+O formato é detectado pela extensão do arquivo:
+- .parquet / .feather: colunares (pyarrow), muito mais rápidos de ler e gravar
+  que Excel. É o formato de troca entre pré-processamento, treino e avaliação.
+- .xlsx: mantido para entrada dos dados brutos e exportação para leitura humana.
+- .csv
+
+Arquivos com milhões de linhas não cabem em um único DataFrame: `iter_chunks` e
+`ChunkWriter` leem e gravam em blocos (streaming), de modo que o pico de memória
+depende do tamanho do bloco, não do arquivo (.xlsx, .csv e .parquet).
+"""
+
+import os
+from typing import Iterator, List, Optional, Sequence
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+TABLE_FORMATS = (".xlsx", ".csv", ".parquet", ".feather")
+STREAMING_FORMATS = (".xlsx", ".csv", ".parquet")
+COLUMNAR_FORMATS = (".parquet", ".feather")
+
+
+def _extension(path: str, formats: Sequence[str] = STREAMING_FORMATS) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in formats:
+        raise ValueError(f"Formato não suportado: '{extension}' (use um de {tuple(formats)})")
+    return extension
+
+
+def read_table(path: str, index_col: str = "ID", columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lê um arquivo inteiro, com `index_col` como índice.
+
+    Com `columns`, só essas colunas (além do índice) são lidas. Nos formatos
+    colunares isso evita ler do disco as colunas que não serão usadas.
+    """
+    extension = _extension(path, TABLE_FORMATS)
+    usecols = None if columns is None else [index_col] + list(columns)
+
+    if extension == ".xlsx":
+        return pd.read_excel(path, engine="openpyxl", index_col=index_col, usecols=usecols)
+    if extension == ".csv":
+        return pd.read_csv(path, index_col=index_col, usecols=usecols)
+
+    # O índice entra na seleção: Parquet gravado pelo pandas o restaura; ChunkWriter,
+    # Feather e arquivos de outras ferramentas o guardam como coluna comum
+    if extension == ".parquet":
+        if usecols is not None:
+            import pyarrow.parquet as pq
+
+            # Um índice sequencial (RangeIndex) fica só nos metadados do pandas, sem coluna
+            if index_col not in pq.read_schema(path).names:
+                usecols = usecols[1:]
+        df = pd.read_parquet(path, columns=usecols)
+    else:
+        df = pd.read_feather(path, columns=usecols)
+    if index_col in df.columns:
+        df = df.set_index(index_col)
+    return df
+
+
+def write_table(df: pd.DataFrame, path: str):
+    """Grava `df` (com o índice) no formato indicado pela extensão de `path`."""
+    extension = _extension(path, TABLE_FORMATS)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if extension == ".xlsx":
+        df.to_excel(path)
+    elif extension == ".csv":
+        df.to_csv(path)
+    elif extension == ".parquet":
+        df.to_parquet(path)
+    else:
+        # Feather não guarda índice: ele vira a primeira coluna
+        df.reset_index().to_feather(path)
+
+
+def resolve_table_path(path: str) -> str:
+    """
+    Prefere a versão colunar de um arquivo Excel, se ela existir e não for mais antiga.
+
+    Ex.: para "dados.xlsx", retorna "dados.parquet" quando o pré-processamento já
+    gravou o Parquet; senão, o próprio caminho recebido.
+    """
+    base, extension = os.path.splitext(path)
+    if extension.lower() != ".xlsx":
+        return path
+
+    for columnar in COLUMNAR_FORMATS:
+        candidate = base + columnar
+        if os.path.exists(candidate) and (
+            not os.path.exists(path) or os.path.getmtime(candidate) >= os.path.getmtime(path)
+        ):
+            return candidate
+    return path
+
+
+def iter_chunks(path: str, chunk_size: int, index_col: str = "ID") -> Iterator[pd.DataFrame]:
+    """
+    Lê `path` em DataFrames de até `chunk_size` linhas, na ordem do arquivo.
+
+    Cada bloco tem as mesmas colunas e usa `index_col` como índice, como
+    `pd.read_excel(path, index_col=index_col)` faria com o arquivo inteiro.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size deve ser positivo, recebido: {chunk_size}")
+
+    extension = _extension(path)
+    if extension == ".csv":
+        yield from pd.read_csv(path, index_col=index_col, chunksize=chunk_size)
+        return
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            df = batch.to_pandas()
+            yield df.set_index(index_col) if index_col in df.columns else df
+        return
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = list(header)
+        # Planilhas às vezes guardam células vazias no fim de cada linha
+        while columns and columns[-1] is None:
+            columns.pop()
+
+        batch: List[tuple] = []
+        for row in rows:
+            if not any(value is not None for value in row):
+                continue  # Linhas totalmente vazias (read_excel também as ignora)
+            batch.append(row[:len(columns)])
+            if len(batch) == chunk_size:
+                yield _to_frame(batch, columns, index_col)
+                batch = []
+        if batch:
+            yield _to_frame(batch, columns, index_col)
+    finally:
+        workbook.close()
+
+
+def _to_frame(rows: List[tuple], columns: List[str], index_col: str) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=columns).set_index(index_col)
+
+
+class ChunkWriter:
+    """
+    Grava DataFrames incrementalmente em .xlsx, .csv ou .parquet.
+
+    O índice é gravado como primeira coluna, com o nome do índice no cabeçalho,
+    como `DataFrame.to_excel` / `to_csv`. Use como context manager:
+
+        with ChunkWriter("saida.xlsx") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows_written = 0
+        self._extension = _extension(path)
+        self._columns: Optional[List[str]] = None
+        self._workbook: Optional[Workbook] = None
+        self._sheet = None
+        self._parquet_writer = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self._extension == ".xlsx":
+            # write_only: as linhas vão para um arquivo temporário, não ficam em memória
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet()
+
+    def write(self, df: pd.DataFrame):
+        """Anexa as linhas de `df`. Todos os blocos devem ter as mesmas colunas."""
+        columns = [df.index.name] + list(df.columns)
+        if self._columns is None:
+            self._columns = columns
+            if self._sheet is not None:
+                self._sheet.append(columns)
+        elif columns != self._columns:
+            raise ValueError(f"Colunas do bloco diferem das anteriores: {columns} != {self._columns}")
+
+        if self._extension == ".parquet":
+            self._write_parquet(df)
+        elif self._sheet is None:
+            df.to_csv(self.path, mode="w" if self.rows_written == 0 else "a", header=self.rows_written == 0)
+        else:
+            # NaN vira célula vazia, como no to_excel
+            values = df.reset_index().astype(object).where(lambda frame: frame.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                self._sheet.append(row)
+
+        self.rows_written += len(df)
+
+    def _write_parquet(self, df: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # O índice vira coluna comum: um RangeIndex seria guardado só como metadado do bloco
+        frame = df.reset_index()
+        if self._parquet_writer is None:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            # O esquema do primeiro bloco vale para todos (ex.: coluna só com nulos neste bloco)
+            table = pa.Table.from_pandas(frame, schema=self._parquet_writer.schema, preserve_index=False)
+        self._parquet_writer.write_table(table)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+            self._workbook = None
+            self._sheet = None
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
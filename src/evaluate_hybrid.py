@@ -1,8 +1,9 @@
-import pandas as pd
+import argparse
 import logging
 from hybrid_classifier import HybridClassifier
 from piiclassifier import PIIClassifier
 from score_calculator import ScoreCalculator
+from data_io import read_table, resolve_table_path
 import torch
 from sklearn.metrics import classification_report
 
@@ -10,12 +11,15 @@ from sklearn.metrics import classification_report
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def evaluate():
-    data_path = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+DEFAULT_DATA_PATH = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+
+def evaluate(cache_path: str | None = None, data_path: str | None = None):
+    # Sem caminho explícito, prefere o .parquet gerado pelo `make process`
+    data_path = data_path or resolve_table_path(DEFAULT_DATA_PATH)
     model_path = "models/best_model"
     
     logger.info(f"Carregando dados de {data_path}...")
-    df = pd.read_excel(data_path, index_col=0) # Assuming ID is index
+    df = read_table(data_path)
     
     # Check correct column for text
     text_col = "Texto Mascarado"
@@ -31,7 +35,8 @@ def evaluate():
 
     logger.info("Inicializando classificadores...")
     # 1. Classificador Híbrido
-    hybrid = HybridClassifier(model_path=model_path)
+    # Com cache_path, reexecuções reaproveitam os resultados de textos já avaliados
+    hybrid = HybridClassifier(model_path=model_path, cache_path=cache_path)
     
     # 2. BERT Standalone (para comparação) - reutilizamos o modelo interno do hybrid para economizar memória/tempo
     bert_only = hybrid.bert_model
@@ -52,9 +57,12 @@ def evaluate():
         hybrid_preds.append(1 if h_result["is_pii"] else 0)
         
         # B. Previsão BERT Puro
-        # Reutilizando a lógica de HybridClassifier._get_bert_probability manualmente
+        # O resultado híbrido já traz a probabilidade do BERT, exceto quando o Regex forte
+        # decidiu sozinho; só nesse caso o BERT é executado de novo.
         try:
-             prob = hybrid._get_bert_probability(text)
+             prob = h_result["details"].get("bert")
+             if prob is None:
+                 prob = hybrid._get_bert_probability(text)
              bert_preds.append(1 if prob >= 0.5 else 0)
         
         except Exception:
@@ -115,5 +123,21 @@ def evaluate():
     else:
         print("😐 Empate entre Híbrido e Baseline.")
 
+    if hybrid.cache is not None:
+        stats = hybrid.cache.stats()
+        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%})")
+        hybrid.cache.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Avaliação do Classificador Híbrido")
+    parser.add_argument("--cache-path", type=str, default=None,
+                        help="Arquivo SQLite para reaproveitar resultados entre execuções (ex: models/cache/predictions.sqlite).")
+    parser.add_argument("--data", type=str, default=None,
+                        help=f"Arquivo processado (.parquet, .feather, .xlsx ou .csv). Padrão: {DEFAULT_DATA_PATH}, "
+                             "ou o .parquet ao lado dele se existir.")
+    args = parser.parse_args()
+
+    evaluate(cache_path=args.cache_path, data_path=args.data)
+
 if __name__ == "__main__":
-    evaluate()
+    main()
@@ -0,0 +1,154 @@
+"""
+Exporta o BERT treinado (PIIClassifier.forward) para TorchScript ou ONNX.
+
+O diretório de saída recebe o grafo e os arquivos do tokenizer, que é tudo o que
+os backends "torchscript" e "onnx" do HybridClassifier precisam para rodar
+(veja inference_backends.py). Depois de exportar, os logits do grafo são
+comparados com os do PyTorch e a exportação falha se a diferença passar de `--atol`.
+
+Uso:
+    python src/export_model.py --model-path models/best_model --format onnx
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+import torch
+
+from inference_backends import EXPORT_FILES, INPUT_NAMES, OUTPUT_NAMES, load_backend
+from piiclassifier import PIIClassifier, pad_token_ids
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MAX_LEN = 128
+ONNX_OPSET = 17
+
+# Textos de tamanhos variados: o lote de verificação tem padding de verdade
+VERIFY_TEXTS = [
+    "Solicito cópia do processo administrativo referente à licitação.",
+    "Meu nome é Maria Souza e moro em Taguatinga.",
+    "Telefone (61) 99999-9999",
+    "Gostaria de saber quantos servidores estão lotados na secretaria de saúde do Distrito Federal "
+    "e qual o valor total gasto com horas extras no último ano.",
+    "Obrigado",
+]
+
+
+def encode(model: PIIClassifier, texts: list[str]) -> tuple[torch.Tensor, torch.Tensor]:
+    """Tokeniza como o HybridClassifier: truncado em MAX_LEN e com padding dinâmico."""
+    token_ids = model.tokenizer(
+        texts,
+        max_length=MAX_LEN,
+        truncation=True,
+        return_attention_mask=False,
+        return_token_type_ids=False
+    )['input_ids']
+    return pad_token_ids(token_ids, pad_token_id=model.tokenizer.pad_token_id or 0)
+
+
+def export_torchscript(model: PIIClassifier, example: tuple[torch.Tensor, torch.Tensor], path: str):
+    """Grava o grafo TorchScript obtido por tracing de `model.forward`."""
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example, strict=False)
+    traced.save(path)
+
+
+def export_onnx(model: PIIClassifier, example: tuple[torch.Tensor, torch.Tensor], path: str, opset: int = ONNX_OPSET):
+    """Grava o grafo ONNX de `model.forward`, com lote e sequência de tamanho variável."""
+    dynamic_axes = {
+        "input_ids": {0: "batch", 1: "sequence"},
+        "attention_mask": {0: "batch", 1: "sequence"},
+        "logits": {0: "batch"},
+    }
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            example,
+            path,
+            input_names=INPUT_NAMES,
+            output_names=OUTPUT_NAMES,
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False
+        )
+
+
+def verify_export(model: PIIClassifier, export_format: str, path: str, texts: list[str]) -> float:
+    """
+    Roda os mesmos textos no PyTorch e no grafo exportado.
+
+    Retorna:
+        float: Maior diferença absoluta entre os logits.
+    """
+    backend = load_backend(export_format, path)
+    input_ids, attention_mask = encode(model, texts)
+    with torch.no_grad():
+        expected = model(input_ids, attention_mask)
+        if getattr(backend, "numpy_io", False):
+            exported = torch.from_numpy(backend(input_ids.numpy(), attention_mask.numpy()))
+        else:
+            exported = backend(input_ids, attention_mask)
+    return float((expected - exported).abs().max())
+
+
+def export(
+    model_path: str,
+    export_format: str,
+    output: str | None = None,
+    atol: float = 1e-4,
+    opset: int = ONNX_OPSET,
+    model_name: str = "neuralmind/bert-base-portuguese-cased"
+) -> str:
+    """
+    Exporta o modelo de `model_path` e confere o resultado.
+
+    Retorna:
+        str: Caminho do grafo exportado.
+    """
+    output = output or model_path
+    os.makedirs(output, exist_ok=True)
+
+    logger.info(f"Carregando modelo de {model_path}...")
+    model = PIIClassifier.load(model_path, model_name=model_name)
+    model.eval()  # Desliga o dropout antes do tracing
+
+    graph_path = os.path.join(output, EXPORT_FILES[export_format])
+    example = encode(model, VERIFY_TEXTS[:2])
+
+    logger.info(f"Exportando para {export_format} em {graph_path}...")
+    if export_format == "torchscript":
+        export_torchscript(model, example, graph_path)
+    else:
+        export_onnx(model, example, graph_path, opset=opset)
+    model.tokenizer.save_pretrained(output)
+
+    max_diff = verify_export(model, export_format, output, VERIFY_TEXTS)
+    if max_diff > atol:
+        raise ValueError(f"Logits exportados divergem do PyTorch: diferença máxima {max_diff:.2e} > atol {atol:.0e}")
+    logger.info(f"Verificação OK: diferença máxima dos logits {max_diff:.2e} (atol {atol:.0e})")
+
+    return graph_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta o BERT do ShieldData para TorchScript ou ONNX")
+    parser.add_argument("--model-path", type=str, default="models/best_model", help="Diretório do modelo salvo.")
+    parser.add_argument("--model-name", type=str, default="neuralmind/bert-base-portuguese-cased", help="BERT base usado no treino (só para modelos no formato antigo model_state.bin).")
+    parser.add_argument("--format", choices=sorted(EXPORT_FILES), default="onnx", help="Formato do grafo exportado.")
+    parser.add_argument("--output", type=str, default=None, help="Diretório de saída (padrão: o próprio --model-path).")
+    parser.add_argument("--atol", type=float, default=1e-4, help="Diferença máxima aceita entre os logits.")
+    parser.add_argument("--opset", type=int, default=ONNX_OPSET, help="Versão do opset ONNX.")
+    args = parser.parse_args()
+
+    try:
+        export(args.model_path, args.format, output=args.output, atol=args.atol, opset=args.opset, model_name=args.model_name)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
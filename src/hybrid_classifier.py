@@ -1,9 +1,19 @@
-import torch
-from piiclassifier import PIIClassifier
 from validator import Validator
-from ner_detector import NamedEntityDetector
-from utils import get_best_device
+from prediction_cache import PredictionCache, model_fingerprint
+from inference_backends import BACKENDS, EXPORT_FILES, pad_token_arrays
+import copy
+import json
 import logging
+import os
+from typing import TYPE_CHECKING, List, Optional, cast
+
+import numpy as np
+
+# torch, transformers e spaCy são importados só quando o BERT ou o NER são
+# carregados (veja `bert_model` e `ner_detector`): textos decididos pelo Regex
+# não pagam esse custo.
+if TYPE_CHECKING:
+    from ner_detector import NamedEntityDetector
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -14,7 +24,69 @@ BERT_HIGH_CONFIDENCE_THRESHOLD = 0.8  # Confiança alta do BERT
 BERT_MODERATE_THRESHOLD = 0.4          # Confiança moderada do BERT
 BERT_PHONE_MIN_THRESHOLD = 0.3         # Confiança mínima para telefone
 DEFAULT_THRESHOLD = 0.5                # Threshold padrão
+MAX_LEN = 128                          # Tamanho máximo (em tokens) de entrada do BERT
 PHONE_CONFIDENCE = 0.85                # Confiança para padrão de telefone
+WINDOW_STRIDE = 96                     # Passo entre janelas no modo chunked (sobreposição de 30 tokens)
+WINDOW_AGGREGATIONS = ("max", "noisy_or")
+WINDOW_BODY_LEN = MAX_LEN - 2           # Tokens de texto por janela (reserva [CLS] e [SEP])
+THRESHOLDS_FILE = "thresholds.json"    # Thresholds calibrados por calibrate.py, ao lado dos pesos
+
+
+def window_starts(n_tokens: int, stride: int, body_len: int = WINDOW_BODY_LEN) -> List[int]:
+    """
+    Posição (em tokens) do início de cada janela do modo chunked.
+
+    As janelas andam `stride` tokens; a última é alinhada ao fim do texto, para
+    que ele seja coberto até o último token. Com `stride <= body_len`, nenhum
+    token fica fora de todas as janelas.
+    """
+    starts = list(range(0, max(n_tokens - body_len, 0) + 1, stride))
+    if starts[-1] + body_len < n_tokens:
+        starts.append(n_tokens - body_len)
+    return starts
+
+
+def default_routing_thresholds() -> dict:
+    """Thresholds de roteamento padrão (as constantes acima)."""
+    return {
+        "high_confidence": BERT_HIGH_CONFIDENCE_THRESHOLD,
+        "moderate": BERT_MODERATE_THRESHOLD,
+        "phone_min": BERT_PHONE_MIN_THRESHOLD,
+    }
+
+
+def load_routing_thresholds(path: str) -> dict:
+    """
+    Lê os thresholds de roteamento de um JSON gravado por `calibrate.py`.
+
+    Chaves ausentes ficam com o valor padrão; valores fora de (0, 1) ou com
+    `moderate >= high_confidence` são recusados com ValueError.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    thresholds = default_routing_thresholds()
+    for name in thresholds:
+        if name in config:
+            thresholds[name] = float(config[name])
+
+    for name, value in thresholds.items():
+        if not 0.0 < value < 1.0:
+            raise ValueError(f"Threshold '{name}' deve estar em (0, 1), recebido: {value} ({path})")
+    if thresholds["moderate"] >= thresholds["high_confidence"]:
+        raise ValueError(f"'moderate' deve ser menor que 'high_confidence' ({path})")
+    return thresholds
+
+
+def thresholds_match_model(path: str, weights_fingerprint: str) -> bool:
+    """
+    True se o JSON de thresholds foi calibrado para os pesos com essa impressão
+    digital (campo "model", gravado por `calibrate.py`).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stored = json.load(f).get("model")
+    return stored is not None and stored == weights_fingerprint
+
 
 class HybridClassifier:
     """
@@ -25,25 +97,198 @@ class HybridClassifier:
     
     Objetivo: Maximizar o F1-Score e garantir que dados sensíveis óbvios (CPF, Email)
     nunca passem despercebidos, mesmo que o BERT falhe.
+
+    Com `chunked=True`, textos maiores que MAX_LEN tokens não são truncados:
+    são divididos em janelas sobrepostas, todas avaliadas pelo BERT, e as
+    probabilidades das janelas são combinadas (`aggregation`: "max" ou "noisy_or").
+
+    Com `cache_size > 0` (ou `cache_path`), resultados de textos já vistos são
+    reaproveitados (veja `PredictionCache`). `cache_path` persiste o cache em SQLite.
+
+    Com `quantize=True`, o BERT roda com quantização dinâmica int8 em CPU
+    (veja `PIIClassifier.quantize`).
+
+    Com `backend="torchscript"` ou `"onnx"`, o BERT roda a partir do grafo gerado
+    por `export_model.py` em `model_path`, sem construir o modelo do transformers.
+    O backend "onnx" usa o ONNX Runtime e roda em CPU.
+
+    BERT e NER são carregados no primeiro uso: o BERT no primeiro texto que passa
+    pelo Regex sem correspondência forte, o NER no primeiro texto da faixa moderada.
+    Use `warmup()` para carregar tudo antecipadamente (ex.: ao subir um worker).
+
+    Os thresholds das regras de decisão (alta confiança, faixa moderada e
+    telefone) vêm de `thresholds_path` ou, sem ele, de `model_path/thresholds.json`
+    se existir e tiver sido calibrado para os pesos atuais (gerado por `calibrate.py`);
+    caso contrário, das constantes do módulo. A conferência com os pesos (hash do
+    arquivo) só é feita no primeiro uso dos thresholds, depois do BERT.
     """
-    def __init__(self, model_path: str = "models/best_model", device: str = None):
-        self.device = device if device else str(get_best_device())
-        
-        # 1. Carregar BERT
-        logger.info(f"Carregando modelo BERT de {model_path} no dispositivo {self.device}...")
+    def __init__(
+        self,
+        model_path: str = "models/best_model",
+        device: str = None,
+        chunked: bool = False,
+        window_stride: int = WINDOW_STRIDE,
+        aggregation: str = "max",
+        cache_size: int = 0,
+        cache_path: Optional[str] = None,
+        quantize: bool = False,
+        backend: str = "torch",
+        thresholds_path: Optional[str] = None
+    ):
+        if aggregation not in WINDOW_AGGREGATIONS:
+            raise ValueError(f"aggregation deve ser um de {WINDOW_AGGREGATIONS}, recebido: {aggregation}")
+        if not 0 < window_stride <= WINDOW_BODY_LEN:
+            # Passo maior que a janela deixaria trechos do texto sem avaliação
+            raise ValueError(f"window_stride deve estar entre 1 e {WINDOW_BODY_LEN}, recebido: {window_stride}")
+        if backend not in BACKENDS:
+            raise ValueError(f"backend deve ser um de {BACKENDS}, recebido: {backend}")
+        if quantize and backend != "torch":
+            raise ValueError("quantize=True só é suportado com backend='torch'")
+
+        # Sem device explícito, o melhor disponível é detectado ao carregar o BERT
+        self.device = device
+        if quantize:
+            if self.device not in (None, "cpu"):
+                logger.info("O modelo quantizado (int8) só roda em CPU: usando device='cpu'.")
+            self.device = "cpu"
+        if backend == "onnx":
+            if self.device not in (None, "cpu"):
+                logger.info("O backend ONNX roda em CPU: usando device='cpu'.")
+            self.device = "cpu"
+        self.model_path = model_path
+        self.quantize = quantize
+        self.backend = backend
+        self.chunked = chunked
+        self.window_stride = window_stride
+        self.aggregation = aggregation
+
+        # Thresholds das regras de decisão (calibrados, se houver). O thresholds.json do
+        # diretório do modelo é validado agora, mas só é comparado com o hash dos pesos
+        # no primeiro uso (veja `thresholds`): textos decididos pelo Regex não pagam a
+        # leitura dos pesos.
+        self._weights_fingerprint: Optional[str] = None
+        self._thresholds: Optional[dict] = default_routing_thresholds()
+        self._calibrated: Optional[tuple[str, dict]] = None
+        calibrated_path = os.path.join(model_path, THRESHOLDS_FILE)
+        if thresholds_path is not None:
+            self._thresholds = load_routing_thresholds(thresholds_path)
+            logger.info(f"Thresholds de decisão carregados de {thresholds_path}: {self._thresholds}")
+        elif os.path.exists(calibrated_path):
+            self._calibrated = (calibrated_path, load_routing_thresholds(calibrated_path))
+            self._thresholds = None
+
+        # 1. BERT e 2. NER: carregados sob demanda (veja as propriedades abaixo)
+        self._bert_model = None
+        self._ner_detector: Optional["NamedEntityDetector"] = None
+
+        # 3. Validadores Regex são estáticos, não precisam de inicialização
+
+        # 4. Cache de resultados (opcional)
+        self.cache: Optional[PredictionCache] = None
+        if cache_size > 0 or cache_path:
+            self.cache = PredictionCache(
+                namespace=self._cache_namespace(model_path),
+                max_size=cache_size if cache_size > 0 else 100_000,
+                db_path=cache_path
+            )
+
+    @property
+    def thresholds(self) -> dict:
+        """Thresholds das regras de decisão (high_confidence, moderate, phone_min)."""
+        if self._thresholds is None:
+            path, calibrated = cast(tuple[str, dict], self._calibrated)
+            try:
+                matches = thresholds_match_model(path, self.weights_fingerprint())
+            except OSError:
+                matches = False
+            if matches:
+                self._thresholds = calibrated
+                logger.info(f"Thresholds de decisão carregados de {path}: {calibrated}")
+            else:
+                logger.warning(
+                    f"{path} foi calibrado para outros pesos: usando os thresholds padrão "
+                    "(rode `make calibrate` de novo)."
+                )
+                self._thresholds = default_routing_thresholds()
+        return self._thresholds
+
+    def weights_fingerprint(self) -> str:
+        """Hash dos pesos em `model_path` (veja `model_fingerprint`), calculado uma vez."""
+        if self._weights_fingerprint is None:
+            self._weights_fingerprint = model_fingerprint(self.model_path)
+        return self._weights_fingerprint
+
+    def _cache_namespace(self, model_path: str) -> str:
+        # Tudo o que muda o resultado de predict, exceto o texto e o threshold da chamada
+        export_file = EXPORT_FILES.get(self.backend)
+        return json.dumps({
+            "model": model_fingerprint(model_path, export_file) if export_file else self.weights_fingerprint(),
+            "thresholds": [self.thresholds["high_confidence"], self.thresholds["moderate"],
+                           self.thresholds["phone_min"], PHONE_CONFIDENCE],
+            "max_len": MAX_LEN,
+            "quantized": self.quantize,
+            "backend": self.backend,
+            "chunked": self.chunked,
+            "window_stride": self.window_stride,
+            "aggregation": self.aggregation,
+        }, sort_keys=True)
+
+    @property
+    def bert_model(self):
+        """BERT (PIIClassifier ou backend exportado), carregado no primeiro acesso."""
+        if self._bert_model is None:
+            self._bert_model = self._load_bert()
+        return self._bert_model
+
+    @bert_model.setter
+    def bert_model(self, model):
+        self._bert_model = model
+
+    @property
+    def ner_detector(self) -> "NamedEntityDetector":
+        """Detector de entidades (spaCy), carregado no primeiro acesso."""
+        if self._ner_detector is None:
+            from ner_detector import NamedEntityDetector
+
+            logger.info("Inicializando Detector de Entidades (SpaCy)...")
+            self._ner_detector = NamedEntityDetector()
+        return self._ner_detector
+
+    @ner_detector.setter
+    def ner_detector(self, detector: "NamedEntityDetector"):
+        self._ner_detector = detector
+
+    def _load_bert(self):
+        if self.device is None:
+            from utils import get_best_device
+            self.device = str(get_best_device())
+
+        logger.info(f"Carregando modelo BERT ({self.backend}) de {self.model_path} no dispositivo {self.device}...")
         try:
-            self.bert_model = PIIClassifier.load(model_path)
-            self.bert_model.to(self.device)
-            self.bert_model.eval()  # Modo de avaliação (desliga dropout)
+            if self.backend == "torch":
+                from piiclassifier import PIIClassifier
+
+                model = PIIClassifier.load(self.model_path, quantize=self.quantize)
+                model.to(self.device)
+                model.eval()  # Modo de avaliação (desliga dropout)
+                return model
+
+            # Grafo exportado: mesma interface (tokenizer + chamada com input_ids e attention_mask)
+            from inference_backends import load_backend
+            return load_backend(self.backend, self.model_path, device=self.device)
         except Exception as e:
             logger.error(f"Erro ao carregar modelo BERT: {e}")
             raise e
 
-        # 2. Inicializar NER
-        logger.info("Inicializando Detector de Entidades (SpaCy)...")
-        self.ner_detector = NamedEntityDetector()
-        
-        # 3. Validadores Regex são estáticos, não precisam de inicialização
+    def warmup(self, ner: bool = True) -> "HybridClassifier":
+        """
+        Carrega o BERT (e o NER, se `ner=True`) agora e roda uma inferência curta,
+        para que o primeiro pedido real não pague a carga dos modelos.
+        """
+        self._get_bert_probabilities(["Aquecimento do classificador."])
+        if ner:
+            self.ner_detector.extract_signals("Aquecimento do classificador.")
+        return self
 
     def predict(self, text: str, threshold: float = 0.5) -> dict:
         """
@@ -56,46 +301,145 @@ class HybridClassifier:
                 "details": dict        # Detalhes de cada validador
             }
         """
+        if self.cache is None:
+            return self._predict(text, threshold)
+
+        key = self.cache.make_key(text, threshold)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._predict(text, threshold)
+            self.cache.put(key, result)
+        return result
+
+    def _predict(self, text: str, threshold: float) -> dict:
         # --- PASSO 1: REGEX (O mais rápido e confiável para padrões) ---
         # Se tem CPF, CNPJ ou Email válido, É DADO PESSOAL. Sem discussão.
         regex_results = Validator.validate_all_types(text)
-        has_strong_regex = (
-            regex_results["has_cpf"] or 
-            regex_results["has_cnpj"] or 
-            regex_results["has_email"] or 
+
+        if self._has_strong_regex(regex_results):
+            return self._strong_regex_result(regex_results)
+
+        # --- PASSO 2: BERT (Inteligência Contextual) ---
+        bert_probs, windows = self._get_bert_scores([text])
+        bert_prob = bert_probs[0]
+
+        # Executa NER apenas se necessário (otimização de performance)
+        ner_results = None
+        if self._needs_ner(bert_prob):
+            ner_results = self.ner_detector.extract_signals(text)
+
+        return self._with_window(self._decide(regex_results, bert_prob, ner_results, threshold), windows[0])
+
+    def predict_batch(self, texts: List[str], threshold: float = 0.5, batch_size: int = 32) -> List[dict]:
+        """
+        Realiza a predição híbrida para uma lista de textos.
+
+        Os textos passam pelas mesmas etapas de `predict`, mas cada etapa é
+        executada em lote e apenas sobre os textos que ainda precisam dela:
+        1. Regex em todos os textos (os com correspondência forte saem aqui)
+        2. BERT em lotes de `batch_size` sobre os textos restantes
+        3. NER (nlp.pipe) apenas nos textos da faixa moderada do BERT
+
+        Com cache, só os textos ainda não vistos (sem repetição) são avaliados.
+
+        Retorna:
+            List[dict]: Um resultado por texto, na mesma ordem e no mesmo
+            formato de `predict`.
+        """
+        if self.cache is None:
+            return self._predict_batch(texts, threshold, batch_size)
+
+        keys = [self.cache.make_key(text, threshold) for text in texts]
+        results: List[dict | None] = [self.cache.get(key) for key in keys]
+
+        # Textos repetidos no lote são avaliados uma única vez
+        missing: dict[str, str] = {}
+        for key, text, result in zip(keys, texts, results):
+            if result is None and key not in missing:
+                missing[key] = text
+
+        computed = dict(zip(missing, self._predict_batch(list(missing.values()), threshold, batch_size)))
+        self.cache.put_many(computed)
+
+        return [
+            result if result is not None else copy.deepcopy(computed[key])
+            for key, result in zip(keys, results)
+        ]
+
+    def _predict_batch(self, texts: List[str], threshold: float, batch_size: int) -> List[dict]:
+        results: List[dict | None] = [None] * len(texts)
+
+        # --- PASSO 1: REGEX em todos os textos ---
+        regex_list = Validator.validate_batch(texts)
+        pending: List[int] = []
+        for i, regex_results in enumerate(regex_list):
+            if self._has_strong_regex(regex_results):
+                results[i] = self._strong_regex_result(regex_results)
+            else:
+                pending.append(i)
+
+        # --- PASSO 2: BERT em lotes ---
+        bert_probs, windows = self._get_bert_scores([texts[i] for i in pending], batch_size=batch_size)
+
+        # --- PASSO 3: NER apenas na faixa moderada ---
+        moderate = [i for i, prob in zip(pending, bert_probs) if self._needs_ner(prob)]
+        ner_list = self.ner_detector.extract_signals_batch([texts[i] for i in moderate]) if moderate else []
+        ner_by_index = dict(zip(moderate, ner_list))
+
+        for i, prob, window in zip(pending, bert_probs, windows):
+            results[i] = self._with_window(self._decide(regex_list[i], prob, ner_by_index.get(i), threshold), window)
+
+        return cast(List[dict], results)
+
+    @staticmethod
+    def _has_strong_regex(regex_results: dict) -> bool:
+        return bool(
+            regex_results["has_cpf"] or
+            regex_results["has_cnpj"] or
+            regex_results["has_email"] or
             regex_results["has_rg"]
         )
-        
-        if has_strong_regex:
-            return {
-                "is_pii": True,
-                "confidence": 1.0,
-                "reason": "Correspondência forte de Regex",
-                "details": {"regex": regex_results}
-            }
 
-        # --- PASSO 2: BERT (Inteligência Contextual) ---
-        bert_prob = self._get_bert_probability(text)
-        
-        # --- LÓGICA DE DECISÃO HÍBRIDA (ENSEMBLE) ---
-        
+    @staticmethod
+    def _strong_regex_result(regex_results: dict) -> dict:
+        return {
+            "is_pii": True,
+            "confidence": 1.0,
+            "reason": "Correspondência forte de Regex",
+            "details": {"regex": regex_results}
+        }
+
+    def _needs_ner(self, bert_prob: float) -> bool:
+        # Faixa moderada (0.4 a 0.8 por padrão): única situação em que o NER muda a decisão
+        return self.thresholds["moderate"] < bert_prob <= self.thresholds["high_confidence"]
+
+    @staticmethod
+    def _with_window(result: dict, window: dict | None) -> dict:
+        # No modo chunked, informa qual janela do texto disparou o BERT
+        if window is not None:
+            result["details"]["bert_window"] = window
+        return result
+
+    def _decide(self, regex_results: dict, bert_prob: float, ner_results: dict | None, threshold: float) -> dict:
+        """
+        Lógica de decisão híbrida (ensemble) para textos sem Regex forte.
+        `ner_results` só é necessário quando o BERT está na faixa moderada.
+        """
         # Regra A: BERT está muito confiante (> 0.8)
         # Confiamos no BERT
-        if bert_prob > BERT_HIGH_CONFIDENCE_THRESHOLD:
+        if bert_prob > self.thresholds["high_confidence"]:
             return {
                 "is_pii": True,
                 "confidence": float(bert_prob),
                 "reason": "Alta confiança do BERT",
                 "details": {"bert": bert_prob, "regex": regex_results}
             }
-        
+
         # Regra B: BERT está moderado (0.4 a 0.8) E NER encontrou Pessoa/Local
         # O contexto é meio suspeito e tem um nome de pessoa -> Classificamos como PII (Boost no Recall)
-        # Executa NER apenas se necessário (otimização de performance)
-        if bert_prob > BERT_MODERATE_THRESHOLD:
-            ner_results = self.ner_detector.extract_signals(text)
+        if bert_prob > self.thresholds["moderate"] and ner_results is not None:
             has_person_or_loc = ner_results["has_person_entity"] or ner_results["has_location_entity"]
-            
+
             if has_person_or_loc:
                 return {
                     "is_pii": True,
@@ -106,7 +450,7 @@ class HybridClassifier:
 
         # Regra C: Padrão de Telefone (Regex fraco) + BERT mínimo
         # Telefone às vezes confunde com data, então pedimos um apoio mínimo do BERT (> 0.3)
-        if regex_results["has_phone"] and bert_prob > BERT_PHONE_MIN_THRESHOLD:
+        if regex_results["has_phone"] and bert_prob > self.thresholds["phone_min"]:
              return {
                 "is_pii": True,
                 "confidence": PHONE_CONFIDENCE, 
@@ -124,23 +468,145 @@ class HybridClassifier:
         }
 
     def _get_bert_probability(self, text: str) -> float:
-        # Preparar dados para o BERT
-        encoding = self.bert_model.tokenizer(
-            text,
-            max_length=128,
-            padding='max_length',
+        return self._get_bert_scores([text])[0][0]
+
+    def _get_bert_scores(self, texts: List[str], batch_size: int = 32) -> tuple[List[float], List[dict | None]]:
+        """
+        Probabilidades do BERT no modo configurado.
+
+        Retorna:
+            tuple: (probabilidades, janelas). As janelas só são preenchidas no modo
+            chunked; caso contrário, a lista contém apenas None.
+        """
+        if self.chunked:
+            return self._get_chunked_probabilities(texts, batch_size=batch_size)
+        return self._get_bert_probabilities(texts, batch_size=batch_size), [None] * len(texts)
+
+    def _get_bert_probabilities(self, texts: List[str], batch_size: int = 32) -> List[float]:
+        """
+        Calcula a probabilidade de PII do BERT para vários textos,
+        com um forward pass por lote de `batch_size` textos.
+        """
+        if not texts:
+            return []
+
+        # Tokeniza tudo de uma vez, sem padding (cada texto com o seu tamanho)
+        token_ids = self.bert_model.tokenizer(
+            texts,
+            max_length=MAX_LEN,
             truncation=True,
-            return_tensors='pt'
+            return_attention_mask=False,
+            return_token_type_ids=False
+        )['input_ids']
+
+        return self._score_token_ids(token_ids, batch_size=batch_size)
+
+    def _get_chunked_probabilities(self, texts: List[str], batch_size: int = 32) -> tuple[List[float], List[dict | None]]:
+        """
+        Modo chunked: divide cada texto em janelas sobrepostas de até MAX_LEN tokens.
+
+        Cada texto é tokenizado uma única vez (sem truncar) e as janelas são fatias
+        dessa tokenização, então o trecho compartilhado por janelas vizinhas não é
+        tokenizado de novo. As janelas de todos os textos são avaliadas juntas, nos
+        mesmos lotes, e depois combinadas em uma probabilidade por texto.
+
+        Textos curtos geram uma única janela idêntica à entrada do modo normal.
+        """
+        if not texts:
+            return [], []
+
+        tokenizer = self.bert_model.tokenizer
+        encoding = tokenizer(
+            texts,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False
         )
-        
-        input_ids = encoding['input_ids'].flatten().unsqueeze(0).to(self.device)
-        attention_mask = encoding['attention_mask'].flatten().unsqueeze(0).to(self.device)
 
+        body_len = WINDOW_BODY_LEN
+        windows: List[List[int]] = []
+        owners: List[int] = []
+        char_spans: List[tuple[int, int]] = []
+
+        for doc_index, (ids, offsets) in enumerate(zip(encoding['input_ids'], encoding['offset_mapping'])):
+            for start in window_starts(len(ids), self.window_stride, body_len):
+                piece = ids[start:start + body_len]
+                windows.append([tokenizer.cls_token_id] + piece + [tokenizer.sep_token_id])
+                owners.append(doc_index)
+                char_spans.append((offsets[start][0], offsets[start + len(piece) - 1][1]) if piece else (0, 0))
+
+        window_probs = self._score_token_ids(windows, batch_size=batch_size)
+
+        # Agrupa as janelas de cada texto (owners é crescente) e combina as probabilidades
+        probabilities: List[float] = []
+        window_details: List[dict | None] = []
+        first = 0
+        for doc_index in range(len(texts)):
+            last = first
+            while last < len(owners) and owners[last] == doc_index:
+                last += 1
+
+            doc_probs = window_probs[first:last]
+            best = max(range(len(doc_probs)), key=lambda k: doc_probs[k])
+
+            if self.aggregation == "noisy_or":
+                # P(PII) = 1 - P(nenhuma janela tem PII)
+                none_prob = 1.0
+                for prob in doc_probs:
+                    none_prob *= 1.0 - prob
+                probabilities.append(1.0 - none_prob)
+            else:
+                probabilities.append(doc_probs[best])
+
+            window_details.append({
+                "window": best,
+                "n_windows": len(doc_probs),
+                "window_prob": doc_probs[best],
+                "char_start": char_spans[first + best][0],
+                "char_end": char_spans[first + best][1],
+            })
+            first = last
+
+        return probabilities, window_details
+
+    def _score_token_ids(self, token_ids: List[List[int]], batch_size: int = 32) -> List[float]:
+        """
+        Executa o BERT sobre sequências já tokenizadas.
+
+        As sequências são ordenadas por tamanho antes de formar os lotes, e cada
+        lote é preenchido (padding) só até o seu maior membro. Assim, textos curtos
+        não pagam a atenção de 128 tokens. As probabilidades voltam na ordem original.
+        """
+        probabilities: List[float] = [0.0] * len(token_ids)
+        order = sorted(range(len(token_ids)), key=lambda i: len(token_ids[i]))
+        pad_id = self.bert_model.tokenizer.pad_token_id or 0
+        # Backends NumPy (ONNX) rodam sem importar torch
+        score_batch = self._score_batch_numpy if getattr(self.bert_model, "numpy_io", False) else self._score_batch_torch
+
+        for start in range(0, len(order), batch_size):
+            batch_indices = order[start:start + batch_size]
+            batch_probs = score_batch([token_ids[i] for i in batch_indices], pad_id)
+            for i, prob in zip(batch_indices, batch_probs):
+                probabilities[i] = prob
+
+        return probabilities
+
+    def _score_batch_torch(self, token_ids: List[List[int]], pad_id: int) -> List[float]:
+        import torch
+        from piiclassifier import pad_token_ids
+
+        input_ids, attention_mask = pad_token_ids(token_ids, pad_token_id=pad_id)
         with torch.no_grad():
-            outputs = self.bert_model(input_ids, attention_mask)
+            outputs = self.bert_model(input_ids.to(self.device), attention_mask.to(self.device))
             # Aplicar Softmax para ter probabilidades (0 a 1)
             probs = torch.nn.functional.softmax(outputs, dim=1)
-            # Probabilidade da classe 1 (Tem PII)
-            pii_prob = probs[0][1].item()
-            
-        return pii_prob
+        # Probabilidade da classe 1 (Tem PII)
+        return probs[:, 1].tolist()
+
+    def _score_batch_numpy(self, token_ids: List[List[int]], pad_id: int) -> List[float]:
+        input_ids, attention_mask = pad_token_arrays(token_ids, pad_token_id=pad_id)
+        logits = np.asarray(self.bert_model(input_ids, attention_mask), dtype=np.float64)
+        # Softmax estável (subtrai o maior logit de cada linha)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return (exp[:, 1] / exp.sum(axis=1)).tolist()
@@ -0,0 +1,116 @@
+"""
+Backends de inferência para o BERT do ShieldData.
+
+Além do PyTorch ("torch", o PIIClassifier completo), o modelo pode rodar a
+partir de um grafo exportado por `export_model.py`:
+- "torchscript": grafo TorchScript (`torch.jit.load`), sem construir o modelo
+  do transformers nem ler os pesos do PyTorch
+- "onnx": grafo ONNX executado pelo ONNX Runtime em CPU
+
+Todos os backends expõem a mesma interface usada pelo HybridClassifier:
+um atributo `tokenizer` e a chamada `backend(input_ids, attention_mask)`,
+que retorna os logits de formato (lote, n_classes). Backends com
+`numpy_io = True` (o ONNX) recebem e retornam arrays NumPy e não importam
+torch; os demais usam `torch.Tensor`.
+"""
+
+import logging
+import os
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+
+# torch, transformers e onnxruntime só são importados ao carregar um backend:
+# importar este módulo (ex.: para ler BACKENDS) continua barato.
+if TYPE_CHECKING:
+    import torch
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torchscript", "onnx")
+
+# Arquivos gerados por export_model.py, ao lado dos pesos do modelo
+TORCHSCRIPT_FILE = "model_torchscript.pt"
+ONNX_FILE = "model.onnx"
+EXPORT_FILES = {"torchscript": TORCHSCRIPT_FILE, "onnx": ONNX_FILE}
+
+# Nomes das entradas e saída do grafo exportado
+INPUT_NAMES = ["input_ids", "attention_mask"]
+OUTPUT_NAMES = ["logits"]
+
+
+def pad_token_arrays(sequences: Sequence[Sequence[int]], pad_token_id: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Equivalente NumPy de `piiclassifier.pad_token_ids` (padding dinâmico), sem torch.
+
+    Retorna:
+        tuple: (input_ids, attention_mask), arrays int64 com shape (n, maior_sequência).
+    """
+    width = max((len(s) for s in sequences), default=0)
+    input_ids = np.full((len(sequences), width), pad_token_id, dtype=np.int64)
+    attention_mask = np.zeros((len(sequences), width), dtype=np.int64)
+    for row, sequence in enumerate(sequences):
+        input_ids[row, :len(sequence)] = sequence
+        attention_mask[row, :len(sequence)] = 1
+    return input_ids, attention_mask
+
+
+class TorchScriptBackend:
+    """Executa o grafo TorchScript exportado."""
+
+    def __init__(self, path: str, device: str = "cpu"):
+        import torch
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        self.model = torch.jit.load(os.path.join(path, TORCHSCRIPT_FILE), map_location=device)
+        self.model.eval()
+
+    def __call__(self, input_ids: "torch.Tensor", attention_mask: "torch.Tensor") -> "torch.Tensor":
+        return self.model(input_ids, attention_mask)
+
+
+class OnnxBackend:
+    """
+    Executa o grafo ONNX exportado com o ONNX Runtime (apenas CPU).
+
+    Entradas e logits são arrays NumPy: o caminho de inferência não importa torch.
+    """
+
+    numpy_io = True
+
+    def __init__(self, path: str, device: str = "cpu"):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("O backend 'onnx' requer o onnxruntime: pip install onnxruntime") from e
+        from transformers import AutoTokenizer
+
+        if device != "cpu":
+            logger.info("O backend ONNX roda em CPU: ignorando device=%s.", device)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(path, ONNX_FILE), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        return self.session.run(OUTPUT_NAMES, {
+            "input_ids": np.asarray(input_ids, dtype=np.int64),
+            "attention_mask": np.asarray(attention_mask, dtype=np.int64),
+        })[0]
+
+
+def load_backend(backend: str, path: str, device: str = "cpu"):
+    """
+    Carrega o grafo exportado de `path` para o backend pedido.
+
+    O backend "torch" não passa por aqui: ele usa `PIIClassifier.load`.
+    """
+    if backend == "torchscript":
+        return TorchScriptBackend(path, device=device)
+    if backend == "onnx":
+        return OnnxBackend(path, device=device)
+    raise ValueError(f"backend deve ser um de {BACKENDS[1:]}, recebido: {backend}")
@@ -22,7 +22,9 @@ def run_pipeline():
     
     # --- Configuração ---
     raw_data_path = "data/raw/AMOSTRA_e-SIC.xlsx"
-    processed_data_path = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+    # Parquet é o formato lido pelo treino/avaliação; o .xlsx é só para inspeção manual
+    processed_data_path = "data/processed/AMOSTRA_e-SIC_processed.parquet"
+    processed_excel_path = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
     # --------------------
 
     logger.info("="*60)
@@ -37,9 +39,15 @@ def run_pipeline():
         sys.exit(1)
 
     try:
-        preprocessor = Preprocessor()
+        # Incremental: linhas inalteradas desde a última execução reaproveitam os sinais
+        preprocessor = Preprocessor(incremental=True)
         # Importante: clean_only=False garante que executamos NER e validação Regex
-        preprocessor.process_file(input_path=raw_data_path, output_path=processed_data_path, clean_only=False)
+        preprocessor.process_file(
+            input_path=raw_data_path,
+            output_path=processed_data_path,
+            clean_only=False,
+            excel_output=processed_excel_path
+        )
         logger.info(f"✅ Pré-processamento concluído. Salvo em {processed_data_path}")
     except Exception as e:
         logger.error(f"❌ Pré-processamento falhou: {e}")
@@ -0,0 +1,78 @@
+"""
+Manifesto do pré-processamento incremental.
+
+Para cada linha já processada, o manifesto guarda o ID, o hash do texto limpo e
+a versão do pipeline que gerou os sinais. Numa nova execução, as linhas cujo ID
+tem o mesmo hash e a mesma versão reaproveitam os sinais (Regex, NER, rótulo)
+da saída anterior; só as linhas novas ou editadas passam de novo pelo Regex e
+pelo spaCy.
+
+O manifesto fica ao lado da saída, em Parquet:
+"dados_processed.parquet" -> "dados_processed.manifest.parquet".
+"""
+
+import hashlib
+import os
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_io import read_table, write_table
+
+MANIFEST_COLUMNS = ["text_hash", "pipeline_version"]
+
+
+def manifest_path(output_path: str) -> str:
+    """Caminho do manifesto correspondente a um arquivo de saída."""
+    return os.path.splitext(output_path)[0] + ".manifest.parquet"
+
+
+def text_hashes(texts: Iterable[str]) -> List[str]:
+    """Hash (BLAKE2b, 128 bits) de cada texto, na mesma ordem."""
+    return [hashlib.blake2b(str(text).encode("utf-8"), digest_size=16).hexdigest() for text in texts]
+
+
+def load_manifest(path: str) -> Optional[pd.DataFrame]:
+    """Lê o manifesto (índice ID), ou None se ele não existir ou estiver ilegível."""
+    if not os.path.exists(path):
+        return None
+    try:
+        manifest = read_table(path)
+    except Exception:
+        return None
+    if not set(MANIFEST_COLUMNS) <= set(manifest.columns) or not manifest.index.is_unique:
+        return None
+    return manifest
+
+
+def save_manifest(path: str, hashes: pd.Series, pipeline_version: str):
+    """Grava o manifesto de uma saída: um hash por ID, todos com `pipeline_version`."""
+    manifest = pd.DataFrame({"text_hash": hashes, "pipeline_version": pipeline_version}, index=hashes.index)
+    write_table(manifest, path)
+
+
+def remove_manifest(output_path: str):
+    """
+    Apaga o manifesto de uma saída, se existir. Deve ser chamado antes de
+    qualquer gravação não incremental da saída, para que o manifesto nunca
+    descreva um arquivo diferente do que está em disco.
+    """
+    try:
+        os.remove(manifest_path(output_path))
+    except FileNotFoundError:
+        pass
+
+
+def unchanged_rows(manifest: Optional[pd.DataFrame], hashes: pd.Series, pipeline_version: str) -> np.ndarray:
+    """
+    Máscara booleana (uma posição por item de `hashes`): True onde o manifesto
+    tem o mesmo ID, o mesmo hash e a mesma versão do pipeline.
+    """
+    if manifest is None:
+        return np.zeros(len(hashes), dtype=bool)
+
+    previous = manifest.reindex(hashes.index)
+    return (
+        (previous["text_hash"] == hashes) & (previous["pipeline_version"] == pipeline_version)
+    ).to_numpy(dtype=bool)
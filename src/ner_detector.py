@@ -1,6 +1,12 @@
+import os
+from pathlib import Path
+
 import spacy
-from spacy.util import is_package
-from typing import Dict, List, Iterable
+from spacy.util import get_model_meta, get_package_path, is_package
+from typing import Any, Dict, List, Iterable, Iterator, Optional, Tuple
+
+# Componentes necessários para preencher doc.ents
+NER_COMPONENTS = ("tok2vec", "ner")
 
 
 class NamedEntityDetector:
@@ -21,34 +27,70 @@ class NamedEntityDetector:
     - ORG: organizações (menos sensível, mas contextual)
     """
 
-    def __init__(self, model_name: str = "pt_core_news_lg"):
+    def __init__(self, model_name: str = "pt_core_news_lg", keep_components: Optional[Iterable[str]] = NER_COMPONENTS):
         """
         Inicializa o extrator carregando o modelo spaCy.
 
         Parameters
         ----------
         model_name : str
-            Nome do modelo spaCy em português a ser utilizado.
+            Nome do modelo spaCy em português a ser utilizado (ou o diretório
+            de um pipeline salvo com `nlp.to_disk`).
             Exemplo: 'pt_core_news_sm' ou 'pt_core_news_md ou 'pt_core_news_lg'
+        keep_components : Iterable[str] ou None
+            Componentes do pipeline a carregar. O detector só lê `doc.ents`, então
+            por padrão tagger, parser, lemmatizer etc. nem são carregados, e o
+            `tok2vec` compartilhado também sai se o NER tiver o próprio tok2vec.
+            None carrega o pipeline completo.
         """
 
-        if not is_package(model_name):
+        if not (is_package(model_name) or os.path.isdir(model_name)):
             raise ImportError(
                 f"O modelo '{model_name}' não foi encontrado. "
                 f"Por favor, execute: python -m spacy download {model_name}"
             )
-        
-        self.nlp = spacy.load(model_name)
 
-    def _process_doc(self, doc) -> Dict[str, int]:
+        if keep_components is None:
+            self.nlp = spacy.load(model_name)
+            return
+
+        keep = set(keep_components)
+        exclude = [name for name in self._component_names(model_name) if name not in keep]
+        self.nlp = spacy.load(model_name, exclude=exclude)
+
+        # O tok2vec compartilhado só é útil se algum componente mantido o escuta
+        if "tok2vec" in self.nlp.pipe_names:
+            listeners = self.nlp.get_pipe("tok2vec").listening_components
+            if not any(name in self.nlp.pipe_names for name in listeners):
+                self.nlp.remove_pipe("tok2vec")
+
+    @staticmethod
+    def _component_names(model_name: str) -> List[str]:
         """
-        Processa um documento spaCy e retorna os sinais extraídos.
+        Nomes de todos os componentes do pipeline (inclusive os desativados),
+        lidos do meta.json, sem carregar o modelo.
+        """
+        path = get_package_path(model_name) if is_package(model_name) else Path(model_name)
+        meta = get_model_meta(path)
+        return list(meta.get("components") or meta.get("pipeline", []))
+
+    @staticmethod
+    def _split_entities(doc) -> Tuple[list, list, list]:
+        """
+        Separa as entidades do documento em pessoas, localizações e organizações.
         """
         # Filtra entidades de pessoas (PER) que possuem pelo menos 2 palavras (ex: Nome Sobrenome)
         # Isso ajuda a reduzir falsos positivos com palavras isoladas que o modelo confunde com nomes.
         persons = [ent for ent in doc.ents if ent.label_ == "PER" and len(ent.text.strip().split()) >= 2]
         locations = [ent for ent in doc.ents if ent.label_ in ("LOC", "GPE")]
         organizations = [ent for ent in doc.ents if ent.label_ == "ORG"]
+        return persons, locations, organizations
+
+    def _process_doc(self, doc) -> Dict[str, int]:
+        """
+        Processa um documento spaCy e retorna os sinais extraídos.
+        """
+        persons, locations, organizations = self._split_entities(doc)
 
         return {
             "has_person_entity": int(len(persons) > 0),
@@ -77,7 +119,12 @@ class NamedEntityDetector:
         doc = self.nlp(text)
         return self._process_doc(doc)
 
-    def extract_signals_batch(self, texts: Iterable[str]) -> List[Dict[str, int]]:
+    def extract_signals_batch(
+        self,
+        texts: Iterable[str],
+        n_process: int = 1,
+        batch_size: Optional[int] = None
+    ) -> List[Dict[str, int]]:
         """
         Analisa uma lista de textos e retorna sinais baseados em entidades nomeadas usando nlp.pipe para eficiência.
 
@@ -85,14 +132,69 @@ class NamedEntityDetector:
         ----------
         texts : Iterable[str]
             Lista de textos a serem analisados.
+        n_process : int
+            Número de processos do nlp.pipe (-1 usa todos os núcleos). A ordem
+            dos resultados é sempre a mesma dos textos de entrada.
+        batch_size : int, opcional
+            Textos por lote enviados a cada processo. None usa o padrão do spaCy.
 
         Returns
         -------
         List[Dict[str, int]]
             Lista de dicionários contendo sinais binários e contagens de entidades.
         """
-        docs = self.nlp.pipe(texts)
-        return [self._process_doc(doc) for doc in docs]
+        return list(self.iter_signals(texts, n_process=n_process, batch_size=batch_size))
+
+    def iter_signals(
+        self,
+        texts: Iterable[str],
+        n_process: int = 1,
+        batch_size: Optional[int] = None
+    ) -> Iterator[Dict[str, int]]:
+        """
+        Versão preguiçosa de `extract_signals_batch`: os textos são lidos e os
+        sinais produzidos conforme o consumo, por um único nlp.pipe. Útil para
+        passar um arquivo inteiro, bloco a bloco, pelos mesmos processos.
+        """
+        for doc in self.nlp.pipe(texts, n_process=n_process, batch_size=batch_size):
+            yield self._process_doc(doc)
+
+    def extract_signals_and_spans_batch(
+        self,
+        texts: Iterable[str],
+        n_process: int = 1,
+        batch_size: Optional[int] = None
+    ) -> List[Tuple[Dict[str, int], List[Dict[str, Any]]]]:
+        """
+        Igual a `extract_signals_batch`, mas também retorna as posições (spans)
+        das pessoas e localizações encontradas, a partir do mesmo `doc`.
+
+        Returns
+        -------
+        List[Tuple[Dict[str, int], List[Dict[str, Any]]]]
+            Para cada texto: (sinais, spans). Cada span é um dicionário com
+            start, end (offsets de caractere), type ('person' ou 'location')
+            e source ('ner').
+        """
+        return list(self.iter_signals_and_spans(texts, n_process=n_process, batch_size=batch_size))
+
+    def iter_signals_and_spans(
+        self,
+        texts: Iterable[str],
+        n_process: int = 1,
+        batch_size: Optional[int] = None
+    ) -> Iterator[Tuple[Dict[str, int], List[Dict[str, Any]]]]:
+        """
+        Versão preguiçosa de `extract_signals_and_spans_batch` (veja `iter_signals`).
+        """
+        for doc in self.nlp.pipe(texts, n_process=n_process, batch_size=batch_size):
+            persons, locations, _ = self._split_entities(doc)
+            spans = [
+                {"start": ent.start_char, "end": ent.end_char, "type": entity_type, "source": "ner"}
+                for entity_type, ents in (("person", persons), ("location", locations))
+                for ent in ents
+            ]
+            yield self._process_doc(doc), spans
 
     def contains_potential_pii(self, text: str) -> bool:
         """
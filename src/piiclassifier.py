@@ -1,9 +1,36 @@
+import copy
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import numpy as np
 import torch
 import torch.nn as nn
+from torch.ao.quantization import quantize_dynamic
+from torch.nn.utils.rnn import pad_sequence
 from torch.utils.data import Dataset, DataLoader
-from transformers import AutoTokenizer, AutoModel
-from typing import List, Any, cast
+from safetensors.torch import load_file, save_file
+from transformers import AutoConfig, AutoTokenizer, AutoModel, PretrainedConfig
+from typing import List, Any, Optional, Sequence, cast
 from score_calculator import ScoreCalculator
+from inference_backends import EXPORT_FILES
+
+logger = logging.getLogger(__name__)
+
+# Pesos do bundle (config.json + tokenizer + safetensors) gravado por `PIIClassifier.save`
+WEIGHTS_FILE = "model.safetensors"
+# Formato antigo: só o state_dict, sem config nem tokenizer
+LEGACY_WEIGHTS_FILE = "model_state.bin"
+# Pesos do modelo quantizado (int8), salvos ao lado dos pesos fp32
+# Pesos int8 persistidos por versões anteriores; `load(quantize=True)` quantiza a cada carga
+QUANTIZED_WEIGHTS_FILE = "model_state_int8.bin"
+# Arquivos gerados a partir dos pesos; `save` os apaga, porque deixam de corresponder aos pesos novos
+# (thresholds.json: thresholds de decisão calibrados por calibrate.py; EXPORT_FILES: grafos
+# TorchScript/ONNX de export_model.py)
+DERIVED_FILES = (QUANTIZED_WEIGHTS_FILE, "thresholds.json", *EXPORT_FILES.values())
 
 # ==============================================================================
 # 1. O PREPARADOR DE DADOS (Dataset)
@@ -15,41 +42,153 @@ class PIIDataset(Dataset[Any]):
     
     O BERT não lê strings, ele lê 'input_ids' (índices numéricos de vocabulário)
     e 'attention_mask' (para ignorar preenchimentos/padding).
+
+    A tokenização é feita uma única vez, em lote, no construtor (tokenizer fast):
+    os token ids de todos os textos ficam concatenados em um array compacto
+    (`token_ids`) e `offsets[i]:offsets[i + 1]` delimita o texto i. Com `cache_dir`,
+    os arrays são gravados em disco, indexados pelo hash dos textos, pelo tokenizer
+    e por max_len, e nas execuções seguintes são mapeados em memória (mmap) sem
+    carregar o tokenizer. `__getitem__` só recorta os arrays.
     """
-    def __init__(self, texts: List[str], labels: List[int], model_name: str = "neuralmind/bert-base-portuguese-cased", max_len: int = 128):
-        self.texts: List[str] = texts
-        self.labels = labels
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+    # Textos por chamada ao tokenizer: limita as listas Python intermediárias
+    TOKENIZE_BATCH_SIZE = 4096
+    # Muda quando o formato dos arquivos do cache muda
+    CACHE_VERSION = "1"
+
+    def __init__(
+        self,
+        texts: List[str],
+        labels: List[int],
+        model_name: str = "neuralmind/bert-base-portuguese-cased",
+        max_len: int = 128,
+        tokenizer: Any = None,
+        cache_dir: Optional[str] = None
+    ):
+        self.labels = np.asarray(labels, dtype=np.int64)
         self.max_len = max_len
+        texts = [str(text) for text in texts]
+        tokenizer_name = tokenizer.name_or_path if tokenizer is not None else model_name
+
+        cache_path = self._cache_path(cache_dir, texts, tokenizer_name) if cache_dir else None
+        if cache_path and os.path.exists(os.path.join(cache_path, "meta.json")):
+            self._load_cache(cache_path)
+            return
+
+        if tokenizer is None:
+            tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+        self.pad_token_id: int = tokenizer.pad_token_id or 0
+        self.token_ids, self.offsets = self._tokenize(texts, tokenizer)
+
+        if cache_path:
+            try:
+                self._save_cache(cache_path, tokenizer_name)
+            except OSError as e:
+                logger.warning(f"Não foi possível salvar o cache de tokens em {cache_path}: {e}")
 
     def __len__(self):
         # O DataLoader precisa saber quantos exemplos existem no total
-        return len(self.texts)
+        return len(self.labels)
 
     def __getitem__(self, item: int) -> dict[str, torch.Tensor]:
         # Esse método é chamado para pegar 1 exemplo específico pelo índice
-        text = str(self.texts[item])
-        label = self.labels[item]
-
-        # Tokenização: Transforma "Eu gosto de Python" em [101, 234, 567, ..., 102]
-        encoding = self.tokenizer(
-            text,
-            add_special_tokens=True,    # Adiciona [CLS] no início e [SEP] no fim
-            max_length=self.max_len,
-            return_token_type_ids=False,
-            padding='max_length',       # Preenche frases curtas com 0s até max_len
-            truncation=True,            # Corta frases longas
-            return_attention_mask=True, # Cria a máscara (1 para texto real, 0 para padding)
-            return_tensors='pt',        # Retorna tensores do PyTorch
-        )
+        # Os textos já estão tokenizados: só recorta o trecho do texto `item`
+        # (sem padding aqui: o preenchimento é feito por lote em `collate_fn`)
+        start, end = self.offsets[item], self.offsets[item + 1]
+        return {
+            'input_ids': torch.from_numpy(self.token_ids[start:end].astype(np.int64)),
+            'labels': torch.tensor(self.labels[item], dtype=torch.long)
+        }
+
+    def _tokenize(self, texts: List[str], tokenizer: Any) -> tuple[np.ndarray, np.ndarray]:
+        """Tokeniza todos os textos em lote: (token_ids concatenados, offsets com n + 1 posições)."""
+        # O vocabulário do BERTimbau (~30k) cabe em uint16: metade da memória de int32
+        dtype = np.uint16 if len(tokenizer) <= np.iinfo(np.uint16).max + 1 else np.int32
+        chunks: List[np.ndarray] = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+
+        for start in range(0, len(texts), self.TOKENIZE_BATCH_SIZE):
+            # Tokenização: Transforma "Eu gosto de Python" em [101, 234, 567, ..., 102]
+            encodings = tokenizer(
+                texts[start:start + self.TOKENIZE_BATCH_SIZE],
+                add_special_tokens=True,    # Adiciona [CLS] no início e [SEP] no fim
+                max_length=self.max_len,
+                return_token_type_ids=False,
+                truncation=True,            # Corta frases longas
+                return_attention_mask=False,
+            )['input_ids']
+            lengths[start:start + len(encodings)] = [len(ids) for ids in encodings]
+            chunks.append(np.fromiter(itertools.chain.from_iterable(encodings), dtype=dtype))
+
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        token_ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+        return token_ids, offsets
+
+    def _cache_path(self, cache_dir: str, texts: List[str], tokenizer_name: str) -> str:
+        digest = hashlib.sha256(f"{self.CACHE_VERSION}\x00{tokenizer_name}\x00{self.max_len}".encode("utf-8"))
+        for text in texts:
+            digest.update(b"\x00")
+            digest.update(text.encode("utf-8"))
+        return os.path.join(cache_dir, digest.hexdigest()[:32])
 
+    def _load_cache(self, cache_path: str):
+        with open(os.path.join(cache_path, "meta.json"), encoding="utf-8") as f:
+            self.pad_token_id = json.load(f)["pad_token_id"]
+        self.token_ids = np.load(os.path.join(cache_path, "token_ids.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(cache_path, "offsets.npy"), mmap_mode="r")
+        logger.info(f"Tokens carregados do cache: {cache_path}")
+
+    def _save_cache(self, cache_path: str, tokenizer_name: str):
+        # Grava num diretório temporário e renomeia: um cache pela metade nunca é lido
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+        np.save(os.path.join(tmp_path, "token_ids.npy"), self.token_ids)
+        np.save(os.path.join(tmp_path, "offsets.npy"), self.offsets)
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "tokenizer": tokenizer_name,
+                "max_len": self.max_len,
+                "n_texts": len(self.offsets) - 1,
+                "pad_token_id": self.pad_token_id,
+            }, f)
+        try:
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Outro processo gravou o mesmo cache ao mesmo tempo
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def collate_fn(self, batch: List[dict[str, torch.Tensor]]) -> dict[str, torch.Tensor]:
+        """
+        Junta exemplos de tamanhos diferentes em um lote, preenchendo (padding)
+        apenas até o maior texto do lote em vez de sempre até max_len.
+        """
+        input_ids, attention_mask = pad_token_ids(
+            [b['input_ids'] for b in batch],
+            pad_token_id=self.pad_token_id
+        )
         return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'labels': torch.tensor(label, dtype=torch.long)
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'labels': torch.stack([b['labels'] for b in batch])
         }
 
 
+def pad_token_ids(sequences: Sequence[Sequence[int] | torch.Tensor], pad_token_id: int = 0) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Preenche sequências de token ids até a maior delas (padding dinâmico).
+
+    Retorna:
+        tuple: (input_ids, attention_mask), ambos com shape (n, maior_sequência).
+    """
+    tensors = [s if isinstance(s, torch.Tensor) else torch.tensor(s, dtype=torch.long) for s in sequences]
+    input_ids = pad_sequence(tensors, batch_first=True, padding_value=pad_token_id)
+    attention_mask = pad_sequence(
+        [torch.ones(len(t), dtype=torch.long) for t in tensors], batch_first=True, padding_value=0
+    )
+    return input_ids, attention_mask
+
+
 # ==============================================================================
 # 2. O MODELO (BERT + Classificador)
 # ==============================================================================
@@ -59,10 +198,11 @@ class PIIClassifier(nn.Module):
     - Corpo: BERT pré-treinado (extrai características complexas do texto).
     - Cabeça: Camada Linear simples (toma a decisão final entre 0 e 1).
     """
-    def __init__(self, model_name: str = "neuralmind/bert-base-portuguese-cased", n_classes: int = 2):
+    def __init__(self, model_name: str = "neuralmind/bert-base-portuguese-cased", n_classes: int = 2, config: Optional[PretrainedConfig] = None):
         super(PIIClassifier, self).__init__()
         # Carregamos o cérebro pré-treinado
-        self.bert = AutoModel.from_pretrained(model_name)
+        # Com `config`, só a arquitetura é montada: os pesos vêm do bundle (veja `load`)
+        self.bert = AutoModel.from_config(config) if config is not None else AutoModel.from_pretrained(model_name)
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         
         # Adicionamos uma camada de Dropout com p=0.5 para dificultar overfitting
@@ -87,65 +227,251 @@ class PIIClassifier(nn.Module):
         # 3. Passar pela camada de decisão final
         return self.out(output)
 
-    def save(self, path: str):
-        """Salva os pesos do modelo e o tokenizer."""
-        torch.save(self.state_dict(), f"{path}/model_state.bin")
-        # É importante salvar a config se quisermos carregar dinamicamente depois,
-        # mas por hora, assumimos que quem carrega sabe os hiperparâmetros.
+    def save(self, path: str, half: bool = False):
+        """
+        Salva um bundle completo em `path`: config.json, arquivos do tokenizer e
+        pesos em model.safetensors. `load` monta o modelo só a partir dele,
+        sem baixar o checkpoint base do Hugging Face Hub.
+
+        Com `half=True`, os pesos de ponto flutuante são gravados em fp16 (metade do
+        tamanho em disco); `load` os converte de volta para fp32.
+
+        Arquivos derivados dos pesos anteriores (DERIVED_FILES: a versão int8 gravada
+        por versões anteriores, os thresholds calibrados e os grafos exportados)
+        são apagados: seriam usados com os pesos novos. Depois de salvar, rode
+        `export_model.py` de novo para usar os backends TorchScript/ONNX.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in DERIVED_FILES:
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+
+        # O número de classes da cabeça vai junto na config (num_labels)
+        config = copy.deepcopy(self.bert.config)
+        config.num_labels = self.out.out_features
+        config.save_pretrained(path)
+        self.tokenizer.save_pretrained(path)
+
+        # Buffers não persistentes (ex.: position_ids do BERT) ficam fora do state_dict,
+        # mas também são gravados para que o modelo montado no device "meta" fique completo
+        tensors = {name: buffer for name, buffer in self.named_buffers()}
+        tensors.update(self.state_dict())
+        tensors = {name: tensor.detach().cpu().contiguous() for name, tensor in tensors.items()}
+        if half:
+            tensors = {name: t.half() if t.is_floating_point() else t for name, t in tensors.items()}
+        save_file(tensors, os.path.join(path, WEIGHTS_FILE))
+
+    @staticmethod
+    def weights_file(path: str) -> str:
+        """Nome do arquivo de pesos em `path`: o bundle safetensors ou, se não houver, o formato antigo."""
+        return WEIGHTS_FILE if os.path.exists(os.path.join(path, WEIGHTS_FILE)) else LEGACY_WEIGHTS_FILE
 
     @classmethod
-    def load(cls, path: str, model_name: str = "neuralmind/bert-base-portuguese-cased", n_classes: int = 2):
-        """Carrega um modelo treinado do disco."""
-        model = cls(model_name, n_classes)
-        model.load_state_dict(torch.load(f"{path}/model_state.bin", map_location=torch.device('cpu')))
+    def load(cls, path: str, model_name: str = "neuralmind/bert-base-portuguese-cased", n_classes: int = 2, quantize: bool = False):
+        """
+        Carrega um modelo treinado do disco.
+
+        Bundles gravados por `save` são montados direto da config, sem alocar pesos
+        aleatórios, e os pesos do safetensors são mapeados em memória (mmap) em vez
+        de copiados. Diretórios no formato antigo (só model_state.bin) ainda
+        funcionam: nesse caso `model_name` e `n_classes` descrevem a arquitetura.
+
+        Com `quantize=True`, retorna a versão int8 (veja `quantize`), quantizada a
+        partir dos pesos fp32 nesta carga. Nada é gravado no diretório: a versão int8
+        sempre corresponde aos pesos atuais, e nenhum pickle arbitrário é lido.
+        """
+        if cls.weights_file(path) == WEIGHTS_FILE:
+            model = cls._load_bundle(path)
+        else:
+            model = cls(model_name, n_classes)
+            model.load_state_dict(torch.load(os.path.join(path, LEGACY_WEIGHTS_FILE), map_location=torch.device('cpu'), mmap=True))
+
+        if not quantize:
+            return model
+
+        return model.quantize()
+
+    @classmethod
+    def _load_bundle(cls, path: str) -> "PIIClassifier":
+        config = AutoConfig.from_pretrained(path)
+
+        # A arquitetura é criada no device "meta" (sem memória nem inicialização)
+        # e os tensores do safetensors, mapeados em memória, entram no lugar
+        with torch.device("meta"):
+            model = cls(path, config.num_labels, config=config)
+        tensors = load_file(os.path.join(path, WEIGHTS_FILE))
+        # Bundles gravados com `save(half=True)` voltam para fp32 (aqui os pesos são copiados, sem mmap)
+        tensors = {name: t.float() if t.dtype == torch.float16 else t for name, t in tensors.items()}
+        model.load_state_dict({name: tensors[name] for name in model.state_dict()}, assign=True)
+
+        for name, buffer in list(model.named_buffers()):
+            if buffer.is_meta:
+                module_name, _, attr = name.rpartition(".")
+                model.get_submodule(module_name).register_buffer(attr, tensors[name], persistent=False)
+
         return model
 
+    def quantize(self) -> "PIIClassifier":
+        """
+        Retorna uma cópia do modelo com quantização dinâmica int8 nas camadas
+        lineares (as do BERT e a cabeça de classificação).
+
+        Os pesos ficam em int8 e as ativações são quantizadas em tempo de execução:
+        ~4x menos memória nas camadas lineares e inferência mais rápida em CPU.
+        O modelo quantizado só roda em CPU e serve apenas para inferência.
+        """
+        return quantize_dynamic(self.cpu().eval(), {nn.Linear}, dtype=torch.qint8)
+
 
 # ==============================================================================
 # 3. O LOOP DE TREINO (Exemplo de função)
 # ==============================================================================
-def train_epoch(model: nn.Module, data_loader: DataLoader[Any], loss_fn: nn.Module, optimizer: torch.optim.Optimizer, device: torch.device, n_examples: int) -> tuple[float, float, float, float]:
+# Precisões aceitas por `train_epoch` e o dtype do autocast correspondente
+PRECISIONS = {"fp32": None, "bf16": torch.bfloat16, "fp16": torch.float16}
+
+
+def resolve_precision(precision: str, device: torch.device) -> str:
+    """
+    Resolve `precision` ('auto', 'fp32', 'bf16' ou 'fp16') para o device.
+
+    'auto' escolhe bf16 em CPU e em GPUs que o suportam, senão fp16 (CUDA/MPS).
+    fp16 em CPU não é suportado pelo autocast: nesse caso usa bf16.
+    """
+    if precision == "auto":
+        if device.type == "cuda":
+            return "bf16" if torch.cuda.is_bf16_supported() else "fp16"
+        return "fp16" if device.type == "mps" else "bf16"
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precisão desconhecida: '{precision}' (use 'auto' ou um de {tuple(PRECISIONS)})")
+    if precision == "fp16" and device.type == "cpu":
+        logger.warning("fp16 não é suportado em CPU; usando bf16.")
+        return "bf16"
+    return precision
+
+
+def train_epoch(
+    model: nn.Module,
+    data_loader: DataLoader[Any],
+    loss_fn: nn.Module,
+    optimizer: torch.optim.Optimizer,
+    device: torch.device,
+    n_examples: int,
+    precision: str = "fp32",
+    accumulation_steps: int = 1,
+    scaler: Optional["torch.amp.GradScaler"] = None
+) -> tuple[float, float, float, float]:
+    """
+    Uma época de treino.
+
+    - `precision`: 'bf16'/'fp16' rodam o forward em autocast (veja `resolve_precision`).
+      Com fp16, passe um `scaler` (GradScaler) para evitar underflow dos gradientes.
+    - `accumulation_steps`: acumula os gradientes de N lotes antes de cada passo do
+      otimizador; o lote efetivo é N x o lote do `data_loader`.
+
+    Predições e rótulos vão para tensores pré-alocados de `n_examples` posições.
+    """
     model = model.train() # Coloca o modelo em modo de treino (ativa dropout, etc)
-    
-    losses: List[float] = []
-    correct_predictions: int | torch.Tensor = 0
-    
-    all_preds = []
-    all_targets = []
-    
-    for d in data_loader:
+    autocast_dtype = PRECISIONS[precision]
+    n_batches = len(data_loader)
+
+    total_loss = torch.zeros((), device=device)
+    all_preds = torch.empty(n_examples, dtype=torch.long, device=device)
+    all_targets = torch.empty(n_examples, dtype=torch.long, device=device)
+    position = 0
+
+    for step, d in enumerate(data_loader):
         input_ids = d["input_ids"].to(device)
         attention_mask = d["attention_mask"].to(device)
         targets = d["labels"].to(device)
 
         # A. Foward Pass: O modelo faz a previsão
-        outputs = model(
-            input_ids=input_ids,
-            attention_mask=attention_mask
-        )
-
-        # B. Cálculo do Erro: Quão longe a previsão estava do real?
-        _, preds = torch.max(outputs, dim=1)
-        loss = loss_fn(outputs, targets)
-
-        correct_predictions += torch.sum(preds == targets)
-        losses.append(loss.item())
+        with torch.autocast(device_type=device.type, dtype=autocast_dtype, enabled=autocast_dtype is not None):
+            outputs = model(
+                input_ids=input_ids,
+                attention_mask=attention_mask
+            )
+            # B. Cálculo do Erro: Quão longe a previsão estava do real?
+            loss = loss_fn(outputs.float(), targets)
 
-        all_preds.extend(preds)
-        all_targets.extend(targets)
+        preds = outputs.argmax(dim=1)
+        all_preds[position:position + len(preds)] = preds
+        all_targets[position:position + len(targets)] = targets
+        position += len(targets)
+        total_loss += loss.detach()
 
         # C. Backward Pass: "Aprender" com o erro
-        loss.backward()  # Calcula gradientes (direção do ajuste)
-        nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0) # Evita explosão de gradientes
-        optimizer.step() # Atualiza os pesos
-        optimizer.zero_grad() # Zera gradientes para o próximo passo
+        # O último grupo pode ter menos lotes: a média é sobre os lotes que ele tem
+        group_start = step - step % accumulation_steps
+        group_size = min(accumulation_steps, n_batches - group_start)
+        scaled_loss = loss / group_size
+        if scaler is not None:
+            scaler.scale(scaled_loss).backward()
+        else:
+            scaled_loss.backward()  # Calcula gradientes (direção do ajuste)
 
-    accuracy = correct_predictions.float() / n_examples # type: ignore
+        if step + 1 == group_start + group_size:
+            if scaler is not None:
+                scaler.unscale_(optimizer)
+            nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0) # Evita explosão de gradientes
+            if scaler is not None:
+                scaler.step(optimizer)
+                scaler.update()
+            else:
+                optimizer.step() # Atualiza os pesos
+            optimizer.zero_grad() # Zera gradientes para o próximo passo
+
+    all_preds = all_preds[:position]
+    all_targets = all_targets[:position]
+    accuracy = (all_preds == all_targets).sum().float() / n_examples
     
-    # Calculate F1 using ScoreCalculator
-    # Note: all_preds and all_targets are lists of tensors, we can stack them or pass as list
-    # ScoreCalculator handles list of tensors if we ensure they are clean
+    # Calculate F1 using ScoreCalculator (tensores vão para a CPU uma única vez)
     f1 = ScoreCalculator.calculate_f1(all_targets, all_preds)
     recall = ScoreCalculator.calculate_recall(all_targets, all_preds)
     
-    return accuracy.item(), sum(losses) / len(losses), f1, recall
\ No newline at end of file
+    return accuracy.item(), total_loss.item() / n_batches, f1, recall
+
+
+def eval_model(
+    model: nn.Module,
+    data_loader: DataLoader[Any],
+    loss_fn: nn.Module,
+    device: torch.device,
+    n_examples: int,
+    precision: str = "fp32"
+) -> tuple[float, float, float, float]:
+    """
+    Avalia o modelo (sem gradientes, dropout desligado) em um conjunto separado.
+
+    Retorna as mesmas métricas de `train_epoch`: (acurácia, loss, F1, recall).
+    """
+    model = model.eval()
+    autocast_dtype = PRECISIONS[precision]
+
+    total_loss = torch.zeros((), device=device)
+    all_preds = torch.empty(n_examples, dtype=torch.long, device=device)
+    all_targets = torch.empty(n_examples, dtype=torch.long, device=device)
+    position = 0
+
+    with torch.inference_mode():
+        for d in data_loader:
+            targets = d["labels"].to(device)
+            with torch.autocast(device_type=device.type, dtype=autocast_dtype, enabled=autocast_dtype is not None):
+                outputs = model(
+                    input_ids=d["input_ids"].to(device),
+                    attention_mask=d["attention_mask"].to(device)
+                )
+                total_loss += loss_fn(outputs.float(), targets)
+
+            all_preds[position:position + len(targets)] = outputs.argmax(dim=1)
+            all_targets[position:position + len(targets)] = targets
+            position += len(targets)
+
+    all_preds = all_preds[:position]
+    all_targets = all_targets[:position]
+    accuracy = (all_preds == all_targets).sum().float() / n_examples
+    f1 = ScoreCalculator.calculate_f1(all_targets, all_preds)
+    recall = ScoreCalculator.calculate_recall(all_targets, all_preds)
+
+    return accuracy.item(), total_loss.item() / max(len(data_loader), 1), f1, recall
@@ -0,0 +1,146 @@
+"""
+Cache de resultados do HybridClassifier.
+
+Os feeds do e-SIC têm muitos textos repetidos ou quase idênticos (modelos de
+pedido), e reavaliações reprocessam exatamente as mesmas entradas. Este módulo
+guarda o dicionário completo retornado por `HybridClassifier.predict`, indexado
+por um hash do texto normalizado, do checkpoint do modelo e dos thresholds.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Arquivos de pesos, em ordem de preferência: bundle safetensors e formato antigo
+WEIGHTS_FILES = ("model.safetensors", "model_state.bin")
+
+
+def model_fingerprint(model_path: str, weights_file: Optional[str] = None) -> str:
+    """
+    Calcula um hash SHA-256 do arquivo de pesos do modelo.
+
+    Qualquer alteração nos pesos (ou no grafo exportado indicado em
+    `weights_file`) gera uma impressão digital nova e, portanto, invalida as
+    entradas do cache criadas com os pesos antigos. Sem `weights_file`, usa o
+    primeiro de WEIGHTS_FILES que existir em `model_path`.
+    """
+    if weights_file is None:
+        weights_file = next(
+            (name for name in WEIGHTS_FILES if os.path.exists(os.path.join(model_path, name))),
+            WEIGHTS_FILES[-1]
+        )
+
+    digest = hashlib.sha256()
+    with open(os.path.join(model_path, weights_file), "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Cache LRU em memória, com persistência opcional em SQLite.
+
+    - Em memória: no máximo `max_size` resultados; o menos usado sai primeiro.
+    - Em disco (opcional): todas as entradas ficam no SQLite e sobrevivem entre
+      execuções. Um acerto no disco volta para a memória.
+    - `namespace` identifica o modelo e os thresholds. Ao abrir o arquivo, entradas
+      de outro namespace (ex.: pesos antigos) são descartadas.
+    """
+
+    def __init__(self, namespace: str, max_size: int = 100_000, db_path: Optional[str] = None):
+        self.namespace = namespace
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, namespace TEXT, result TEXT)"
+            )
+            removed = self._db.execute("DELETE FROM predictions WHERE namespace != ?", (namespace,)).rowcount
+            self._db.commit()
+            if removed:
+                logger.info(f"Cache: {removed} entradas de outro modelo/configuração removidas de {db_path}")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normaliza o texto para a chave do cache.
+
+        Apenas espaços nas pontas são removidos: eles não mudam nenhum validador.
+        Espaços internos não são colapsados, pois o Regex de telefone depende deles.
+        """
+        return str(text).strip()
+
+    def make_key(self, text: str, threshold: float) -> str:
+        """Chave do cache para um texto e um threshold de decisão."""
+        payload = f"{self.namespace}\x00{threshold!r}\x00{self.normalize(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna uma cópia do resultado guardado, ou None."""
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        elif self._db is not None:
+            row = self._db.execute("SELECT result FROM predictions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                result = json.loads(row[0])
+                self._remember(key, result)
+
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return copy.deepcopy(result)
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Guarda uma cópia do resultado (memória e, se configurado, disco)."""
+        self.put_many({key: result})
+
+    def put_many(self, results: Dict[str, Dict[str, Any]]):
+        """Guarda vários resultados de uma vez (uma única transação no disco)."""
+        for key, result in results.items():
+            self._remember(key, copy.deepcopy(result))
+        if self._db is not None and results:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO predictions (key, namespace, result) VALUES (?, ?, ?)",
+                [(key, self.namespace, json.dumps(result)) for key, result in results.items()],
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Contadores de acertos (hits) e falhas (misses)."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
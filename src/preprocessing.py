@@ -1,12 +1,19 @@
 import pandas as pd
 import re
 import argparse
+import os
 import sys
 import logging
-from typing import Any
+from collections import deque
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Any, Iterator
 from pandas import DataFrame
 from validator import Validator
 from ner_detector import NamedEntityDetector
+from redactor import Redactor
+from data_io import ChunkWriter, iter_chunks, read_table, write_table
+from manifest import load_manifest, manifest_path, remove_manifest, save_manifest, text_hashes, unchanged_rows
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,6 +23,41 @@ class Preprocessor:
     """
     Class responsible for preprocessing data for ShieldData.
     """
+
+    # A row is labeled 1 (contains PII) if any of these signals is 1
+    LABEL_COLUMNS = ["has_cpf", "has_email", "has_phone", "has_rg", "has_person_entity"]
+
+    # Bump whenever cleaning, regex, NER or labelling changes: incremental runs
+    # only reuse signals computed by the same pipeline version
+    PIPELINE_VERSION = "1"
+
+    def __init__(
+        self,
+        redact: bool = False,
+        n_process: int = 1,
+        ner_batch_size: int | None = None,
+        incremental: bool = False,
+        regex_workers: int = 1
+    ):
+        """
+        Args:
+            redact: If True, also writes a 'Texto Redigido' column with the PII spans
+                    masked. Spans, regex flags and NER signals come from the same pass.
+            n_process: Number of processes for the NER stage (spaCy nlp.pipe).
+                       -1 uses every CPU core. Output order is preserved.
+            ner_batch_size: Texts per nlp.pipe batch. None keeps spaCy's default.
+            incremental: If True, rows whose ID and cleaned text are unchanged since the
+                         previous run reuse the signals already in the output file; only
+                         new or edited rows go through regex and NER again.
+            regex_workers: Processes for the regex stage (-1 uses every CPU core). Texts
+                           are validated in contiguous shards; output order is preserved.
+        """
+        self.redact = redact
+        self.n_process = n_process
+        self.ner_batch_size = ner_batch_size
+        self.incremental = incremental
+        self.regex_workers = regex_workers
+        self._ner_detector: NamedEntityDetector | None = None
     
     @staticmethod
     def safe_clean(text: str) -> str:
@@ -30,24 +72,58 @@ class Preprocessor:
 
         return text
 
-    @staticmethod
-    def generate_labels(row: "pd.Series[Any]") -> int:
+    @classmethod
+    def generate_labels(cls, row: "pd.Series[Any]") -> int:
         """
         Generates a binary label based on the presence of PII signals.
         Returns 1 if any PII signal is found, 0 otherwise.
         """
-        cols = ["has_cpf", "has_email", "has_phone", "has_rg", "has_person_entity"]
         # Ensure we only check columns that actually exist in the row
-        valid_cols = [col for col in cols if col in row.index]
+        valid_cols = [col for col in cls.LABEL_COLUMNS if col in row.index]
         return 1 if any(row[col] == 1 for col in valid_cols) else 0
 
-    def process_file(self, input_path: str, output_path: str, clean_only: bool = False):
+    @classmethod
+    def generate_label_column(cls, df: DataFrame) -> "pd.Series[int]":
+        """
+        Column-wise version of `generate_labels`: labels every row of `df` at once.
         """
-        Main processing logic: reads excel, cleans, validates, performs NER, labels, and saves.
+        valid_cols = [col for col in cls.LABEL_COLUMNS if col in df.columns]
+        return (df[valid_cols] == 1).any(axis=1).astype(int)
+
+    def process_file(
+        self,
+        input_path: str,
+        output_path: str,
+        clean_only: bool = False,
+        chunk_size: int | None = None,
+        excel_output: str | None = None
+    ):
+        """
+        Main processing logic: reads the input, cleans, validates, performs NER, labels, and saves.
+
+        Input and output formats are picked from the file extensions (.xlsx, .csv,
+        .parquet or .feather). Parquet is the recommended output: training and
+        evaluation read it much faster than Excel. `excel_output` additionally
+        exports the same result as a spreadsheet for manual inspection.
+
+        With `chunk_size`, the input is streamed in chunks of that many rows and each
+        processed chunk is appended to the output (.xlsx, .csv or .parquet), so peak
+        memory depends on the chunk size instead of the file size.
+
+        With `incremental`, a manifest of (ID, text hash, pipeline version) is kept
+        next to the output and unchanged rows reuse the previous output's signals.
         """
+        if chunk_size:
+            if self.incremental:
+                logger.warning("Incremental mode is not available with chunk_size; processing every row.")
+            # The streamed output replaces the previous one: its manifest no longer applies
+            remove_manifest(output_path)
+            self._process_file_streaming(input_path, output_path, clean_only, chunk_size, excel_output)
+            return
+
         try:
             logger.info(f"Reading file from {input_path}...")
-            df: DataFrame = pd.read_excel(input_path, engine="openpyxl", index_col="ID")
+            df: DataFrame = read_table(input_path)
         except FileNotFoundError:
             logger.error(f"File not found: {input_path}")
             sys.exit(1)
@@ -55,52 +131,267 @@ class Preprocessor:
             logger.error(f"Error reading file: {e}")
             sys.exit(1)
 
+        hashes = None
+        if self.incremental and not clean_only:
+            df, hashes = self._process_frame_incremental(df, output_path)
+        else:
+            df = self._process_frame(df, clean_only)
+
+        try:
+            # Removed before the output is rewritten, so a failed or non-incremental
+            # write never leaves a manifest describing a different file
+            remove_manifest(output_path)
+            for path in filter(None, (output_path, excel_output)):
+                logger.info(f"Saving processed data to {path}...")
+                write_table(df, path)
+            # Written last: the manifest never describes an output that was not saved
+            if hashes is not None:
+                save_manifest(manifest_path(output_path), hashes, self.pipeline_version)
+            logger.info("Processing complete.")
+        except Exception as e:
+             logger.error(f"Error saving file: {e}")
+             sys.exit(1)
+
+    def _process_file_streaming(
+        self,
+        input_path: str,
+        output_path: str,
+        clean_only: bool,
+        chunk_size: int,
+        excel_output: str | None = None
+    ):
+        """
+        Streaming variant of `process_file`: read, process and write one chunk at a time.
+
+        The regex worker pool and the NER pipe (with its `n_process` workers) are
+        started once per file and shared by every chunk.
+        """
+        if not os.path.exists(input_path):
+            logger.error(f"File not found: {input_path}")
+            sys.exit(1)
+
+        logger.info(f"Streaming {input_path} in chunks of {chunk_size} rows...")
+        try:
+            writers = [ChunkWriter(path) for path in filter(None, (output_path, excel_output))]
+            try:
+                with Validator.worker_pool(self.regex_workers) as executor:
+                    chunks = self._iter_processed_chunks(input_path, chunk_size, clean_only, executor)
+                    for i, processed in enumerate(chunks):
+                        for writer in writers:
+                            writer.write(processed)
+                        logger.info(f"Chunk {i + 1}: {writers[0].rows_written} rows written to {output_path}")
+            finally:
+                for writer in writers:
+                    writer.close()
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+
+        logger.info("Processing complete.")
+
+    def _iter_processed_chunks(
+        self,
+        input_path: str,
+        chunk_size: int,
+        clean_only: bool,
+        executor: Executor | None = None
+    ) -> Iterator[DataFrame]:
+        """
+        Processed chunks of `input_path`, in file order.
+
+        The texts of every chunk go through a single nlp.pipe, so the NER worker
+        processes are not restarted for each chunk; the regex stage runs on `executor`.
+        """
+        chunks = (self._clean_frame(chunk) for chunk in iter_chunks(input_path, chunk_size))
+        if clean_only:
+            logger.info("Skipping validation and NER steps as requested...")
+            yield from chunks
+            return
+
+        # Chunks whose texts were already handed to the pipe, waiting for their results
+        fed: deque[DataFrame] = deque()
+
+        def texts() -> Iterator[str]:
+            for chunk in chunks:
+                if len(chunk):
+                    fed.append(chunk)
+                    yield from chunk['Texto Mascarado'].astype(str)
+
+        results: Iterator[dict]
+        if self.redact:
+            logger.info("Extracting PII spans (Regex + NER) and masking text...")
+            results = Redactor(self.ner_detector).iter_redact(
+                texts(), n_process=self.n_process, batch_size=self.ner_batch_size
+            )
+        else:
+            logger.info("Executando reconhecimento de entidades nomeadas (NER)...")
+            results = self.ner_detector.iter_signals(
+                texts(), n_process=self.n_process, batch_size=self.ner_batch_size
+            )
+
+        # Results come out in text order: once the first result of a chunk exists, the
+        # pipe has already read that chunk (and maybe the next ones) into `fed`
+        for first in results:
+            chunk = fed.popleft()
+            yield self._extract_signals(chunk, [first, *islice(results, len(chunk) - 1)], executor)
+
+    def _process_frame_incremental(self, df: DataFrame, output_path: str) -> tuple[DataFrame, "pd.Series[str]"]:
+        """
+        Incremental variant of `_process_frame`: rows listed in the manifest with the same
+        text hash and pipeline version take their signals from the previous output.
+
+        Returns the processed frame and the text hash of every row (the new manifest).
+        """
+        df = self._clean_frame(df)
+        hashes = pd.Series(text_hashes(df['Texto Mascarado']), index=df.index, name="text_hash")
+
+        manifest = load_manifest(manifest_path(output_path))
+        previous = None
+        if manifest is not None and os.path.exists(output_path) and df.index.is_unique:
+            try:
+                previous = read_table(output_path)
+            except Exception as e:
+                logger.warning(f"Could not read previous output {output_path} ({e}); processing every row.")
+        if previous is not None and not previous.index.is_unique:
+            previous = None
+        # An output without signals (e.g. written by a clean-only run) cannot be reused
+        missing = [col for col in self.LABEL_COLUMNS + ["Label"] if previous is not None and col not in previous.columns]
+        if missing:
+            logger.warning(f"Previous output {output_path} has no {missing} columns; processing every row.")
+            previous = None
+
+        reuse = unchanged_rows(manifest if previous is not None else None, hashes, self.pipeline_version)
+        if previous is not None:
+            reuse = reuse & df.index.isin(previous.index)
+
+        n_new = int((~df.index.isin(manifest.index)).sum()) if manifest is not None else len(df)
+        n_reused = int(reuse.sum())
+        logger.info(
+            f"Incremental run: {n_reused} rows reused, {len(df) - n_reused} recomputed "
+            f"({n_new} new, {len(df) - n_reused - n_new} edited or outdated)."
+        )
+
+        if n_reused == 0:
+            return self._extract_signals(df), hashes
+
+        signal_columns = [col for col in previous.columns if col not in df.columns]
+        reused = df[reuse].join(previous[signal_columns])
+        if n_reused == len(df):
+            return reused, hashes
+
+        recomputed = self._extract_signals(df[~reuse].copy())
+        result = pd.concat([reused, recomputed]).loc[df.index]
+        return result[recomputed.columns], hashes
+
+    def _process_frame(self, df: DataFrame, clean_only: bool = False) -> DataFrame:
+        """
+        Cleans, validates, performs NER and labels one DataFrame (a whole file or a chunk).
+        """
+        df = self._clean_frame(df)
+
+        if clean_only:
+            logger.info("Skipping validation and NER steps as requested...")
+            return df
+
+        return self._extract_signals(df)
+
+    def _clean_frame(self, df: DataFrame) -> DataFrame:
+        """
+        Applies `safe_clean` to the 'Texto Mascarado' column.
+        """
         logger.info("Cleaning text...")
         if 'Texto Mascarado' not in df.columns:
              logger.error("Column 'Texto Mascarado' not found in input file.")
              sys.exit(1)
 
         df['Texto Mascarado'] = df['Texto Mascarado'].apply(self.safe_clean)
-        
-        if clean_only:
-            logger.info("Skipping validation and NER steps as requested...")
+        return df
+
+    def _extract_signals(
+        self,
+        df: DataFrame,
+        ner_results: list[dict] | None = None,
+        executor: Executor | None = None
+    ) -> DataFrame:
+        """
+        Regex flags, NER signals (and masked text with `redact`) and labels for cleaned rows.
+
+        `ner_results` are the rows' results from a file-wide NER stream (signals, or
+        redactions with `redact`; see `_iter_processed_chunks`). Without them, NER runs
+        here. `executor` is a regex worker pool shared across calls.
+        """
+        if self.redact:
+            texts = df['Texto Mascarado'].astype(str).tolist()
+            # One pass per text gives the regex flags, the NER signals and the masked text
+            redactions = ner_results
+            if redactions is None:
+                logger.info("Extracting PII spans (Regex + NER) and masking text...")
+                redactions = Redactor(self.ner_detector).redact_batch(
+                    texts, n_process=self.n_process, batch_size=self.ner_batch_size
+                )
+            df_labels = pd.DataFrame([r["regex"] for r in redactions], index=df.index).astype(int)
+            df = df.join(df_labels)
+            df = df.join(pd.DataFrame([r["ner"] for r in redactions], index=df.index))
+            df['Texto Redigido'] = [r["masked_text"] for r in redactions]
         else:
             logger.info("Validating Regex patterns (CPF, CNPJ, etc)...")
-            # Validate patterns
-            df_labels = df['Texto Mascarado'].apply(Validator.validate_all_types).apply(pd.Series)
-            df_labels = df_labels.astype(int)
+            texts = df['Texto Mascarado'].astype(str).tolist()
+            # One boolean array per pattern, straight into DataFrame columns
+            regex_columns = Validator.validate_columns(texts, n_workers=self.regex_workers, executor=executor)
+            df_labels = pd.DataFrame(regex_columns, index=df.index).astype(int)
             df = df.join(df_labels)
 
-            logger.info("Executando reconhecimento de entidades nomeadas (NER)...")
-            ner_detector = NamedEntityDetector()
-            # Usa nlp.pipe para processamento em lote, que é muito mais rápido
-            texts = df['Texto Mascarado'].astype(str).tolist()
-            sinais_list = ner_detector.extract_signals_batch(texts)
+            sinais_list = ner_results
+            if sinais_list is None:
+                logger.info("Executando reconhecimento de entidades nomeadas (NER)...")
+                # Usa nlp.pipe para processamento em lote, que é muito mais rápido
+                sinais_list = self.ner_detector.extract_signals_batch(
+                    texts, n_process=self.n_process, batch_size=self.ner_batch_size
+                )
             df_sinais = pd.DataFrame(sinais_list, index=df.index)
             df = df.join(df_sinais)
 
-            logger.info("Generating labels...")
-            df['Label'] = df.apply(self.generate_labels, axis=1)
+        logger.info("Generating labels...")
+        df['Label'] = self.generate_label_column(df)
+        return df
 
+    @property
+    def ner_detector(self) -> NamedEntityDetector:
+        """spaCy model, loaded once and reused by every chunk."""
+        if self._ner_detector is None:
+            self._ner_detector = NamedEntityDetector()
+        return self._ner_detector
 
-        logger.info(f"Saving processed data to {output_path}...")
-        try:
-            df.to_excel(output_path)
-            logger.info("Processing complete.")
-        except Exception as e:
-             logger.error(f"Error saving file: {e}")
-             sys.exit(1)
+    @property
+    def pipeline_version(self) -> str:
+        """Version recorded in the manifest; redacted and plain outputs have different columns."""
+        return f"{self.PIPELINE_VERSION}-{'redact' if self.redact else 'signals'}"
 
 def main():
     parser = argparse.ArgumentParser(description="ShieldData Preprocessing Script")
-    parser.add_argument("--input", type=str, required=True, help="Path to input Excel file.")
-    parser.add_argument("--output", type=str, required=True, help="Path to output Excel file.")
+    parser.add_argument("--input", type=str, required=True, help="Path to input file (.xlsx, .csv, .parquet or .feather).")
+    parser.add_argument("--output", type=str, required=True, help="Path to output file; the format follows the extension (.parquet recommended).")
+    parser.add_argument("--excel-output", type=str, default=None, help="Also export the result to this .xlsx file.")
     parser.add_argument("--clean-only", action="store_true", help="Only apply safe_clean to text, skipping NER and validation.")
+    parser.add_argument("--redact", action="store_true", help="Also write a 'Texto Redigido' column with PII spans masked.")
+    parser.add_argument("--n-process", type=int, default=1, help="Processes for the NER stage (-1 = all CPU cores).")
+    parser.add_argument("--ner-batch-size", type=int, default=None, help="Texts per spaCy nlp.pipe batch (default: spaCy's).")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Stream the input in chunks of N rows (.xlsx, .csv or .parquet output) to keep memory flat.")
+    parser.add_argument("--regex-workers", type=int, default=1, help="Processes for the regex stage (-1 = all CPU cores).")
+    parser.add_argument("--incremental", action="store_true", help="Reuse the previous output's signals for rows whose ID and text are unchanged.")
     
     args = parser.parse_args()
     
-    preprocessor = Preprocessor()
-    preprocessor.process_file(args.input, args.output, clean_only=args.clean_only)
+    preprocessor = Preprocessor(
+        redact=args.redact,
+        n_process=args.n_process,
+        ner_batch_size=args.ner_batch_size,
+        incremental=args.incremental,
+        regex_workers=args.regex_workers
+    )
+    preprocessor.process_file(
+        args.input, args.output, clean_only=args.clean_only, chunk_size=args.chunk_size, excel_output=args.excel_output
+    )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,135 @@
+from itertools import tee
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from validator import Validator
+from ner_detector import NamedEntityDetector
+
+
+class Redactor:
+    """
+    Extrai as posições (spans) de dados pessoais e gera o texto mascarado
+    em uma única passada por texto.
+
+    Fontes:
+    - Regex (Validator.find_spans): CPF, CNPJ, e-mail, telefone, RG
+    - NER (NamedEntityDetector): pessoas e localizações, reaproveitando os
+      mesmos `doc.ents` usados para gerar os sinais
+
+    Além do texto mascarado, o resultado traz as flags de Regex e os sinais
+    de NER, idênticos aos de `Validator.validate_all_types` e
+    `NamedEntityDetector.extract_signals`. Assim quem precisa dos dois não
+    roda um segundo scan.
+    """
+
+    # Marcador usado no lugar de cada tipo de dado pessoal
+    MASK_TOKENS: Dict[str, str] = {
+        "cpf": "[CPF]",
+        "cnpj": "[CNPJ]",
+        "email": "[EMAIL]",
+        "phone": "[TELEFONE]",
+        "rg": "[RG]",
+        "person": "[PESSOA]",
+        "location": "[LOCAL]",
+    }
+
+    def __init__(self, ner_detector: Optional[NamedEntityDetector] = None):
+        """
+        Parameters
+        ----------
+        ner_detector : NamedEntityDetector, opcional
+            Detector já carregado. Se None, apenas os padrões Regex são
+            mascarados e o resultado não traz a chave 'ner'.
+        """
+        self.ner_detector = ner_detector
+
+    def redact(self, text: str) -> Dict[str, Any]:
+        """
+        Mascara um único texto. Veja `redact_batch`.
+        """
+        return self.redact_batch([text])[0]
+
+    def redact_batch(self, texts: Iterable[str], n_process: int = 1, batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Extrai spans e mascara uma lista de textos (NER via nlp.pipe).
+
+        `n_process` e `batch_size` são repassados ao nlp.pipe (veja
+        `NamedEntityDetector.extract_signals_batch`).
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            Para cada texto: {
+                "masked_text": str,     # Texto com os dados pessoais mascarados
+                "spans": list,          # Spans (start, end, type, source) de todas as fontes
+                "regex": dict,          # Flags has_cpf, has_cnpj, ...
+                "ner": dict             # Sinais de NER (apenas com ner_detector)
+            }
+        """
+        return list(self.iter_redact(texts, n_process=n_process, batch_size=batch_size))
+
+    def iter_redact(self, texts: Iterable[str], n_process: int = 1, batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Versão preguiçosa de `redact_batch`: os textos passam por um único
+        nlp.pipe e cada resultado é produzido conforme o consumo.
+        """
+        texts = (str(text) for text in texts)
+
+        if self.ner_detector is None:
+            for text in texts:
+                yield self._redact(text, None)
+            return
+
+        texts, pipe_texts = tee(texts)
+        ner_results = self.ner_detector.iter_signals_and_spans(pipe_texts, n_process=n_process, batch_size=batch_size)
+        for text, ner_result in zip(texts, ner_results):
+            yield self._redact(text, ner_result)
+
+    def _redact(self, text: str, ner_result: Optional[tuple]) -> Dict[str, Any]:
+        spans = Validator.find_spans(text)
+        # Uma flag é True se e somente se há span daquele tipo
+        found_types = {span["type"] for span in spans}
+        result: Dict[str, Any] = {
+            "regex": {key: key.removeprefix("has_") in found_types for key in Validator._PATTERNS}
+        }
+
+        if ner_result is not None:
+            signals, ner_spans = ner_result
+            spans = sorted(spans + ner_spans, key=lambda span: (span["start"], span["end"]))
+            result["ner"] = signals
+
+        result["spans"] = spans
+        result["masked_text"] = self.mask(text, spans)
+        return result
+
+    @classmethod
+    def mask(cls, text: str, spans: List[Dict[str, Any]]) -> str:
+        """
+        Substitui os spans do texto pelo marcador do seu tipo.
+
+        Spans sobrepostos ou adjacentes são unidos (do menor início ao maior fim)
+        e mascarados por inteiro, para que nenhum trecho de um dado pessoal fique
+        exposto. O marcador da união é o do span de maior prioridade: o mais
+        longo; no empate, o de Regex e, depois, o que começa antes.
+        """
+        groups: List[List[Any]] = []  # [início, fim, spans]
+        for span in sorted(spans, key=lambda s: (s["start"], s["end"])):
+            if groups and span["start"] <= groups[-1][1]:
+                groups[-1][1] = max(groups[-1][1], span["end"])
+                groups[-1][2].append(span)
+            else:
+                groups.append([span["start"], span["end"], [span]])
+
+        pieces = []
+        cursor = 0
+        for start, end, members in groups:
+            label = min(members, key=cls._priority)["type"]
+            pieces.append(text[cursor:start])
+            pieces.append(cls.MASK_TOKENS.get(label, "[PII]"))
+            cursor = end
+        pieces.append(text[cursor:])
+
+        return "".join(pieces)
+
+    @staticmethod
+    def _priority(span: Dict[str, Any]) -> tuple:
+        # Menor = maior prioridade na escolha do marcador de spans unidos
+        return (-(span["end"] - span["start"]), span["source"] != "regex", span["start"])
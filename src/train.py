@@ -1,10 +1,26 @@
-from piiclassifier import PIIClassifier, PIIDataset, train_epoch
+from piiclassifier import PIIClassifier, PIIDataset, eval_model, resolve_precision, train_epoch
 from pandas import DataFrame
+from sklearn.model_selection import train_test_split
 from torch.utils.data import DataLoader
 from utils import get_best_device, validate_file_exists, ensure_dir_exists
-import pandas as pd
+from data_io import read_table, resolve_table_path
+import math
+import time
 import torch
 import os
+from typing import Any, Callable
+
+TRAINING_COLUMNS = ["Texto Mascarado", "Label"]
+# Cache dos textos já tokenizados (veja PIIDataset), reaproveitado entre execuções e trials
+DEFAULT_TOKEN_CACHE_DIR = "models/cache/tokens"
+
+
+def load_training_data(data_path: str) -> DataFrame:
+    """Lê do arquivo processado só as colunas de treino (texto e rótulo)."""
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {data_path}")
+    return read_table(data_path, columns=TRAINING_COLUMNS)
+
 
 class ModelTrainer:
     def __init__(
@@ -15,19 +31,38 @@ class ModelTrainer:
         learning_rate: float = 2e-5,
         epochs: int = 3,
         model_name: str = "neuralmind/bert-base-portuguese-cased",
-        device: str | None = None
+        device: str | None = None,
+        token_cache_dir: str | None = DEFAULT_TOKEN_CACHE_DIR,
+        precision: str = "fp32",
+        micro_batch_size: int | None = None,
+        validation_split: float = 0.2,
+        early_stopping_patience: int | None = 2,
+        seed: int = 42,
+        save_fp16: bool = False
     ):
         """
         Classe para gerenciar o treinamento do modelo PIIClassifier.
         
         Args:
-            data_path (str): Caminho para o arquivo Excel processado.
+            data_path (str): Caminho para o arquivo processado (.parquet, .feather, .xlsx ou .csv).
             model_save_path (str): Diretório onde o modelo treinado será salvo.
-            batch_size (int): Tamanho do lote para treinamento.
+            batch_size (int): Tamanho do lote efetivo (exemplos por passo do otimizador).
             learning_rate (float): Taxa de aprendizado para o otimizador AdamW.
             epochs (int): Número de épocas de treinamento.
             model_name (str): Nome do modelo base BERT a ser utilizado.
             device (str): Dispositivo para treino ('cuda', 'mps' ou 'cpu'). Se None, detecta automaticamente.
+            token_cache_dir (str): Diretório do cache de tokens. None tokeniza sempre, sem gravar em disco.
+            precision (str): 'fp32', 'bf16', 'fp16' ou 'auto' (bf16 em CPU; bf16/fp16 na GPU).
+            micro_batch_size (int): Exemplos por forward/backward. Se menor que `batch_size`
+                (que deve ser múltiplo dele), os gradientes são acumulados por
+                batch_size / micro_batch_size lotes: o lote efetivo não depende da memória.
+            validation_split (float): Fração dos dados (estratificada pelo rótulo) separada para
+                validação. Após cada época o modelo é avaliado nela, as métricas retornadas por
+                `train` são as de validação e os pesos salvos são os da melhor época. 0 desativa.
+            early_stopping_patience (int): Épocas seguidas sem melhora do F1 de validação antes
+                de parar o treino. None treina todas as épocas.
+            seed (int): Semente da divisão treino/validação (a mesma em todos os trials).
+            save_fp16 (bool): Grava os pesos em fp16 (metade do espaço em disco; carregados em fp32).
         """
         self.data_path = data_path
         self.model_save_path = model_save_path
@@ -35,64 +70,196 @@ class ModelTrainer:
         self.learning_rate = learning_rate
         self.epochs = epochs
         self.model_name = model_name
+        self.token_cache_dir = token_cache_dir
+        self.validation_split = validation_split
+        self.early_stopping_patience = early_stopping_patience
+        self.seed = seed
+        self.save_fp16 = save_fp16
+
+        self.micro_batch_size = min(micro_batch_size or batch_size, batch_size)
+        if batch_size % self.micro_batch_size:
+            raise ValueError(f"batch_size ({batch_size}) deve ser múltiplo de micro_batch_size ({micro_batch_size})")
+        self.accumulation_steps = batch_size // self.micro_batch_size
         
         if device:
             self.device = torch.device(device)
         else:
             # Tenta detectar CUDA ou MPS, senão fallback para CPU
             self.device = get_best_device()
+
+        self.precision = resolve_precision(precision, self.device)
+        # fp16 precisa de escala dinâmica da loss; bf16 tem o mesmo alcance do fp32
+        self.scaler = torch.amp.GradScaler(self.device.type) if self.precision == "fp16" else None
         
         self.model = None
         self.data_loader = None
+        self.val_loader = None
         self.optimizer = None
         self.loss_fn = torch.nn.CrossEntropyLoss()
         self.dataset_size = 0
+        self.val_size = 0
+
+    def load_data(
+        self,
+        df: DataFrame | None = None,
+        datasets: tuple[PIIDataset, PIIDataset | None] | None = None
+    ):
+        """
+        Carrega os dados e prepara o DataLoader.
+
+        Args:
+            df (DataFrame): Dados já carregados (ex.: compartilhados entre trials do Optuna).
+                Se None, lê de `data_path` apenas as colunas usadas no treino.
+            datasets (tuple): (treino, validação) já tokenizados por `build_datasets`,
+                compartilhados entre trials. Se informado, `df` é ignorado.
+        """
+        if datasets is None:
+            if df is None:
+                df = load_training_data(self.data_path)
+            datasets = self.build_datasets(df)
 
-    def load_data(self):
-        """Carrega os dados do arquivo Excel e prepara o DataLoader."""
-        if not os.path.exists(self.data_path):
-             raise FileNotFoundError(f"Arquivo não encontrado: {self.data_path}")
+        dataset, val_dataset = datasets
+        self.dataset_size = len(dataset)
+        self.data_loader = DataLoader(dataset, batch_size=self.micro_batch_size, shuffle=True, collate_fn=dataset.collate_fn)
 
+        self.val_loader = None
+        self.val_size = len(val_dataset) if val_dataset is not None else 0
+        if val_dataset is not None and self.val_size:
+            self.val_loader = DataLoader(val_dataset, batch_size=self.micro_batch_size, shuffle=False, collate_fn=val_dataset.collate_fn)
 
-        df: DataFrame = pd.read_excel(self.data_path, engine="openpyxl", index_col="ID")
-        
-        labels_list: list[int] = df["Label"].tolist()
-        texts_list = df["Texto Mascarado"].astype(str).tolist()
-        
-        self.dataset_size = len(texts_list)
-        
-        # Cria o dataset com o tokenizer correto (model_name)
-        dataset = PIIDataset(texts_list, labels_list, model_name=self.model_name)
-        self.data_loader = DataLoader(dataset, batch_size=self.batch_size, shuffle=True)
+    def build_datasets(self, df: DataFrame, tokenizer: Any = None) -> tuple[PIIDataset, PIIDataset | None]:
+        """
+        Divide `df` (veja `split_data`) e tokeniza treino e validação.
 
+        Os datasets só dependem dos dados, do tokenizer, da divisão e de max_len, não dos
+        hiperparâmetros: podem ser criados uma vez e reutilizados por vários ModelTrainer.
+        `tokenizer` evita carregar o tokenizer de novo quando ele já está em memória.
+        """
+        train_df, val_df = self.split_data(df)
+
+        labels_list: list[int] = train_df["Label"].tolist()
+        texts_list = train_df["Texto Mascarado"].astype(str).tolist()
+
+        # Cria o dataset com o tokenizer correto (model_name), tokenizado uma única vez
+        dataset = PIIDataset(
+            texts_list, labels_list, model_name=self.model_name, tokenizer=tokenizer, cache_dir=self.token_cache_dir
+        )
+        if val_df.empty:
+            return dataset, None
 
-    def prepare_model(self):
-        """Inicializa o modelo, move para o device correto e configura o otimizador."""
+        val_dataset = PIIDataset(
+            val_df["Texto Mascarado"].astype(str).tolist(), val_df["Label"].tolist(),
+            model_name=self.model_name, tokenizer=tokenizer, cache_dir=self.token_cache_dir
+        )
+        return dataset, val_dataset
 
-        self.model = PIIClassifier(model_name=self.model_name)
+    def split_data(self, df: DataFrame) -> tuple[DataFrame, DataFrame]:
+        """
+        Separa treino e validação (estratificado pelo rótulo quando possível).
+        Com `validation_split` 0, tudo vai para o treino.
+        """
+        if not self.validation_split:
+            return df, df.iloc[:0]
+
+        labels = df["Label"]
+        # Estratificar exige ao menos 2 exemplos de cada classe
+        stratify = labels if labels.value_counts().min() >= 2 else None
+        train_df, val_df = train_test_split(
+            df, test_size=self.validation_split, random_state=self.seed, stratify=stratify
+        )
+        return train_df, val_df
+
+
+    def prepare_model(self, model: PIIClassifier | None = None):
+        """
+        Inicializa o modelo, move para o device correto e configura o otimizador.
+
+        Args:
+            model (PIIClassifier): Modelo já montado (ex.: cópia do modelo base carregado
+                uma vez para todos os trials). Se None, carrega `model_name`.
+        """
+
+        self.model = model if model is not None else PIIClassifier(model_name=self.model_name)
         self.model = self.model.to(self.device)
         
         # Otimizador AdamW para ajuste dos pesos
         self.optimizer = torch.optim.AdamW(self.model.parameters(), lr=self.learning_rate)
 
-    def train(self):
-        """Executa o loop de treinamento."""
+    def train(self, epoch_callback: Callable[[int, dict], None] | None = None):
+        """
+        Executa o loop de treinamento.
+
+        Com conjunto de validação, retorna as métricas de validação da melhor época
+        (por F1) e salva os pesos dessa época; senão, as métricas de treino da última.
+
+        Args:
+            epoch_callback: Chamado ao fim de cada época com (época, métricas), as de
+                validação se houver (ex.: o pruning do Optuna). Uma exceção lançada por
+                ele interrompe o treino sem salvar o modelo.
+        """
         if self.model is None or self.data_loader is None or self.optimizer is None:
             raise RuntimeError("Modelo, dados ou otimizador não inicializados. Execute load_data() e prepare_model() primeiro.")
 
         final_metrics = {}
+        optimizer_steps = math.ceil(len(self.data_loader) / self.accumulation_steps)
+        best_f1 = -1.0
+        best_state: dict[str, torch.Tensor] | None = None
+        epochs_without_improvement = 0
         
         for epoch in range(self.epochs):
+            start = time.perf_counter()
             acc, loss, f1, recall = train_epoch(
                 model=self.model,
                 data_loader=self.data_loader,
                 loss_fn=self.loss_fn,
                 optimizer=self.optimizer,
                 device=self.device,
-                n_examples=self.dataset_size
+                n_examples=self.dataset_size,
+                precision=self.precision,
+                accumulation_steps=self.accumulation_steps,
+                scaler=self.scaler
+            )
+            steps_per_second = optimizer_steps / (time.perf_counter() - start)
+            print(f"Época {epoch + 1}/{self.epochs} | Acurácia: {acc:.4f} | F1 Score: {f1:.4f} | Recall: {recall:.4f} | Loss: {loss:.4f} "
+                  f"| {steps_per_second:.2f} passos/s ({self.precision}, lote {self.batch_size} = {self.accumulation_steps} x {self.micro_batch_size})")
+            epoch_metrics = {"accuracy": acc, "f1": f1, "recall": recall, "loss": loss, "steps_per_second": steps_per_second}
+
+            if self.val_loader is None:
+                final_metrics = epoch_metrics
+                if epoch_callback is not None:
+                    epoch_callback(epoch, epoch_metrics)
+                continue
+
+            val_acc, val_loss, val_f1, val_recall = eval_model(
+                model=self.model,
+                data_loader=self.val_loader,
+                loss_fn=self.loss_fn,
+                device=self.device,
+                n_examples=self.val_size,
+                precision=self.precision
             )
-            print(f"Época {epoch + 1}/{self.epochs} | Acurácia: {acc:.4f} | F1 Score: {f1:.4f} | Recall: {recall:.4f} | Loss: {loss:.4f}")
-            final_metrics = {"accuracy": acc, "f1": f1, "recall": recall, "loss": loss}
+            print(f"           Validação | Acurácia: {val_acc:.4f} | F1 Score: {val_f1:.4f} | Recall: {val_recall:.4f} | Loss: {val_loss:.4f}")
+            if epoch_callback is not None:
+                epoch_callback(epoch, {"accuracy": val_acc, "f1": val_f1, "recall": val_recall, "loss": val_loss})
+
+            if val_f1 > best_f1:
+                best_f1 = val_f1
+                epochs_without_improvement = 0
+                # Cópia na CPU dos pesos da melhor época (restaurados antes de salvar)
+                best_state = {name: tensor.detach().to("cpu", copy=True) for name, tensor in self.model.state_dict().items()}
+                final_metrics = {
+                    "accuracy": val_acc, "f1": val_f1, "recall": val_recall, "loss": val_loss,
+                    "train_f1": f1, "epoch": epoch + 1, "steps_per_second": steps_per_second
+                }
+            else:
+                epochs_without_improvement += 1
+                if self.early_stopping_patience is not None and epochs_without_improvement >= self.early_stopping_patience:
+                    print(f"Parada antecipada: F1 de validação sem melhora há {epochs_without_improvement} época(s).")
+                    break
+
+        if best_state is not None:
+            self.model.load_state_dict(best_state)
+            print(f"Melhor época: {final_metrics['epoch']} (F1 de validação {best_f1:.4f})")
 
         self.save_model()
         return final_metrics
@@ -105,12 +272,13 @@ class ModelTrainer:
 
         if self.model is None:
             raise RuntimeError("Modelo não inicializado. Não há nada para salvar.")
-        self.model.save(self.model_save_path)
+        self.model.save(self.model_save_path, half=self.save_fp16)
 
 if __name__ == "__main__":
     # Exemplo de configurações fáceis de ajustar
     trainer = ModelTrainer(
-        data_path="data/processed/AMOSTRA_e-SIC_processed.xlsx",
+        # Usa o .parquet gerado pelo `make process`, se existir
+        data_path=resolve_table_path("data/processed/AMOSTRA_e-SIC_processed.xlsx"),
         batch_size=16,      # Ajuste o tamanho do batch aqui
         learning_rate=2e-5, # Ajuste a learning rate aqui
         epochs=3,           # Ajuste o número de épocas aqui
@@ -1,33 +1,102 @@
 import argparse
+import copy
+import functools
+import multiprocessing
 import optuna
 import logging
+import shutil
 import sys
 import os
+import threading
 
 # Garante que src está no path
 sys.path.append(os.path.join(os.getcwd(), 'src'))
 
-from train import ModelTrainer
+from train import ModelTrainer, load_training_data
+from data_io import resolve_table_path
+from piiclassifier import PIIClassifier
+from checkpoint_manager import TrialCheckpointManager, format_size
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def objective(trial):
+DEFAULT_DATA_PATH = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
+# Estudo persistido em SQLite: sobrevive a falhas e pode ser retomado ou compartilhado entre processos
+DEFAULT_STORAGE = "sqlite:///models/optuna.db"
+DEFAULT_STUDY_NAME = "shielddata"
+FINAL_MODEL_PATH = "models/best_model"
+MAX_EPOCHS = 5
+# Checkpoints separados por estudo: os números dos trials recomeçam em 0 em cada estudo do storage
+CHECKPOINT_PATTERN = "models/{study_name}/trial_{number}"
+BASE_MODEL_NAME = "neuralmind/bert-base-portuguese-cased"
+
+# Trials em threads (--n-jobs) não podem carregar os recursos compartilhados ao mesmo tempo
+_shared_lock = threading.RLock()
+
+
+@functools.lru_cache(maxsize=None)
+def load_data_once(data_path: str):
+    """Lê o conjunto de treino uma única vez; os trials seguintes reutilizam o mesmo DataFrame."""
+    logger.info(f"Carregando dados de {data_path}...")
+    return load_training_data(data_path)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_base_model(model_name: str) -> PIIClassifier:
+    logger.info(f"Carregando o modelo base {model_name} (uma vez por processo)...")
+    return PIIClassifier(model_name=model_name)
+
+
+def new_trial_model(model_name: str = BASE_MODEL_NAME) -> PIIClassifier:
+    """
+    Modelo novo para um trial: cópia em memória do modelo base, carregado do disco/Hub
+    uma única vez por processo. O BERT parte dos mesmos pesos pré-treinados e a cabeça
+    de classificação é reinicializada, como em um `PIIClassifier(model_name)` novo.
+    """
+    with _shared_lock:
+        base = _load_base_model(model_name)
+    # O tokenizer é só leitura: a cópia usa o mesmo objeto em vez de duplicá-lo
+    model = copy.deepcopy(base, memo={id(base.tokenizer): base.tokenizer})
+    model.out.reset_parameters()
+    return model
+
+
+@functools.lru_cache(maxsize=None)
+def _load_datasets(data_path: str, model_name: str):
+    tokenizer = _load_base_model(model_name).tokenizer
+    trainer = ModelTrainer(data_path=data_path, model_name=model_name)
+    return trainer.build_datasets(load_data_once(data_path), tokenizer=tokenizer)
+
+
+def load_datasets_once(data_path: str, model_name: str = BASE_MODEL_NAME):
+    """Datasets de treino e validação tokenizados uma vez e compartilhados por todos os trials."""
+    with _shared_lock:
+        return _load_datasets(data_path, model_name)
+
+
+def checkpoint_pattern(study_name: str) -> str:
+    """Padrão dos checkpoints de um estudo (com `{number}` para o número do trial)."""
+    return CHECKPOINT_PATTERN.format(study_name=study_name, number="{number}")
+
+
+def objective(trial, data_path: str = DEFAULT_DATA_PATH, save_fp16: bool = False):
     """
     Função de objetivo para o Optuna.
     O Optuna vai chamar essa função várias vezes com parâmetros diferentes
     que ele "sugere" baseado nos testes anteriores.
+
+    O F1 de validação de cada época é reportado ao Optuna: o pruner interrompe
+    os trials que estão abaixo dos demais na mesma época.
+
+    Com `save_fp16`, o checkpoint do trial é gravado em fp16 (metade do espaço).
     """
-    
+
     # 1. Definir o espaço de busca (Hyperparameter Search Space)
     learning_rate = trial.suggest_float("learning_rate", 1e-6, 1e-4, log=True)
     batch_size = trial.suggest_categorical("batch_size", [8, 16, 32])
-    epochs = trial.suggest_int("epochs", 2, 5)
-    
-    # Caminho dos dados
-    data_path = "data/processed/AMOSTRA_e-SIC_processed.xlsx"
-    
+    epochs = trial.suggest_int("epochs", 2, MAX_EPOCHS)
+
     # Verifica se os dados existem antes de tentar treinar
     if not os.path.exists(data_path):
         logger.error(f"Arquivo de dados não encontrado: {data_path}")
@@ -37,43 +106,156 @@ def objective(trial):
     logger.info(f"Iniciando Trial {trial.number} com: lr={learning_rate}, batch={batch_size}, epochs={epochs}")
 
     # 2. Instanciar e rodar o treino
-    # Usamos um diretório temporário ou sufixo para não sobrescrever o modelo principal toda hora
-    model_save_path = f"models/trial_{trial.number}"
-    
+    # Cada trial grava em models/<estudo>/trial_N, sem sobrescrever o modelo principal
+    # nem os checkpoints de outros estudos do mesmo storage
+    model_save_path = checkpoint_pattern(trial.study.study_name).format(number=trial.number)
+
     trainer = ModelTrainer(
         data_path=data_path,
         model_save_path=model_save_path,
         batch_size=batch_size,
         learning_rate=learning_rate,
         epochs=epochs,
-        device=None  # Deixe None para detectar automaticamente (usará MPS no Mac)
+        model_name=BASE_MODEL_NAME,
+        device=None,  # Deixe None para detectar automaticamente (usará MPS no Mac)
+        save_fp16=save_fp16
     )
-    
-    trainer.load_data()
-    trainer.prepare_model()
-    
+
+    # Dados tokenizados e pesos base vêm da memória: o trial não relê nada do disco
+    trainer.load_data(datasets=load_datasets_once(data_path))
+    trainer.prepare_model(new_trial_model())
+
+    def report_epoch(epoch: int, metrics: dict):
+        trial.report(metrics["f1"], step=epoch)
+        if trial.should_prune():
+            logger.info(f"Trial {trial.number} interrompido (pruning) na época {epoch + 1}")
+            raise optuna.TrialPruned()
+
     # O train() agora retorna as métricas finais
-    metrics = trainer.train()
-    
+    metrics = trainer.train(epoch_callback=report_epoch)
+    # O retreino final reaproveita este checkpoint se o trial for o melhor
+    trial.set_user_attr("model_path", model_save_path)
+
     # 3. Retornar a métrica que queremos otimizar (MAXIMIZAR o F1 Score)
+    # É o F1 na validação (melhor época): os trials são comparados pelo que generaliza
     f1_score = metrics['f1']
-    
+
     return f1_score
 
+
+def create_pruner(name: str) -> optuna.pruners.BasePruner:
+    """Pruner do estudo: 'median', 'hyperband' ou 'none'."""
+    if name == "median":
+        # Só poda depois de 2 trials completos e a partir da 2ª época
+        return optuna.pruners.MedianPruner(n_startup_trials=2, n_warmup_steps=1)
+    if name == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=MAX_EPOCHS)
+    return optuna.pruners.NopPruner()
+
+
+def create_storage(url: str) -> optuna.storages.RDBStorage:
+    """Storage SQLite (ou outro banco) compartilhado pelos processos do estudo."""
+    if url.startswith("sqlite:///"):
+        directory = os.path.dirname(url.removeprefix("sqlite:///"))
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    # Vários processos gravando no mesmo SQLite: espera o lock em vez de falhar
+    return optuna.storages.RDBStorage(url, engine_kwargs={"connect_args": {"timeout": 60}})
+
+
+def load_study(storage: str, study_name: str, pruner: str) -> optuna.Study:
+    """Cria o estudo ou, se já existir no storage, retoma-o."""
+    return optuna.create_study(
+        study_name=study_name,
+        storage=create_storage(storage),
+        direction="maximize",  # Queremos MAXIMIZAR o F1
+        pruner=create_pruner(pruner),
+        load_if_exists=True,
+    )
+
+
+def run_worker(
+    storage: str,
+    study_name: str,
+    pruner: str,
+    data_path: str,
+    n_trials: int,
+    n_jobs: int = 1,
+    keep_checkpoints: int = 3,
+    save_fp16: bool = False
+):
+    """Executa `n_trials` trials do estudo neste processo (`n_jobs` threads)."""
+    study = load_study(storage, study_name, pruner)
+    study.optimize(
+        functools.partial(objective, data_path=data_path, save_fp16=save_fp16),
+        n_trials=n_trials,
+        n_jobs=n_jobs,
+        callbacks=[TrialCheckpointManager(keep_checkpoints, checkpoint_pattern(study_name))],
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Script de Otimização de Hiperparâmetros com Optuna")
-    parser.add_argument("--trials", type=int, default=10, help="Número de tentativas (trials) que o Optuna fará.")
+    parser.add_argument("--trials", type=int, default=10, help="Número de tentativas (trials) que o Optuna fará nesta execução.")
+    parser.add_argument("--data", type=str, default=None,
+                        help=f"Arquivo processado (.parquet, .feather, .xlsx ou .csv). Padrão: {DEFAULT_DATA_PATH}, "
+                             "ou o .parquet ao lado dele se existir.")
+    parser.add_argument("--storage", type=str, default=DEFAULT_STORAGE,
+                        help="URL do storage do Optuna. Um estudo existente com o mesmo nome é retomado.")
+    parser.add_argument("--study-name", type=str, default=DEFAULT_STUDY_NAME, help="Nome do estudo no storage.")
+    parser.add_argument("--pruner", choices=["median", "hyperband", "none"], default="median",
+                        help="Interrompe trials fracos com base no F1 de validação de cada época.")
+    parser.add_argument("--n-jobs", type=int, default=1, help="Trials em paralelo (threads) em cada processo.")
+    parser.add_argument("--workers", type=int, default=1, help="Processos executando trials do mesmo estudo.")
+    parser.add_argument("--keep-checkpoints", type=int, default=3,
+                        help="Checkpoints mantidos em models/<estudo>/trial_N (os dos melhores trials); os demais são apagados.")
+    parser.add_argument("--checkpoint-fp16", action="store_true",
+                        help="Grava os checkpoints dos trials em fp16 (metade do espaço em disco).")
+    parser.add_argument("--retrain", action="store_true",
+                        help="Treina o modelo final do zero em vez de reaproveitar o checkpoint do melhor trial.")
     args = parser.parse_args()
+    data_path = args.data or resolve_table_path(DEFAULT_DATA_PATH)
 
-    logger.info(f"Iniciando estudo com {args.trials} tentativas...")
-    
-    # Cria o estudo do Optuna
-    study = optuna.create_study(direction="maximize")  # Queremos MAXIMIZAR o F1
-    study.optimize(objective, n_trials=args.trials)
+    logger.info(f"Iniciando estudo '{args.study_name}' ({args.storage}) com {args.trials} tentativas...")
+
+    # Cria o estudo do Optuna (ou retoma o existente)
+    study = load_study(args.storage, args.study_name, args.pruner)
+    checkpoints = TrialCheckpointManager(args.keep_checkpoints, checkpoint_pattern(args.study_name))
+    if args.workers > 1:
+        # Os processos dividem os trials e compartilham o estudo pelo storage
+        per_worker = [args.trials // args.workers + (i < args.trials % args.workers) for i in range(args.workers)]
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=run_worker, args=(
+                args.storage, args.study_name, args.pruner, data_path, n, args.n_jobs,
+                args.keep_checkpoints, args.checkpoint_fp16
+            ))
+            for n in per_worker if n
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    else:
+        study.optimize(
+            functools.partial(objective, data_path=data_path, save_fp16=args.checkpoint_fp16),
+            n_trials=args.trials,
+            n_jobs=args.n_jobs,
+            callbacks=[checkpoints],
+        )
+
+    completed = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    pruned = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.PRUNED,))
+    if not completed:
+        logger.error("Nenhum trial foi concluído; não há modelo para salvar.")
+        sys.exit(1)
 
     print("\n" + "="*40)
     print("RESULTADOS DA OTIMIZAÇÃO")
     print("="*40)
+    print(f"Trials concluídos: {len(completed)} | interrompidos (pruning): {len(pruned)}")
+    print(f"Checkpoints em disco: {format_size(checkpoints.disk_usage(study))} "
+          f"(até {args.keep_checkpoints} trials{', fp16' if args.checkpoint_fp16 else ''})")
     print(f"Melhor trial (Tentativa #{study.best_trial.number}):")
     print(f"  Valor (F1 Score): {study.best_value:.4f}")
     print("  Melhores Parâmetros:")
@@ -81,24 +263,32 @@ def main():
         print(f"    {key}: {value}")
     print("="*40)
 
-    # 4. Treinar o modelo final com os melhores parâmetros e salvar
-    print("\nTreinando o modelo final com os melhores parâmetros...")
-    best_params = study.best_params
-    final_model_path = "models/best_model"
-    
-    final_trainer = ModelTrainer(
-        data_path="data/processed/AMOSTRA_e-SIC_processed.xlsx",
-        model_save_path=final_model_path,
-        batch_size=best_params["batch_size"],
-        learning_rate=best_params["learning_rate"],
-        epochs=best_params["epochs"]
-    )
-    
-    final_trainer.load_data()
-    final_trainer.prepare_model()
-    final_trainer.train()
-    
-    print(f"\nModelo final otimizado salvo em: {final_model_path}")
+    # 4. Salvar o modelo final: o checkpoint do melhor trial, ou um novo treino com os melhores parâmetros
+    best_checkpoint = study.best_trial.user_attrs.get("model_path")
+    if not args.retrain and best_checkpoint and os.path.exists(
+        os.path.join(best_checkpoint, PIIClassifier.weights_file(best_checkpoint))
+    ):
+        print(f"\nReaproveitando o checkpoint do melhor trial ({best_checkpoint})...")
+        # Remove o modelo anterior inteiro: nenhum arquivo do modelo antigo pode sobrar
+        shutil.rmtree(FINAL_MODEL_PATH, ignore_errors=True)
+        shutil.copytree(best_checkpoint, FINAL_MODEL_PATH)
+    else:
+        print("\nTreinando o modelo final com os melhores parâmetros...")
+        best_params = study.best_params
+        final_trainer = ModelTrainer(
+            data_path=data_path,
+            model_save_path=FINAL_MODEL_PATH,
+            batch_size=best_params["batch_size"],
+            learning_rate=best_params["learning_rate"],
+            epochs=best_params["epochs"],
+            model_name=BASE_MODEL_NAME
+        )
+
+        final_trainer.load_data(datasets=load_datasets_once(data_path))
+        final_trainer.prepare_model(new_trial_model())
+        final_trainer.train()
+
+    print(f"\nModelo final otimizado salvo em: {FINAL_MODEL_PATH}")
     print("="*40)
 
 if __name__ == "__main__":
@@ -6,11 +6,13 @@ componentes do projeto, evitando duplicação de código.
 """
 
 import os
-import torch
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
+if TYPE_CHECKING:
+    import torch
 
-def get_best_device() -> torch.device:
+
+def get_best_device() -> "torch.device":
     """
     Detecta o melhor dispositivo disponível para computação com PyTorch.
     
@@ -22,6 +24,9 @@ def get_best_device() -> torch.device:
     Returns:
         torch.device: O melhor dispositivo disponível
     """
+    # Importado aqui: quem só usa os outros utilitários não carrega o PyTorch
+    import torch
+
     if torch.cuda.is_available():
         return torch.device("cuda")
     elif hasattr(torch.backends, "mps") and torch.backends.mps.is_available():
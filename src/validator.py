@@ -1,5 +1,66 @@
+import os
 import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
 from re import Pattern
+from typing import Callable, Iterable, List, Optional, Sequence
+import numpy as np
+
+
+# Pesos dos dígitos verificadores (módulo 11)
+_CPF_WEIGHTS = (np.arange(10, 1, -1), np.arange(11, 1, -1))
+_CNPJ_WEIGHTS = (
+    np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+    np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+)
+
+
+def _only_digits(value: str) -> str:
+    """Remove a pontuação e converte dígitos Unicode (\\d) para ASCII."""
+    digits = re.sub(r"\D", "", value)
+    if not digits.isascii():
+        digits = "".join(str(int(d)) for d in digits)
+    return digits
+
+
+def _check_digits_valid(value: str, weights: tuple[np.ndarray, np.ndarray]) -> bool:
+    """Confere os dois dígitos verificadores de um único CPF/CNPJ (Python puro)."""
+    digits = [int(d) for d in _only_digits(value)]
+    size = len(weights[1]) + 1
+    # Sequências repetidas (000.000.000-00, 111...) passam no cálculo, mas são inválidas
+    if len(digits) != size or len(set(digits)) == 1:
+        return False
+
+    for position, weight in zip((size - 2, size - 1), weights):
+        remainder = sum(d * int(w) for d, w in zip(digits, weight)) % 11
+        if digits[position] != (0 if remainder < 2 else 11 - remainder):
+            return False
+    return True
+
+
+def _check_digits_valid_batch(values: Sequence[str], weights: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """
+    Versão vetorizada de `_check_digits_valid`: confere todos os candidatos
+    de uma vez, como uma matriz (n, tamanho) de dígitos.
+    """
+    size = len(weights[1]) + 1
+    valid = np.zeros(len(values), dtype=bool)
+
+    digit_strings = [_only_digits(value) for value in values]
+    rows = [i for i, digits in enumerate(digit_strings) if len(digits) == size]
+    if not rows:
+        return valid
+
+    buffer = "".join(digit_strings[i] for i in rows).encode("ascii")
+    digits = np.frombuffer(buffer, dtype=np.uint8).reshape(len(rows), size).astype(np.int64) - ord("0")
+
+    ok = ~(digits == digits[:, :1]).all(axis=1)
+    for position, weight in zip((size - 2, size - 1), weights):
+        remainder = (digits[:, :position] @ weight) % 11
+        ok &= digits[:, position] == np.where(remainder < 2, 0, 11 - remainder)
+
+    valid[rows] = ok
+    return valid
 
 
 class Validator:
@@ -12,6 +73,8 @@ class Validator:
     - RG (heurístico)
 
     Observações importantes:
+    - CPF e CNPJ só contam se os dígitos verificadores forem válidos
+      (números de protocolo/processo com o mesmo formato são ignorados)
     - Regex são determinísticos (sem risco de ReDoS)
     - Não usa signal / timeout por SO (cross-platform)
     - Proteção feita via:
@@ -22,6 +85,9 @@ class Validator:
     # Limite defensivo: evita analisar textos absurdamente grandes
     MAX_TEXT_LENGTH = 50_000
 
+    # Blocos por processo em validate_columns(n_workers > 1)
+    SHARDS_PER_WORKER = 4
+
     # =========================
     # REGEX DEFINITIONS
     # =========================
@@ -72,16 +138,48 @@ class Validator:
         re.VERBOSE,
     )
 
+    # Chave do resultado -> padrão
+    _PATTERNS: dict[str, Pattern[str]] = {
+        "has_cpf": _CPF_RE,
+        "has_cnpj": _CNPJ_RE,
+        "has_email": _EMAIL_RE,
+        "has_phone": _PHONE_BR_RE,
+        "has_rg": _RG_RE,
+    }
+
+    # Padrões numéricos (CPF, CNPJ, telefone, RG)
+    _DIGIT_PATTERNS: dict[str, Pattern[str]] = {
+        key: pattern for key, pattern in _PATTERNS.items() if key != "has_email"
+    }
+
+    # Padrões cujas correspondências ainda precisam passar pelos dígitos verificadores
+    _CHECKSUM_WEIGHTS: dict[str, tuple[np.ndarray, np.ndarray]] = {
+        "has_cpf": _CPF_WEIGHTS,
+        "has_cnpj": _CNPJ_WEIGHTS,
+    }
+
+    # Scanner combinado: UMA passada pelo texto localiza tudo o que pode ser PII.
+    # - digits: trecho formado só por dígitos e separadores, com pelo menos 7
+    #   caracteres. Toda correspondência de CPF, CNPJ, telefone ou RG tem essa
+    #   forma (fora um "+" ou "(" inicial de telefone, ver `_candidate_span`),
+    #   então esses padrões só precisam rodar dentro desses trechos curtos.
+    # - at: um "@", sem o qual não existe e-mail.
+    _SCANNER = re.compile(
+        r"(?P<digits>\d[\d.\-/\s()+]{5,}(?:\d|[Xx](?!\d)))"
+        r"|(?P<at>@)"
+    )
+
     # =========================
     # CORE SEARCH LOGIC
     # =========================
 
     @classmethod
-    def _safe_search(cls, pattern: Pattern[str], text: str) -> bool:
+    def _safe_search(cls, pattern: Pattern[str], text: str, check: Optional[Callable[[str], bool]] = None) -> bool:
         """
         Executa uma busca regex de forma segura:
         - Limita tamanho do texto
         - Trata exceções do re
+        - Com `check`, só conta correspondências aprovadas por ele
         """
         if not text:
             return False
@@ -90,24 +188,50 @@ class Validator:
             text = text[:cls.MAX_TEXT_LENGTH]
 
         try:
-            return bool(pattern.search(text))
+            if check is None:
+                return bool(pattern.search(text))
+            return any(check(match.group()) for match in pattern.finditer(text))
         except re.error:
             # Falha defensiva: se regex quebrar, assume que não encontrou
             return False
 
+    # =========================
+    # CHECK DIGITS
+    # =========================
+
+    @staticmethod
+    def is_valid_cpf(value: str) -> bool:
+        """Confere os dígitos verificadores de um CPF (com ou sem pontuação)."""
+        return _check_digits_valid(value, _CPF_WEIGHTS)
+
+    @staticmethod
+    def is_valid_cnpj(value: str) -> bool:
+        """Confere os dígitos verificadores de um CNPJ (com ou sem pontuação)."""
+        return _check_digits_valid(value, _CNPJ_WEIGHTS)
+
+    @staticmethod
+    def verify_cpf_batch(values: Sequence[str]) -> np.ndarray:
+        """Confere vários CPFs de uma vez (NumPy). Retorna um array booleano."""
+        return _check_digits_valid_batch(values, _CPF_WEIGHTS)
+
+    @staticmethod
+    def verify_cnpj_batch(values: Sequence[str]) -> np.ndarray:
+        """Confere vários CNPJs de uma vez (NumPy). Retorna um array booleano."""
+        return _check_digits_valid_batch(values, _CNPJ_WEIGHTS)
+
     # =========================
     # PUBLIC API
     # =========================
 
     @classmethod
     def contains_cpf(cls, text: str) -> bool:
-        """Verifica se o texto contém um CPF."""
-        return cls._safe_search(cls._CPF_RE, text)
+        """Verifica se o texto contém um CPF válido."""
+        return cls._safe_search(cls._CPF_RE, text, cls.is_valid_cpf)
 
     @classmethod
     def contains_cnpj(cls, text: str) -> bool:
-        """Verifica se o texto contém um CNPJ."""
-        return cls._safe_search(cls._CNPJ_RE, text)
+        """Verifica se o texto contém um CNPJ válido."""
+        return cls._safe_search(cls._CNPJ_RE, text, cls.is_valid_cnpj)
 
     @classmethod
     def contains_email(cls, text: str) -> bool:
@@ -129,7 +253,74 @@ class Validator:
         """
         Executa todas as validações disponíveis e retorna um dicionário
         com os resultados.
+
+        Usa o scanner combinado: uma passada pelo texto encontra os trechos
+        candidatos, e os padrões completos só são aplicados a esses trechos.
+        O resultado é idêntico a chamar cada `contains_*` separadamente.
+        """
+        results, _ = cls._scan(text, verify=True)
+        return results
+
+    @classmethod
+    def _scan(cls, text: str, verify: bool) -> tuple[dict[str, bool], dict[str, List[str]]]:
         """
+        Passada única do scanner combinado.
+
+        Com `verify=True`, os candidatos a CPF/CNPJ são conferidos na hora.
+        Com `verify=False`, eles são devolvidos sem conferência (para o lote
+        conferir todos de uma vez) e as flags de CPF/CNPJ ficam False.
+
+        Retorna:
+            tuple: (flags, candidatos por chave de CPF/CNPJ)
+        """
+        results = dict.fromkeys(cls._PATTERNS, False)
+        candidates: dict[str, List[str]] = {key: [] for key in cls._CHECKSUM_WEIGHTS}
+        if not text:
+            return results, candidates
+
+        if len(text) > cls.MAX_TEXT_LENGTH:
+            text = text[:cls.MAX_TEXT_LENGTH]
+
+        try:
+            pending = dict(cls._DIGIT_PATTERNS)
+            check_email = True
+
+            for candidate in cls._SCANNER.finditer(text):
+                if candidate.lastgroup == "at":
+                    # O e-mail pode começar bem antes do "@": busca no texto todo, uma vez
+                    if check_email:
+                        results["has_email"] = bool(cls._EMAIL_RE.search(text))
+                        check_email = False
+                else:
+                    # O trecho termina antes de um caractere que não é dígito, então
+                    # os lookarounds (?<!\d) / (?!\d) se comportam como no texto inteiro.
+                    start, end = cls._candidate_span(text, candidate)
+                    for key, pattern in list(pending.items()):
+                        if key in cls._CHECKSUM_WEIGHTS:
+                            found = False
+                            for match in pattern.finditer(text, start, end):
+                                if not verify:
+                                    candidates[key].append(match.group())
+                                elif _check_digits_valid(match.group(), cls._CHECKSUM_WEIGHTS[key]):
+                                    found = True
+                                    break
+                        else:
+                            found = bool(pattern.search(text, start, end))
+
+                        if found:
+                            results[key] = True
+                            del pending[key]
+
+                if not pending and not check_email:
+                    break
+        except re.error:
+            # Falha defensiva: volta para a busca padrão a padrão
+            return cls._validate_per_pattern(text), {key: [] for key in cls._CHECKSUM_WEIGHTS}
+
+        return results, candidates
+
+    @classmethod
+    def _validate_per_pattern(cls, text: str) -> dict[str, bool]:
         return {
             "has_cpf": cls.contains_cpf(text),
             "has_cnpj": cls.contains_cnpj(text),
@@ -137,3 +328,138 @@ class Validator:
             "has_phone": cls.contains_phone_br(text),
             "has_rg": cls.contains_rg(text),
         }
+
+    @classmethod
+    def find_spans(cls, text: str) -> List[dict]:
+        """
+        Retorna a posição de cada correspondência dos padrões no texto.
+
+        Cada span é um dicionário com start, end (offsets de caractere), type
+        ('cpf', 'cnpj', 'email', 'phone' ou 'rg') e source ('regex'). Spans de
+        tipos diferentes podem se sobrepor. Um tipo tem spans se e somente se
+        a flag correspondente de `validate_all_types` é True.
+        """
+        spans: List[dict] = []
+        if not text:
+            return spans
+
+        if len(text) > cls.MAX_TEXT_LENGTH:
+            text = text[:cls.MAX_TEXT_LENGTH]
+
+        email_done = False
+        for candidate in cls._SCANNER.finditer(text):
+            if candidate.lastgroup == "at":
+                if not email_done:
+                    spans.extend(cls._span(m, "has_email") for m in cls._EMAIL_RE.finditer(text))
+                    email_done = True
+            else:
+                start, end = cls._candidate_span(text, candidate)
+                for key, pattern in cls._DIGIT_PATTERNS.items():
+                    for match in pattern.finditer(text, start, end):
+                        weights = cls._CHECKSUM_WEIGHTS.get(key)
+                        if weights is None or _check_digits_valid(match.group(), weights):
+                            spans.append(cls._span(match, key))
+
+        spans.sort(key=lambda span: (span["start"], span["end"]))
+        return spans
+
+    @staticmethod
+    def _candidate_span(text: str, candidate: re.Match[str]) -> tuple[int, int]:
+        """Trecho candidato, incluindo o "+" ou "(" que pode abrir um telefone."""
+        start, end = candidate.span()
+        if start > 0 and text[start - 1] in "+(":
+            start -= 1
+        return start, end
+
+    @staticmethod
+    def _span(match: re.Match[str], key: str) -> dict:
+        return {"start": match.start(), "end": match.end(), "type": key.removeprefix("has_"), "source": "regex"}
+
+    @classmethod
+    def validate_columns(
+        cls, texts: Sequence[str], n_workers: int = 1, executor: Optional[Executor] = None
+    ) -> dict[str, np.ndarray]:
+        """
+        Executa `validate_all_types` para uma lista de textos e devolve o
+        resultado por coluna: {chave: array booleano com uma posição por texto}.
+
+        É o formato que um DataFrame consome direto (`pd.DataFrame(colunas)`),
+        sem montar um dicionário ou uma Series por texto. Os candidatos a
+        CPF/CNPJ de todos os textos são reunidos e conferidos de uma só vez
+        pelo verificador vetorizado (NumPy).
+
+        Com `n_workers` > 1 (-1 = todos os núcleos), os textos são divididos em
+        blocos contíguos validados em processos separados; o resultado é
+        idêntico, na mesma ordem. Quem valida vários lotes seguidos (p.ex. os
+        blocos de um arquivo) pode passar o `executor` de `worker_pool` para não
+        iniciar os processos de novo a cada chamada.
+        """
+        n_workers = cls._resolve_workers(n_workers)
+        if n_workers > 1 and len(texts) >= 2 * n_workers:
+            return cls._validate_columns_parallel(texts, n_workers, executor)
+
+        columns = {key: np.zeros(len(texts), dtype=bool) for key in cls._PATTERNS}
+        owners: dict[str, List[int]] = {key: [] for key in cls._CHECKSUM_WEIGHTS}
+        candidates: dict[str, List[str]] = {key: [] for key in cls._CHECKSUM_WEIGHTS}
+
+        for index, text in enumerate(texts):
+            flags, text_candidates = cls._scan(text, verify=False)
+            for key, found in flags.items():
+                if found:
+                    columns[key][index] = True
+            for key, values in text_candidates.items():
+                candidates[key].extend(values)
+                owners[key].extend([index] * len(values))
+
+        for key, weights in cls._CHECKSUM_WEIGHTS.items():
+            if candidates[key]:
+                valid = _check_digits_valid_batch(candidates[key], weights)
+                columns[key][np.asarray(owners[key])[valid]] = True
+
+        return columns
+
+    @classmethod
+    def worker_pool(cls, n_workers: int) -> AbstractContextManager[Optional[Executor]]:
+        """
+        Pool de processos para várias chamadas de `validate_columns(executor=...)`.
+        Com um único worker não há pool (o contexto devolve None).
+        """
+        n_workers = cls._resolve_workers(n_workers)
+        return ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else nullcontext()
+
+    @staticmethod
+    def _resolve_workers(n_workers: int) -> int:
+        # -1 = todos os núcleos
+        return (os.cpu_count() or 1) if n_workers == -1 else n_workers
+
+    @classmethod
+    def _validate_columns_parallel(
+        cls, texts: Sequence[str], n_workers: int, executor: Optional[Executor] = None
+    ) -> dict[str, np.ndarray]:
+        # Alguns blocos por processo equilibram a carga quando há textos muito longos
+        shard_size = -(-len(texts) // (n_workers * cls.SHARDS_PER_WORKER))
+        shards = [list(texts[start:start + shard_size]) for start in range(0, len(texts), shard_size)]
+
+        with cls.worker_pool(n_workers) if executor is None else nullcontext(executor) as pool:
+            # map devolve os blocos na ordem de envio, não na ordem de conclusão
+            results = list(pool.map(_validate_shard, shards))
+
+        return {key: np.concatenate([result[key] for result in results]) for key in cls._PATTERNS}
+
+    @classmethod
+    def validate_batch(cls, texts: Iterable[str]) -> List[dict[str, bool]]:
+        """
+        Executa `validate_all_types` para uma lista de textos (um dicionário
+        por texto, na mesma ordem). Ver `validate_columns`.
+        """
+        columns = cls.validate_columns(list(texts))
+        keys = list(columns)
+        return [
+            dict(zip(keys, map(bool, row)))
+            for row in zip(*(columns[key] for key in keys))
+        ]
+
+
+def _validate_shard(texts: List[str]) -> dict[str, np.ndarray]:
+    """Valida um bloco de textos em um processo do pool (função de módulo, serializável)."""
+    return Validator.validate_columns(texts)
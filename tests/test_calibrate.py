@@ -0,0 +1,138 @@
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+from calibrate import (
+    best_thresholds, grid_search, load_scores, make_grid, predict_from_scores, save_scores, weighted_f1
+)
+from hybrid_classifier import HybridClassifier, default_routing_thresholds
+from prediction_cache import model_fingerprint
+
+
+def random_scores(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "bert_prob": rng.random(n).astype(np.float32),
+        "strong": rng.random(n) < 0.1,
+        "has_phone": rng.random(n) < 0.2,
+        "ner_support": rng.random(n) < 0.3,
+        "labels": (rng.random(n) < 0.4).astype(np.int8),
+    }
+
+
+def test_predict_from_scores_matches_decide():
+    """A decisão vetorizada é a mesma de HybridClassifier._decide, texto a texto."""
+    scores = random_scores()
+    hybrid = HybridClassifier(model_path="inexistente")
+    expected = []
+    for i, prob in enumerate(scores["bert_prob"].tolist()):
+        if scores["strong"][i]:
+            expected.append(True)
+            continue
+        regex = {"has_phone": bool(scores["has_phone"][i])}
+        ner = {"has_person_entity": int(scores["ner_support"][i]), "has_location_entity": 0}
+        expected.append(hybrid._decide(regex, prob, ner, 0.5)["is_pii"])
+
+    predicted = predict_from_scores(scores, **default_routing_thresholds())
+    assert predicted.tolist() == expected
+
+
+def test_grid_search_matches_direct_evaluation():
+    """Cada célula da grade tem o F1 da predição direta com aqueles thresholds."""
+    sklearn_metrics = pytest.importorskip("sklearn.metrics")
+    scores = random_scores()
+    grid = make_grid(0.1)
+    f1 = grid_search(scores, grid)
+
+    assert f1.shape == (9, 9, 9)
+    for h, m, p in [(7, 3, 2), (8, 0, 8), (4, 3, 0)]:
+        predicted = predict_from_scores(scores, grid[h], grid[m], grid[p])
+        assert f1[h, m, p] == pytest.approx(weighted_f1(scores["labels"], predicted))
+        assert f1[h, m, p] == pytest.approx(
+            sklearn_metrics.f1_score(scores["labels"], predicted, average="weighted")
+        )
+    assert np.isnan(f1[3, 3, 0]) and np.isnan(f1[2, 5, 0])  # moderate >= high_confidence
+
+
+def test_best_thresholds_prefers_defaults_on_ties():
+    """Sem diferença de F1, os thresholds atuais são mantidos."""
+    grid = make_grid(0.1)
+    f1 = np.ones((len(grid),) * 3)
+    thresholds, best = best_thresholds(f1, grid)
+    assert best == 1.0
+    assert thresholds == default_routing_thresholds()
+
+
+def test_scores_roundtrip_and_invalidation(tmp_path):
+    """Os scores são relidos só com os mesmos metadados."""
+    path = str(tmp_path / "scores.npz")
+    scores = random_scores(n=20)
+    save_scores(path, scores, {"model": "abc", "data": "123"})
+
+    loaded = load_scores(path, {"model": "abc", "data": "123"})
+    assert loaded is not None
+    for name, values in scores.items():
+        np.testing.assert_array_equal(loaded[name], values)
+    assert load_scores(path, {"model": "outro", "data": "123"}) is None
+    assert load_scores(str(tmp_path / "ausente.npz")) is None
+
+
+def test_hybrid_loads_calibrated_thresholds(tmp_path):
+    """O HybridClassifier usa o thresholds.json ao lado dos pesos."""
+    (tmp_path / "model.safetensors").write_bytes(b"pesos")
+    config = {"high_confidence": 0.9, "moderate": 0.5, "phone_min": 0.2, "model": model_fingerprint(str(tmp_path))}
+    (tmp_path / "thresholds.json").write_text(json.dumps(config))
+    hybrid = HybridClassifier(model_path=str(tmp_path))
+
+    assert hybrid.thresholds == {"high_confidence": 0.9, "moderate": 0.5, "phone_min": 0.2}
+    assert not hybrid._needs_ner(0.45)
+    assert hybrid._decide({"has_phone": True}, 0.25, None, 0.5)["is_pii"]
+    assert HybridClassifier(model_path="inexistente").thresholds == default_routing_thresholds()
+
+    (tmp_path / "thresholds.json").write_text(json.dumps({**config, "high_confidence": 0.5, "moderate": 0.6}))
+    with pytest.raises(ValueError):
+        HybridClassifier(model_path=str(tmp_path))
+
+
+def test_thresholds_of_other_weights_are_ignored(tmp_path):
+    """Depois de um retreino, os thresholds calibrados para os pesos antigos não são aplicados."""
+    (tmp_path / "model.safetensors").write_bytes(b"pesos antigos")
+    config = {"high_confidence": 0.9, "moderate": 0.5, "phone_min": 0.2, "model": model_fingerprint(str(tmp_path))}
+    (tmp_path / "thresholds.json").write_text(json.dumps(config))
+
+    (tmp_path / "model.safetensors").write_bytes(b"pesos novos")
+    assert HybridClassifier(model_path=str(tmp_path)).thresholds == default_routing_thresholds()
+
+    # Com caminho explícito, o arquivo é usado como indicado
+    explicit = HybridClassifier(model_path=str(tmp_path), thresholds_path=str(tmp_path / "thresholds.json"))
+    assert explicit.thresholds["high_confidence"] == 0.9
+
+
+def test_weights_are_hashed_only_when_thresholds_are_used(tmp_path, monkeypatch):
+    """Construir o classificador e decidir pelo Regex forte não lê os pesos."""
+    import hybrid_classifier
+
+    (tmp_path / "model.safetensors").write_bytes(b"pesos")
+    config = {"high_confidence": 0.9, "moderate": 0.5, "phone_min": 0.2, "model": model_fingerprint(str(tmp_path))}
+    (tmp_path / "thresholds.json").write_text(json.dumps(config))
+
+    calls = []
+
+    def counting_fingerprint(*args, **kwargs):
+        calls.append(args)
+        return model_fingerprint(*args, **kwargs)
+
+    monkeypatch.setattr(hybrid_classifier, "model_fingerprint", counting_fingerprint)
+    hybrid = HybridClassifier(model_path=str(tmp_path))
+    assert hybrid.predict("Meu CPF é 123.456.789-09")["is_pii"]
+    assert calls == []
+
+    assert hybrid.thresholds["high_confidence"] == 0.9
+    assert hybrid.thresholds["moderate"] == 0.5
+    assert len(calls) == 1
@@ -0,0 +1,73 @@
+import sys
+import os
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+optuna = pytest.importorskip("optuna")
+
+from checkpoint_manager import TrialCheckpointManager, directory_size, format_size
+
+
+def make_objective(root, values):
+    """Objetivo que grava um "checkpoint" de 1KB por trial e devolve o valor da lista."""
+    def objective(trial):
+        value = values[trial.number]
+        if value is None:
+            raise optuna.TrialPruned()
+        path = root / f"trial_{trial.number}"
+        path.mkdir()
+        (path / "model.safetensors").write_bytes(b"0" * 1024)
+        trial.set_user_attr("model_path", str(path))
+        return value
+    return objective
+
+
+def test_keeps_only_best_checkpoints(tmp_path):
+    """Só os `keep` melhores trials ficam em disco, conforme o estudo avança."""
+    values = [0.5, 0.9, 0.1, None, 0.7, 0.8]
+    manager = TrialCheckpointManager(keep=2, checkpoint_pattern=str(tmp_path / "trial_{number}"))
+    study = optuna.create_study(direction="maximize")
+    study.optimize(make_objective(tmp_path, values), n_trials=len(values), callbacks=[manager])
+
+    assert sorted(os.listdir(tmp_path)) == ["trial_1", "trial_5"]
+    assert manager.disk_usage(study) == 2 * 1024
+
+
+def test_minimize_keeps_lowest(tmp_path):
+    values = [0.5, 0.9, 0.1]
+    manager = TrialCheckpointManager(keep=1, checkpoint_pattern=str(tmp_path / "trial_{number}"))
+    study = optuna.create_study(direction="minimize")
+    study.optimize(make_objective(tmp_path, values), n_trials=len(values), callbacks=[manager])
+
+    assert os.listdir(tmp_path) == ["trial_2"]
+
+
+def test_keep_must_be_positive():
+    with pytest.raises(ValueError):
+        TrialCheckpointManager(keep=0)
+
+
+def test_directory_size_and_format(tmp_path):
+    (tmp_path / "a").write_bytes(b"0" * 2048)
+    assert directory_size(str(tmp_path)) == 2048
+    assert directory_size(str(tmp_path / "missing")) == 0
+    assert format_size(2048) == "2.0 KB"
+    assert format_size(3 * 1024 ** 3) == "3.0 GB"
+
+
+def test_studies_sharing_storage_keep_their_checkpoints(tmp_path):
+    """Com um diretório por estudo, um segundo estudo no mesmo storage não apaga os checkpoints do primeiro."""
+    storage = optuna.storages.InMemoryStorage()
+    for name, values in (("a", [0.5, 0.9]), ("b", [0.1, 0.2, 0.3])):
+        root = tmp_path / name
+        root.mkdir()
+        manager = TrialCheckpointManager(keep=1, checkpoint_pattern=str(root / "trial_{number}"))
+        study = optuna.create_study(study_name=name, storage=storage, direction="maximize")
+        study.optimize(make_objective(root, values), n_trials=len(values), callbacks=[manager])
+
+    assert os.listdir(tmp_path / "a") == ["trial_1"]
+    assert os.listdir(tmp_path / "b") == ["trial_2"]
+    best_a = optuna.load_study(study_name="a", storage=storage).best_trial
+    assert best_a.user_attrs["model_path"] == str(tmp_path / "a" / "trial_1")
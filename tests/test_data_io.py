@@ -0,0 +1,87 @@
+import sys
+import os
+import pandas as pd
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+from data_io import ChunkWriter, iter_chunks, read_table, resolve_table_path, write_table
+
+
+def sample_frame(rows: int = 23) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Texto Mascarado": [f"Pedido {i}" if i % 5 else None for i in range(rows)],
+            "has_cpf": [i % 2 for i in range(rows)],
+        },
+        index=pd.Index(range(1, rows + 1), name="ID"),
+    )
+
+
+@pytest.mark.parametrize("extension", [".xlsx", ".csv", ".parquet"])
+def test_chunked_roundtrip(tmp_path, extension):
+    """Gravar em blocos e ler em blocos reproduz o DataFrame original, na mesma ordem."""
+    df = sample_frame()
+    path = str(tmp_path / f"dados{extension}")
+
+    with ChunkWriter(path) as writer:
+        for start in range(0, len(df), 10):
+            writer.write(df.iloc[start:start + 10])
+    assert writer.rows_written == len(df)
+
+    chunks = list(iter_chunks(path, chunk_size=7))
+    assert [len(chunk) for chunk in chunks] == [7, 7, 7, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), df, check_dtype=False)
+
+    # A saída em blocos também é lida inteira, com o índice mesmo selecionando colunas
+    pd.testing.assert_frame_equal(read_table(path), df, check_dtype=False)
+    pd.testing.assert_frame_equal(read_table(path, columns=["has_cpf"]), df[["has_cpf"]], check_dtype=False)
+
+
+def test_xlsx_chunks_match_read_excel(tmp_path):
+    """Os blocos lidos em modo read_only equivalem ao read_excel do arquivo inteiro."""
+    path = str(tmp_path / "dados.xlsx")
+    sample_frame().to_excel(path)
+
+    expected = pd.read_excel(path, index_col="ID")
+    pd.testing.assert_frame_equal(pd.concat(iter_chunks(path, chunk_size=5)), expected, check_dtype=False)
+
+
+def test_rejects_mismatched_columns(tmp_path):
+    df = sample_frame()
+    with ChunkWriter(str(tmp_path / "dados.csv")) as writer:
+        writer.write(df)
+        with pytest.raises(ValueError):
+            writer.write(df[["has_cpf"]])
+
+
+@pytest.mark.parametrize("extension", [".xlsx", ".csv", ".parquet", ".feather"])
+def test_table_roundtrip(tmp_path, extension):
+    """write_table/read_table preservam índice e colunas em todos os formatos."""
+    df = sample_frame()
+    path = str(tmp_path / f"dados{extension}")
+    write_table(df, path)
+
+    pd.testing.assert_frame_equal(read_table(path), df, check_dtype=False)
+    pd.testing.assert_frame_equal(read_table(path, columns=["has_cpf"]), df[["has_cpf"]], check_dtype=False)
+
+
+def test_rejects_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        write_table(sample_frame(), str(tmp_path / "dados.json"))
+
+
+def test_resolve_prefers_fresh_parquet(tmp_path):
+    xlsx = str(tmp_path / "dados.xlsx")
+    parquet = str(tmp_path / "dados.parquet")
+    write_table(sample_frame(), xlsx)
+    assert resolve_table_path(xlsx) == xlsx
+
+    write_table(sample_frame(), parquet)
+    os.utime(parquet, (os.path.getmtime(xlsx) + 1,) * 2)
+    assert resolve_table_path(xlsx) == parquet
+
+    # Um Parquet mais antigo que a planilha está desatualizado
+    os.utime(parquet, (os.path.getmtime(xlsx) - 10,) * 2)
+    assert resolve_table_path(xlsx) == xlsx
@@ -0,0 +1,183 @@
+import sys
+import os
+import re
+
+import numpy as np
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+from hybrid_classifier import WINDOW_BODY_LEN, HybridClassifier, window_starts
+
+MARKER = "segredo"  # Cada ocorrência aumenta a probabilidade de PII do modelo falso
+PAD_ID, CLS_ID, SEP_ID, WORD_ID, MARKER_ID = 0, 2, 3, 5, 7
+
+
+class StubTokenizer:
+    """Tokenizer de palavras (separadas por espaço) com a interface usada pelo HybridClassifier."""
+
+    pad_token_id, cls_token_id, sep_token_id = PAD_ID, CLS_ID, SEP_ID
+
+    def __call__(self, texts, add_special_tokens=True, max_length=None, truncation=False,
+                 return_offsets_mapping=False, **kwargs):
+        input_ids, offset_mapping = [], []
+        for text in texts:
+            words = list(re.finditer(r"\S+", text))
+            ids = [MARKER_ID if word.group() == MARKER else WORD_ID for word in words]
+            offsets = [word.span() for word in words]
+            if add_special_tokens:
+                if truncation and max_length:
+                    ids = ids[:max_length - 2]
+                ids = [CLS_ID] + ids + [SEP_ID]
+            input_ids.append(ids)
+            offset_mapping.append(offsets)
+
+        encoding = {"input_ids": input_ids}
+        if return_offsets_mapping:
+            encoding["offset_mapping"] = offset_mapping
+        return encoding
+
+
+def marker_probability(count):
+    return min(0.95, 0.05 + 0.3 * count)
+
+
+class StubModel:
+    """BERT falso (interface NumPy, como o backend ONNX): P(PII) cresce com o nº de marcadores."""
+
+    numpy_io = True
+
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+
+    def __call__(self, input_ids, attention_mask):
+        counts = ((input_ids == MARKER_ID) & (attention_mask == 1)).sum(axis=1)
+        probs = np.array([marker_probability(count) for count in counts])
+        return np.column_stack([np.zeros(len(probs)), np.log(probs / (1 - probs))])
+
+
+class StubNER:
+    """NER falso: encontra uma pessoa quando o texto contém "Maria"; registra os textos vistos."""
+
+    def __init__(self):
+        self.seen = []
+
+    def _signals(self, text):
+        self.seen.append(text)
+        return {"has_person_entity": int("Maria" in text), "has_location_entity": 0}
+
+    def extract_signals(self, text):
+        return self._signals(text)
+
+    def extract_signals_batch(self, texts, **kwargs):
+        return [self._signals(text) for text in texts]
+
+
+def stub_classifier(model_path="inexistente", **kwargs) -> HybridClassifier:
+    hybrid = HybridClassifier(model_path=model_path, **kwargs)
+    hybrid.bert_model = StubModel()
+    hybrid.ner_detector = StubNER()
+    return hybrid
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"aggregation": "mean"},
+    {"window_stride": 0},
+    {"window_stride": -96},
+    {"window_stride": WINDOW_BODY_LEN + 1},
+    {"backend": "tensorrt"},
+    {"quantize": True, "backend": "onnx"},
+])
+def test_invalid_arguments_fail_at_construction(kwargs):
+    """Configurações inválidas falham no construtor, não só no primeiro predict."""
+    with pytest.raises(ValueError):
+        HybridClassifier(model_path="inexistente", chunked=True, **kwargs)
+
+
+def test_window_starts():
+    """Janelas a cada `stride` tokens, com a última alinhada ao fim do texto."""
+    assert window_starts(0, 96) == [0]
+    assert window_starts(100, 96) == [0]
+    assert window_starts(126, 96) == [0]
+    assert window_starts(127, 96) == [0, 1]
+    assert window_starts(400, 96) == [0, 96, 192, 274]
+    assert window_starts(400, WINDOW_BODY_LEN) == [0, 126, 252, 274]
+
+
+@pytest.mark.parametrize("stride", [1, 30, 96, WINDOW_BODY_LEN])
+def test_windows_cover_every_token(stride):
+    """Com qualquer passo válido, todo token está em alguma janela."""
+    for n_tokens in (1, 126, 127, 300, 1000):
+        covered = np.zeros(n_tokens, dtype=bool)
+        for start in window_starts(n_tokens, stride):
+            covered[start:start + WINDOW_BODY_LEN] = True
+        assert covered.all()
+
+
+def long_text(marker_at, n_words=300):
+    return " ".join(MARKER if i == marker_at else "palavra" for i in range(n_words))
+
+
+@pytest.mark.parametrize("aggregation", ["max", "noisy_or"])
+def test_chunked_aggregation_and_window_offsets(aggregation):
+    """Um marcador só no fim do texto é visto pela última janela; o resultado aponta para ela."""
+    text = long_text(marker_at=250)  # 300 tokens: janelas em 0, 96 e 174
+    hybrid = stub_classifier(chunked=True, aggregation=aggregation)
+
+    probs, windows = hybrid._get_chunked_probabilities([text, "palavra curta"])
+
+    window_probs = [marker_probability(0), marker_probability(0), marker_probability(1)]
+    expected = max(window_probs) if aggregation == "max" else 1 - np.prod([1 - p for p in window_probs])
+    assert probs[0] == pytest.approx(expected)
+    assert probs[1] == pytest.approx(marker_probability(0))
+
+    words = list(re.finditer(r"\S+", text))
+    assert windows[0] == {
+        "window": 2,
+        "n_windows": 3,
+        "window_prob": pytest.approx(marker_probability(1)),
+        "char_start": words[174].start(),
+        "char_end": words[299].end(),
+    }
+    assert windows[1]["n_windows"] == 1
+
+    # Sem chunked, o texto é truncado em MAX_LEN e o marcador não é visto
+    assert stub_classifier()._get_bert_probabilities([text])[0] == pytest.approx(marker_probability(0))
+
+
+EQUIVALENCE_TEXTS = [
+    "Meu CPF é 123.456.789-09",            # Regex forte: nem BERT nem NER
+    f"{MARKER} {MARKER} falar com Maria",  # BERT moderado (0.65) + NER com pessoa
+    f"{MARKER} {MARKER} sem nome",         # BERT moderado, NER sem suporte
+    f"{MARKER} {MARKER} {MARKER} alto",    # BERT alto (0.95): sem NER
+    "reunião às 15h com Maria",            # BERT baixo (0.05): sem NER
+    f"{MARKER} {MARKER} falar com Maria",  # Repetido no lote
+]
+
+
+@pytest.mark.parametrize("cache_size", [0, 16])
+def test_predict_batch_matches_predict(tmp_path, cache_size):
+    """predict_batch devolve o mesmo que predict texto a texto, com e sem cache."""
+    (tmp_path / "model.safetensors").write_bytes(b"pesos")  # O cache identifica o modelo pelos pesos
+
+    expected = [
+        stub_classifier(str(tmp_path), cache_size=cache_size).predict(text)
+        for text in EQUIVALENCE_TEXTS
+    ]
+    hybrid = stub_classifier(str(tmp_path), cache_size=cache_size)
+    assert hybrid.predict_batch(EQUIVALENCE_TEXTS, batch_size=2) == expected
+
+    assert expected[0]["reason"] == "Correspondência forte de Regex"
+    assert expected[1]["reason"] == "BERT moderado + suporte NER"
+    assert expected[2]["reason"] == "Threshold do BERT" and expected[2]["is_pii"]
+    assert expected[3]["reason"] == "Alta confiança do BERT"
+    assert expected[4]["reason"] == "Threshold do BERT" and not expected[4]["is_pii"]
+
+    # NER só na faixa moderada; com cache, o texto repetido é avaliado uma vez
+    moderate = [EQUIVALENCE_TEXTS[1], EQUIVALENCE_TEXTS[2]]
+    assert hybrid.ner_detector.seen == (moderate if cache_size else moderate + [EQUIVALENCE_TEXTS[5]])
+
+    # Segunda chamada: com cache, sai toda do cache (o NER não é chamado de novo)
+    assert hybrid.predict_batch(EQUIVALENCE_TEXTS) == expected
+    assert len(hybrid.ner_detector.seen) == (2 if cache_size else 6)
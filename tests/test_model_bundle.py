@@ -0,0 +1,111 @@
+import sys
+import os
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from inference_backends import EXPORT_FILES
+from piiclassifier import PIIClassifier, LEGACY_WEIGHTS_FILE, QUANTIZED_WEIGHTS_FILE, WEIGHTS_FILE
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "meu", "cpf", "é", "reunião", "às", "15h"]
+
+
+@pytest.fixture
+def base_model(tmp_path):
+    """BERT minúsculo salvo em disco, sem depender do Hugging Face Hub."""
+    path = tmp_path / "base"
+    path.mkdir()
+    vocab_file = path / "vocab.txt"
+    vocab_file.write_text("\n".join(VOCAB))
+
+    transformers.BertTokenizerFast(vocab_file=str(vocab_file)).save_pretrained(path)
+    config = transformers.BertConfig(
+        vocab_size=len(VOCAB), hidden_size=16, num_hidden_layers=1,
+        num_attention_heads=2, intermediate_size=32, max_position_embeddings=64
+    )
+    torch.manual_seed(0)
+    transformers.BertModel(config).save_pretrained(path)
+    return str(path)
+
+
+def logits(model, texts):
+    encoding = model.tokenizer(texts, padding=True, return_tensors="pt")
+    with torch.no_grad():
+        return model(encoding["input_ids"], encoding["attention_mask"])
+
+
+def test_bundle_roundtrip(base_model, tmp_path):
+    """O bundle salvo por `save` carrega sozinho e reproduz os logits do modelo original."""
+    model = PIIClassifier(base_model).eval()
+    bundle = tmp_path / "bundle"
+    model.save(str(bundle))
+
+    assert (bundle / WEIGHTS_FILE).exists()
+    assert (bundle / "config.json").exists()
+
+    loaded = PIIClassifier.load(str(bundle)).eval()
+    assert not any(t.is_meta for t in list(loaded.parameters()) + list(loaded.buffers()))
+
+    texts = ["meu cpf é", "reunião às 15h"]
+    assert torch.allclose(logits(loaded, texts), logits(model, texts))
+
+
+def test_legacy_state_dict_still_loads(base_model, tmp_path):
+    """Diretórios antigos, só com model_state.bin, continuam funcionando."""
+    model = PIIClassifier(base_model).eval()
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    torch.save(model.state_dict(), legacy / LEGACY_WEIGHTS_FILE)
+
+    assert PIIClassifier.weights_file(str(legacy)) == LEGACY_WEIGHTS_FILE
+    loaded = PIIClassifier.load(str(legacy), model_name=base_model).eval()
+    assert torch.allclose(logits(loaded, ["meu cpf é"]), logits(model, ["meu cpf é"]))
+
+
+def test_fp16_bundle_loads_as_fp32(base_model, tmp_path):
+    """`save(half=True)` grava pesos em fp16 (metade do tamanho); `load` devolve fp32."""
+    model = PIIClassifier(base_model).eval()
+    full, half = tmp_path / "full", tmp_path / "half"
+    model.save(str(full))
+    model.save(str(half), half=True)
+
+    assert (half / WEIGHTS_FILE).stat().st_size < 0.6 * (full / WEIGHTS_FILE).stat().st_size
+    loaded = PIIClassifier.load(str(half)).eval()
+    assert all(p.dtype == torch.float32 for p in loaded.parameters())
+    assert torch.allclose(logits(loaded, ["meu cpf é"]), logits(model, ["meu cpf é"]), atol=1e-2)
+
+
+def test_save_invalidates_quantized_weights(base_model, tmp_path):
+    """Depois de gravar pesos novos, `load(quantize=True)` não serve o int8 do modelo anterior
+    e os thresholds e grafos exportados dele são descartados."""
+    bundle = str(tmp_path / "bundle")
+    texts = ["meu cpf é", "reunião às 15h"]
+
+    torch.manual_seed(1)
+    old = PIIClassifier(base_model).eval()
+    old.save(bundle)
+    old_int8 = PIIClassifier.load(bundle, quantize=True)
+    assert not (tmp_path / "bundle" / QUANTIZED_WEIGHTS_FILE).exists()  # Quantizado em memória
+
+    # Arquivo int8 de versões anteriores: nunca é lido (nem desserializado)
+    (tmp_path / "bundle" / QUANTIZED_WEIGHTS_FILE).write_bytes(b"pickle antigo")
+    assert torch.allclose(logits(PIIClassifier.load(bundle, quantize=True), texts), logits(old_int8, texts))
+
+    (tmp_path / "bundle" / "thresholds.json").write_text("{}")  # Calibrado para os pesos antigos
+    for name in EXPORT_FILES.values():
+        (tmp_path / "bundle" / name).write_bytes(b"grafo antigo")
+
+    torch.manual_seed(2)
+    new = PIIClassifier(base_model).eval()
+    new.save(bundle)
+    assert not (tmp_path / "bundle" / QUANTIZED_WEIGHTS_FILE).exists()
+    assert not (tmp_path / "bundle" / "thresholds.json").exists()
+    assert not any((tmp_path / "bundle" / name).exists() for name in EXPORT_FILES.values())
+    new_int8 = PIIClassifier.load(bundle, quantize=True)
+
+    assert torch.allclose(logits(new_int8, texts), logits(new.quantize(), texts))
+    assert not torch.allclose(logits(new_int8, texts), logits(old_int8, texts))
@@ -0,0 +1,84 @@
+import sys
+import os
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+spacy = pytest.importorskip("spacy")
+
+from ner_detector import NamedEntityDetector
+
+TEXTS = [
+    "Meu nome é João Silva e moro em Brasília.",
+    "A Secretaria de Saúde do GDF respondeu o pedido.",
+    "Solicito informações sobre o contrato 123/2023.",
+    "",
+]
+
+LISTENER_NER = {
+    "model": {
+        "@architectures": "spacy.TransitionBasedParser.v2",
+        "state_type": "ner",
+        "extra_state_tokens": False,
+        "hidden_width": 16,
+        "maxout_pieces": 2,
+        "use_upper": True,
+        "tok2vec": {"@architectures": "spacy.Tok2VecListener.v1", "width": 96, "upstream": "*"},
+    }
+}
+
+
+def build_pipeline(path, ner_listens: bool = False) -> str:
+    """Pipeline pequeno no formato dos modelos pt_core_news (tok2vec, tagger, ..., ner)."""
+    nlp = spacy.blank("pt")
+    nlp.add_pipe("tok2vec")
+    nlp.add_pipe("tagger").add_label("N")
+    nlp.add_pipe("attribute_ruler")
+    ruler = nlp.add_pipe("entity_ruler")
+    nlp.add_pipe("ner", config=LISTENER_NER if ner_listens else {}).add_label("PER")
+    nlp.initialize()
+    # Os padrões passam pelo pipeline, que precisa estar inicializado
+    ruler.add_patterns([
+        {"label": "PER", "pattern": "João Silva"},
+        {"label": "LOC", "pattern": "Brasília"},
+        {"label": "ORG", "pattern": "GDF"},
+    ])
+    nlp.to_disk(path)
+    return str(path)
+
+
+def test_trimmed_pipeline_loads_only_ner(tmp_path):
+    """Por padrão só o NER é carregado; o tok2vec compartilhado sai se o NER não o escuta."""
+    detector = NamedEntityDetector(build_pipeline(tmp_path / "indep"))
+    assert detector.nlp.pipe_names == ["ner"]
+
+
+def test_shared_tok2vec_is_kept_when_ner_listens(tmp_path):
+    detector = NamedEntityDetector(build_pipeline(tmp_path / "listen", ner_listens=True))
+    assert detector.nlp.pipe_names == ["tok2vec", "ner"]
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_signals_match_full_pipeline(tmp_path):
+    """O pipeline enxuto gera exatamente os mesmos sinais do pipeline completo."""
+    path = build_pipeline(tmp_path / "full")
+    full = NamedEntityDetector(path, keep_components=None)
+    trimmed = NamedEntityDetector(path, keep_components=("tok2vec", "entity_ruler", "ner"))
+
+    assert trimmed.nlp.pipe_names == ["entity_ruler", "ner"]
+    signals = trimmed.extract_signals_batch(TEXTS)
+    assert signals == full.extract_signals_batch(TEXTS)
+    assert signals[0]["has_person_entity"] and signals[0]["has_location_entity"]
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_multiprocess_batch_preserves_order(tmp_path):
+    """Com vários processos, os sinais saem na mesma ordem dos textos."""
+    detector = NamedEntityDetector(build_pipeline(tmp_path / "mp"), keep_components=("entity_ruler", "ner"))
+    texts = TEXTS * 5
+
+    expected = detector.extract_signals_batch(texts)
+    assert detector.extract_signals_batch(texts, n_process=2, batch_size=3) == expected
+    # Gerador consumido sob demanda (como no streaming do pré-processamento)
+    assert list(detector.iter_signals(iter(texts), n_process=2, batch_size=3)) == expected
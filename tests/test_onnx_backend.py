@@ -0,0 +1,86 @@
+import sys
+import os
+import json
+import subprocess
+
+import numpy as np
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+transformers = pytest.importorskip("transformers")
+
+from inference_backends import ONNX_FILE, pad_token_arrays
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "meu", "cpf", "é", "reunião", "às", "15h"]
+
+# Sem Regex forte e com um NER falso: o predict passa só pelo BERT (ONNX)
+PREDICT_SCRIPT = """
+import json, sys
+sys.path.append("src")
+from hybrid_classifier import HybridClassifier
+
+class NoEntities:
+    def extract_signals_batch(self, texts, **kwargs):
+        return [{"has_person_entity": 0, "has_location_entity": 0} for _ in texts]
+
+hybrid = HybridClassifier(model_path=sys.argv[1], backend="onnx")
+hybrid.ner_detector = NoEntities()
+results = hybrid.predict_batch(["meu cpf é", "reunião às 15h reunião às 15h"])
+print(json.dumps({"bert": [r["details"]["bert"] for r in results], "torch": "torch" in sys.modules}))
+"""
+
+
+@pytest.fixture
+def onnx_model(tmp_path):
+    """Tokenizer minúsculo e um grafo ONNX cujo logit de PII é (nº de tokens - 6)."""
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(VOCAB))
+    transformers.BertTokenizerFast(vocab_file=str(vocab_file)).save_pretrained(tmp_path)
+
+    helper, TensorProto = onnx.helper, onnx.TensorProto
+    nodes = [
+        helper.make_node("Cast", ["attention_mask"], ["mask"], to=TensorProto.FLOAT),
+        helper.make_node("ReduceSum", ["mask", "axes"], ["length"], keepdims=1),
+        helper.make_node("Sub", ["length", "offset"], ["positive"]),
+        helper.make_node("Neg", ["positive"], ["negative"]),
+        helper.make_node("Concat", ["negative", "positive"], ["logits"], axis=1),
+    ]
+    graph = helper.make_graph(
+        nodes, "pii",
+        [helper.make_tensor_value_info(name, TensorProto.INT64, ["batch", "seq"])
+         for name in ("input_ids", "attention_mask")],
+        [helper.make_tensor_value_info("logits", TensorProto.FLOAT, ["batch", 2])],
+        initializer=[
+            helper.make_tensor("axes", TensorProto.INT64, [1], [1]),
+            helper.make_tensor("offset", TensorProto.FLOAT, [], [6.0]),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+    onnx.save(model, str(tmp_path / ONNX_FILE))
+    return str(tmp_path)
+
+
+def test_pad_token_arrays():
+    """Padding até a maior sequência, com a máscara de atenção correspondente."""
+    input_ids, attention_mask = pad_token_arrays([[5, 6, 7], [8]], pad_token_id=0)
+    np.testing.assert_array_equal(input_ids, [[5, 6, 7], [8, 0, 0]])
+    np.testing.assert_array_equal(attention_mask, [[1, 1, 1], [1, 0, 0]])
+    assert input_ids.dtype == np.int64
+
+
+def test_onnx_predict_does_not_import_torch(onnx_model):
+    """O backend ONNX faz padding e softmax em NumPy: o predict não importa torch."""
+    output = subprocess.run(
+        [sys.executable, "-c", PREDICT_SCRIPT, onnx_model],
+        capture_output=True, text=True, check=True, cwd=os.getcwd()
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    assert result["torch"] is False
+    # [CLS] + 3 tokens + [SEP] = 5 tokens; [CLS] + 6 + [SEP] = 8 tokens
+    expected = [1 / (1 + np.exp(-2 * (5 - 6))), 1 / (1 + np.exp(-2 * (8 - 6)))]
+    assert result["bert"] == pytest.approx(expected, rel=1e-5)
@@ -0,0 +1,62 @@
+import sys
+import os
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+import piiclassifier
+from piiclassifier import PIIDataset
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "meu", "cpf", "é", "reunião", "às", "15h"]
+TEXTS = ["meu cpf é", "reunião às 15h", "", "meu cpf é meu cpf é meu cpf é"]
+LABELS = [1, 0, 0, 1]
+
+
+@pytest.fixture
+def tokenizer_path(tmp_path):
+    """Tokenizer minúsculo salvo em disco, sem depender do Hugging Face Hub."""
+    path = tmp_path / "tokenizer"
+    path.mkdir()
+    vocab_file = path / "vocab.txt"
+    vocab_file.write_text("\n".join(VOCAB))
+    transformers.BertTokenizerFast(vocab_file=str(vocab_file)).save_pretrained(path)
+    return str(path)
+
+
+def test_items_match_per_text_tokenization(tokenizer_path):
+    """Os itens pré-tokenizados são os mesmos que a tokenização texto a texto."""
+    tokenizer = transformers.AutoTokenizer.from_pretrained(tokenizer_path)
+    dataset = PIIDataset(TEXTS, LABELS, model_name=tokenizer_path, max_len=8)
+
+    assert len(dataset) == len(TEXTS)
+    for i, text in enumerate(TEXTS):
+        expected = tokenizer(text, max_length=8, truncation=True)["input_ids"]
+        assert dataset[i]["input_ids"].tolist() == expected
+        assert dataset[i]["input_ids"].dtype == torch.long
+        assert dataset[i]["labels"].item() == LABELS[i]
+
+
+def test_cache_is_reused_without_tokenizer(tokenizer_path, tmp_path, monkeypatch):
+    """Com o cache gravado, o dataset é montado por mmap, sem carregar o tokenizer."""
+    cache_dir = str(tmp_path / "cache")
+    first = PIIDataset(TEXTS, LABELS, model_name=tokenizer_path, cache_dir=cache_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("o tokenizer não deveria ser carregado")
+
+    monkeypatch.setattr(piiclassifier.AutoTokenizer, "from_pretrained", fail)
+    cached = PIIDataset(TEXTS, LABELS, model_name=tokenizer_path, cache_dir=cache_dir)
+
+    batch = [cached[i] for i in range(len(TEXTS))]
+    expected = first.collate_fn([first[i] for i in range(len(TEXTS))])
+    for key, value in cached.collate_fn(batch).items():
+        assert torch.equal(value, expected[key])
+
+    # Outro max_len é outra entrada do cache
+    monkeypatch.undo()
+    PIIDataset(TEXTS, LABELS, model_name=tokenizer_path, max_len=4, cache_dir=cache_dir)
+    assert len([name for name in os.listdir(cache_dir) if not name.startswith(".")]) == 2
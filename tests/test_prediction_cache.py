@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+from prediction_cache import PredictionCache, model_fingerprint
+
+RESULT = {"is_pii": True, "confidence": 1.0, "reason": "Correspondência forte de Regex", "details": {"regex": {"has_cpf": True}}}
+
+
+def test_lru_eviction_and_counters():
+    """O cache respeita o limite de tamanho e conta hits/misses."""
+    cache = PredictionCache(namespace="m", max_size=2)
+    keys = [cache.make_key(text, 0.5) for text in ("a", "b", "c")]
+
+    cache.put(keys[0], RESULT)
+    cache.put(keys[1], RESULT)
+    assert cache.get(keys[0]) == RESULT  # "a" passa a ser o mais recente
+    cache.put(keys[2], RESULT)           # remove "b", o menos usado
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == RESULT
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_text_and_threshold():
+    """Textos iguais (a menos de espaços nas pontas) e mesmo threshold geram a mesma chave."""
+    cache = PredictionCache(namespace="m")
+    assert cache.make_key("  texto ", 0.5) == cache.make_key("texto", 0.5)
+    assert cache.make_key("texto", 0.5) != cache.make_key("texto", 0.7)
+    assert cache.make_key("(61)  9999", 0.5) != cache.make_key("(61) 9999", 0.5)
+
+
+def test_returned_results_are_copies():
+    """Alterar o resultado devolvido não altera o cache."""
+    cache = PredictionCache(namespace="m")
+    key = cache.make_key("texto", 0.5)
+    cache.put(key, RESULT)
+    cache.get(key)["details"]["regex"]["has_cpf"] = False
+    assert cache.get(key) == RESULT
+
+
+def test_disk_persistence_and_invalidation(tmp_path):
+    """Entradas persistem no SQLite e são descartadas quando o modelo muda."""
+    weights = tmp_path / "model_state.bin"
+    weights.write_bytes(b"pesos v1")
+    db_path = str(tmp_path / "cache.sqlite")
+
+    cache = PredictionCache(namespace=model_fingerprint(str(tmp_path)), db_path=db_path)
+    key = cache.make_key("texto", 0.5)
+    cache.put(key, RESULT)
+    cache.close()
+
+    reopened = PredictionCache(namespace=model_fingerprint(str(tmp_path)), db_path=db_path)
+    assert reopened.get(key) == RESULT
+    reopened.close()
+
+    weights.write_bytes(b"pesos v2")
+    retrained = PredictionCache(namespace=model_fingerprint(str(tmp_path)), db_path=db_path)
+    assert retrained.get(retrained.make_key("texto", 0.5)) is None
+    retrained.close()
@@ -0,0 +1,181 @@
+import sys
+import os
+import pandas as pd
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+pytest.importorskip("spacy")
+
+import validator
+from data_io import read_table
+from preprocessing import Preprocessor
+
+
+def test_label_column_matches_row_labels():
+    """The vectorized label equals generate_labels applied row by row."""
+    df = pd.DataFrame({
+        "has_cpf": [0, 1, 0, 0, 0],
+        "has_cnpj": [1, 0, 0, 0, 0],  # CNPJ alone does not label a row
+        "has_email": [0, 0, 1, 0, 0],
+        "has_phone": [0, 0, 0, 0, None],
+        "has_person_entity": [False, False, False, True, False],
+    })
+
+    expected = df.apply(Preprocessor.generate_labels, axis=1)
+    pd.testing.assert_series_equal(Preprocessor.generate_label_column(df), expected)
+    assert expected.tolist() == [0, 1, 1, 1, 0]
+
+
+def test_label_column_without_signals():
+    """Without any signal column (e.g. clean-only output) every row is 0."""
+    df = pd.DataFrame({"Texto Mascarado": ["a", "b"]})
+    assert Preprocessor.generate_label_column(df).tolist() == [0, 0]
+
+
+class CountingDetector:
+    """Stand-in for NamedEntityDetector that records which texts reached NER and how many pipes ran."""
+
+    def __init__(self):
+        self.seen = []
+        self.pipes = 0
+
+    def extract_signals_batch(self, texts, n_process=1, batch_size=None):
+        return list(self.iter_signals(texts))
+
+    def iter_signals(self, texts, n_process=1, batch_size=None):
+        for signals, _ in self.iter_signals_and_spans(texts):
+            yield signals
+
+    def extract_signals_and_spans_batch(self, texts, n_process=1, batch_size=None):
+        return list(self.iter_signals_and_spans(texts))
+
+    def iter_signals_and_spans(self, texts, n_process=1, batch_size=None):
+        self.pipes += 1
+        for text in texts:
+            self.seen.append(text)
+            start = text.find("Maria")
+            spans = [] if start < 0 else [{"start": start, "end": start + 5, "type": "person", "source": "ner"}]
+            yield {"has_person_entity": int(start >= 0)}, spans
+
+
+def write_input(path, texts):
+    df = pd.DataFrame({"Texto Mascarado": texts}, index=pd.Index(range(1, len(texts) + 1), name="ID"))
+    df.to_csv(path)
+
+
+def run_incremental(input_path, output_path):
+    preprocessor = Preprocessor(incremental=True)
+    preprocessor._ner_detector = CountingDetector()
+    preprocessor.process_file(str(input_path), str(output_path))
+    return preprocessor._ner_detector.seen, pd.read_parquet(output_path)
+
+
+def test_incremental_reprocesses_only_changed_rows(tmp_path):
+    """Unchanged rows reuse the previous signals; the output matches a full run."""
+    input_path, output_path = tmp_path / "raw.csv", tmp_path / "processed.parquet"
+
+    write_input(input_path, ["CPF 123.456.789-09", "Sem dados", "Falar com Maria"])
+    seen, _ = run_incremental(input_path, output_path)
+    assert len(seen) == 3
+
+    write_input(input_path, ["CPF 123.456.789-09", "Sem dados  pessoais", "Falar com Maria", "Maria, tel 912345678"])
+    seen, incremental = run_incremental(input_path, output_path)
+    assert seen == ["Sem dados pessoais", "Maria, tel 912345678"]
+
+    full_output = tmp_path / "full.parquet"
+    preprocessor = Preprocessor()
+    preprocessor._ner_detector = CountingDetector()
+    preprocessor.process_file(str(input_path), str(full_output))
+    pd.testing.assert_frame_equal(incremental, pd.read_parquet(full_output))
+    assert incremental["Label"].tolist() == [1, 0, 1, 1]
+
+
+def test_plain_run_invalidates_manifest(tmp_path):
+    """A non-incremental run rewrites the output, so its signals are never reused for other texts."""
+    input_path, output_path = tmp_path / "raw.csv", tmp_path / "processed.parquet"
+    write_input(input_path, ["Falar com Maria"])
+    run_incremental(input_path, output_path)
+
+    write_input(input_path, ["sem nome"])
+    preprocessor = Preprocessor()
+    preprocessor._ner_detector = CountingDetector()
+    preprocessor.process_file(str(input_path), str(output_path))
+
+    write_input(input_path, ["Falar com Maria"])
+    seen, incremental = run_incremental(input_path, output_path)
+    assert seen == ["Falar com Maria"]
+    assert incremental["has_person_entity"].tolist() == [1]
+    assert incremental["Label"].tolist() == [1]
+
+
+def test_clean_only_output_is_not_reused(tmp_path):
+    """After a clean-only run, the next incremental run recomputes every signal."""
+    input_path, output_path = tmp_path / "raw.csv", tmp_path / "processed.parquet"
+    write_input(input_path, ["Sem dados", "Falar com Maria"])
+    run_incremental(input_path, output_path)
+
+    Preprocessor(incremental=True).process_file(str(input_path), str(output_path), clean_only=True)
+
+    seen, incremental = run_incremental(input_path, output_path)
+    assert len(seen) == 2
+    assert {"has_cpf", "has_person_entity", "Label"} <= set(incremental.columns)
+    assert incremental["Label"].tolist() == [0, 1]
+
+
+def test_output_without_signals_is_not_reused(tmp_path):
+    """Even with a matching manifest, an output lacking signal columns is recomputed."""
+    input_path, output_path = tmp_path / "raw.csv", tmp_path / "processed.parquet"
+    write_input(input_path, ["Sem dados", "Falar com Maria"])
+    _, first = run_incremental(input_path, output_path)
+    first[["Texto Mascarado"]].to_parquet(output_path)  # Manifest left in place
+
+    seen, incremental = run_incremental(input_path, output_path)
+    assert len(seen) == 2
+    assert incremental["Label"].tolist() == [0, 1]
+
+
+def test_incremental_reprocesses_everything_on_version_change(tmp_path, monkeypatch):
+    """A new pipeline version invalidates every row of the manifest."""
+    input_path, output_path = tmp_path / "raw.csv", tmp_path / "processed.parquet"
+    write_input(input_path, ["Sem dados", "Falar com Maria"])
+    run_incremental(input_path, output_path)
+
+    monkeypatch.setattr(Preprocessor, "PIPELINE_VERSION", "test")
+    seen, _ = run_incremental(input_path, output_path)
+    assert len(seen) == 2
+
+
+@pytest.mark.parametrize("redact", [False, True])
+def test_streaming_shares_pools_across_chunks(tmp_path, monkeypatch, redact):
+    """Streaming starts one NER pipe and one regex pool per file; the output matches a full run."""
+    pools = []
+
+    class CountingPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(validator, "ProcessPoolExecutor", CountingPool)
+
+    texts = ["CPF 123.456.789-09", "Sem dados", "Falar com Maria", "Maria, tel 912345678", "Nada"] * 4
+    input_path = tmp_path / "raw.csv"
+    write_input(input_path, texts)
+
+    outputs = {}
+    for chunk_size in (None, 6):
+        preprocessor = Preprocessor(redact=redact, regex_workers=2)
+        preprocessor._ner_detector = CountingDetector()
+        outputs[chunk_size] = tmp_path / f"processed_{chunk_size}.parquet"
+        preprocessor.process_file(str(input_path), str(outputs[chunk_size]), chunk_size=chunk_size)
+        assert preprocessor._ner_detector.pipes == 1
+        assert preprocessor._ner_detector.seen == texts
+
+    streamed, full = read_table(str(outputs[6])), read_table(str(outputs[None]))
+    pd.testing.assert_frame_equal(streamed, full)
+    assert streamed["Label"].tolist() == [1, 0, 1, 1, 0] * 4
+    if not redact:
+        # One pool for the whole file (4 chunks) and one for the full run
+        assert len(pools) == 2
@@ -0,0 +1,51 @@
+import sys
+import os
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+from redactor import Redactor
+from validator import Validator
+
+
+def test_redact_masks_regex_spans():
+    """Os padrões Regex são substituídos pelo marcador do seu tipo."""
+    result = Redactor().redact("CPF 123.456.789-09, email joao@exemplo.com e tel (61) 99999-9999")
+
+    assert result["masked_text"] == "CPF [CPF], email [EMAIL] e tel [TELEFONE]"
+    assert [span["type"] for span in result["spans"]] == ["cpf", "email", "phone"]
+    assert all(span["source"] == "regex" for span in result["spans"])
+
+
+def test_redact_flags_match_validator():
+    """As flags do resultado são as mesmas de validate_all_types (sem segundo scan)."""
+    texts = ["Sem dados pessoais", "RG 12.345.678-X", "912345678", ""]
+    for text, result in zip(texts, Redactor().redact_batch(texts)):
+        assert result["regex"] == Validator.validate_all_types(text)
+
+
+def test_mask_overlapping_spans():
+    """Spans sobrepostos geram um único marcador (vence o mais longo)."""
+    text = "ligue 912345678 hoje"
+    masked = Redactor.mask(text, Validator.find_spans(text))
+    assert masked == "ligue [TELEFONE] hoje"
+
+
+def test_mask_overlapping_spans_leaves_nothing_exposed():
+    """A união de spans sobrepostos é mascarada por inteiro, com o marcador do mais longo."""
+    for text, expected in [
+        ("0.224180.0079", "[TELEFONE]"),
+        ("545410.3486.729/6314 3", "[TELEFONE]/6314 3"),
+    ]:
+        assert Redactor.mask(text, Validator.find_spans(text)) == expected
+
+    # Regex e NER sobrepostos, e spans adjacentes
+    text = "Falar com Maria Silva 912345678 ou na Rua Azul"
+    spans = [
+        {"start": 10, "end": 21, "type": "person", "source": "ner"},
+        {"start": 16, "end": 31, "type": "person", "source": "ner"},   # "Silva 912345678"
+        {"start": 22, "end": 31, "type": "phone", "source": "regex"},
+        {"start": 38, "end": 41, "type": "location", "source": "ner"},
+        {"start": 41, "end": 46, "type": "location", "source": "ner"},  # adjacente
+    ]
+    assert Redactor.mask(text, spans) == "Falar com [PESSOA] ou na [LOCAL]"
@@ -0,0 +1,96 @@
+import sys
+import os
+import pytest
+
+# Ensure src is in path for imports
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+
+from validator import Validator
+
+TEXTS = [
+    "",
+    "Reunião às 15h no auditório",
+    "Meu CPF é 123.456.789-09",
+    "CNPJ 12.345.678/0001-95",
+    "Contato: joao.silva@exemplo.com.br",
+    "Telefone (61) 3333-4444",
+    "+55 (61) 99999-9999",
+    "RG 12.345.678-X",
+    "912345678",  # Telefone e RG ao mesmo tempo
+    "Processo 00012345678900 de 2023",
+    "Protocolo 123.456.789-00 e CNPJ 12.345.678/0001-90",  # Dígitos verificadores inválidos
+    "email@ 1234 567 e 1 2 3 4 5 6 7",
+]
+
+
+def per_pattern(text):
+    return {
+        "has_cpf": Validator.contains_cpf(text),
+        "has_cnpj": Validator.contains_cnpj(text),
+        "has_email": Validator.contains_email(text),
+        "has_phone": Validator.contains_phone_br(text),
+        "has_rg": Validator.contains_rg(text),
+    }
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_validate_all_types_matches_per_pattern(text):
+    """O scanner combinado deve dar o mesmo resultado que cada padrão separado."""
+    assert Validator.validate_all_types(text) == per_pattern(text)
+
+
+def test_overlapping_matches_are_all_reported():
+    """Uma correspondência não pode esconder outra sobreposta."""
+    results = Validator.validate_all_types("912345678")
+    assert results["has_phone"] and results["has_rg"]
+
+
+def test_validate_batch_preserves_order():
+    """validate_batch retorna um resultado por texto, na mesma ordem."""
+    assert Validator.validate_batch(TEXTS) == [per_pattern(t) for t in TEXTS]
+
+
+def test_validate_columns_matches_per_text():
+    """validate_columns devolve as mesmas flags, uma coluna por padrão."""
+    columns = Validator.validate_columns(TEXTS)
+    assert list(columns) == list(per_pattern(""))
+    for key, values in columns.items():
+        assert values.tolist() == [per_pattern(t)[key] for t in TEXTS]
+
+
+def test_validate_columns_parallel_preserves_order():
+    """Com vários processos, o resultado é o mesmo e na mesma ordem."""
+    texts = TEXTS * 5
+    parallel = Validator.validate_columns(texts, n_workers=3)
+    serial = Validator.validate_columns(texts)
+    assert list(parallel) == list(serial)
+    for key in serial:
+        assert parallel[key].tolist() == serial[key].tolist()
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("123.456.789-09", True),
+    ("98765432100", True),
+    ("123.456.789-00", False),
+    ("111.111.111-11", False),  # Sequência repetida
+])
+def test_is_valid_cpf(value, expected):
+    """Só CPFs com dígitos verificadores corretos são válidos."""
+    assert Validator.is_valid_cpf(value) is expected
+
+
+def test_checksum_rejects_protocol_numbers():
+    """Números de protocolo com formato de CPF/CNPJ não contam como correspondência forte."""
+    results = Validator.validate_all_types("Protocolo 123.456.789-00 e processo 12.345.678/0001-90")
+    assert not results["has_cpf"]
+    assert not results["has_cnpj"]
+    assert Validator.validate_all_types("CNPJ 11.222.333/0001-81")["has_cnpj"]
+
+
+def test_vectorized_verifier_matches_scalar():
+    """O verificador NumPy concorda com o verificador de um valor por vez."""
+    cpfs = ["123.456.789-09", "123.456.789-00", "98765432100", "000.000.000-00", "123"]
+    cnpjs = ["11.222.333/0001-81", "12.345.678/0001-90", "12345678000195"]
+
+    assert Validator.verify_cpf_batch(cpfs).tolist() == [Validator.is_valid_cpf(v) for v in cpfs]
+    assert Validator.verify_cnpj_batch(cnpjs).tolist() == [Validator.is_valid_cnpj(v) for v in cnpjs]